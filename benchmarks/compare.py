@@ -0,0 +1,74 @@
+"""
+Compare two benchmark-suite result files and fail on regressions.
+
+A benchmark regresses when its primary metric (seconds for stages, p95 latency for routes,
+time to first byte for streamed pages, the value itself for gauges such as peak RSS)
+grew by more than `--threshold` (a fraction) over the baseline. Benchmarks present in only
+one of the files are listed but never fail the comparison.
+
+Usage:
+    python benchmarks/compare.py BASELINE.json CURRENT.json [--threshold 0.2]
+"""
+import sys
+import json
+import argparse
+
+# Metric compared for each kind of benchmark, in order of preference
+PRIMARY_METRICS = ("p95_ms", "ttfb_ms", "seconds", "value")
+
+
+def primary_metric(result):
+    return next(metric for metric in PRIMARY_METRICS if metric in result)
+
+
+def compare(baseline, current, threshold):
+    """
+    Returns:
+    - List of (name, metric, baseline value, current value, ratio, regressed) for shared benchmarks.
+    """
+    rows = []
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        metric = primary_metric(result)
+        before, after = baseline["results"][name].get(metric), result[metric]
+        if not before:
+            continue
+        ratio = after / before
+        rows.append((name, metric, before, after, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def report(baseline, current, threshold):
+    """Print the comparison table; returns True if any benchmark regressed."""
+    rows = compare(baseline, current, threshold)
+    print(f"{'benchmark':<44} {'metric':<8} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, metric, before, after, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<44} {metric:<8} {before:>10.4f} {after:>10.4f} {ratio - 1:>+7.1%}{flag}")
+    only_current = sorted(set(current["results"]) - set(baseline["results"]))
+    only_baseline = sorted(set(baseline["results"]) - set(current["results"]))
+    if only_current:
+        print(f"new benchmarks: {', '.join(only_current)}")
+    if only_baseline:
+        print(f"missing from this run: {', '.join(only_baseline)}")
+    regressions = [row for row in rows if row[-1]]
+    print(f"{len(regressions)} of {len(rows)} benchmarks regressed by more than {threshold:.0%}")
+    return bool(regressions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    sys.exit(1 if report(baseline, current, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
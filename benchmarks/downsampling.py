@@ -0,0 +1,55 @@
+"""
+Plot downsampling: LTTB cost and payload reduction for long intraday histories.
+
+Builds a random-walk series of `--points` one-minute bars, reduces it to `--max-points` with
+`lttb_indices`, and reports the time taken, the size of the series as JSON before and after,
+and the largest vertical gap between the full series and the downsampled line (as a share of
+the series range), which shows how much of the visual shape survives.
+
+Usage:
+    python benchmarks/downsampling.py [--points 260000] [--max-points 2000] [--repeat 5]
+"""
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from PortfolioOptimizer.components.downsampling import lttb_indices
+
+
+def best_time(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def json_bytes(ds, y):
+    return len(json.dumps({"ds": pd.DatetimeIndex(ds).strftime("%Y-%m-%dT%H:%M:%S").tolist(), "y": y.tolist()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=260_000)
+    parser.add_argument("--max-points", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    ds = pd.date_range("2024-01-01", periods=args.points, freq="min").to_numpy()
+    y = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, args.points)))
+    x = ds.view(np.int64)
+
+    seconds, indices = best_time(lambda: lttb_indices(x, y, args.max_points), args.repeat)
+    line = np.interp(x.astype(np.float64), x[indices].astype(np.float64), y[indices])
+    error = np.max(np.abs(line - y)) / (y.max() - y.min())
+
+    print(f"LTTB {args.points:,} -> {len(indices):,} points: {1000 * seconds:.1f} ms")
+    print(f"JSON payload: {json_bytes(ds, y) / 1e6:.2f} MB -> {json_bytes(ds[indices], y[indices]) / 1e6:.3f} MB")
+    print(f"Max deviation of the downsampled line: {error:.2%} of the series range")
+
+
+if __name__ == "__main__":
+    main()
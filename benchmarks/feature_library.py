@@ -0,0 +1,109 @@
+"""
+Technical-indicator computation: vectorised symbols x time kernels versus pandas per symbol.
+
+Builds `--symbols` synthetic random-walk candle series of `--bars` bars, computes every indicator
+in params.yaml once with `indicator_frames` (all symbols in one pass) and once with the
+equivalent pandas rolling/ewm calls symbol by symbol, and reports both timings and the largest
+disagreement between them.
+
+Usage:
+    python benchmarks/feature_library.py [--symbols 500] [--bars 730] [--repeat 3]
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from PortfolioOptimizer.utils.utils import read_yaml
+from PortfolioOptimizer.components.indicators import indicator_frames
+
+
+def best_time(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def synthetic_frames(symbols, bars, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2023-01-01", periods=bars, freq="D")
+    frames = {}
+    for i in range(symbols):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, bars)))
+        spread = close * rng.uniform(0.005, 0.05, bars)
+        frames[f"SYM{i}"] = pd.DataFrame({
+            "ds": dates, "Open": close * (1 + rng.normal(0, 0.01, bars)), "High": close + spread,
+            "Low": close - spread, "y": close, "Volume": rng.uniform(1e3, 1e6, bars),
+        })
+    return frames
+
+
+def pandas_indicators(frame, spec):
+    """The same indicators written the naive way: pandas rolling/ewm on one symbol."""
+    close, features = frame["y"], {}
+    wilder = lambda series, window: series.ewm(alpha=1.0 / window, adjust=False).mean()
+    ewm = lambda series, span: series.ewm(span=span, adjust=False).mean()
+    for p in spec.get("returns", {}).get("periods", []):
+        features[f"Return_{p}"] = close.pct_change(p)
+    for p in spec.get("log_returns", {}).get("periods", []):
+        features[f"Log_Return_{p}"] = np.log(close).diff(p)
+    for w in spec.get("rolling", {}).get("windows", []):
+        mean, std = close.rolling(w).mean(), close.rolling(w).std()
+        features.update({f"Rolling_Mean_{w}": mean, f"Rolling_Std_{w}": std, f"Zscore_{w}": (close - mean) / std})
+    for span in spec.get("ema", {}).get("spans", []):
+        features[f"EMA_{span}"] = ewm(close, span)
+    if "rsi" in spec:
+        w = spec["rsi"]["window"]
+        delta = close.diff()
+        gains, losses = wilder(delta.clip(lower=0), w), wilder(-delta.clip(upper=0), w)
+        features[f"RSI_{w}"] = 100 - 100 / (1 + gains / losses)
+    if "macd" in spec:
+        m = spec["macd"]
+        line = ewm(close, m["fast"]) - ewm(close, m["slow"])
+        features.update({"MACD": line, "MACD_Signal": ewm(line, m["signal"]), "MACD_Hist": line - ewm(line, m["signal"])})
+    if "atr" in spec:
+        w = spec["atr"]["window"]
+        previous = close.shift()
+        true_range = pd.concat([frame["High"] - frame["Low"], (frame["High"] - previous).abs(),
+                                (frame["Low"] - previous).abs()], axis=1).max(axis=1)
+        features[f"ATR_{w}"] = wilder(true_range, w)
+    if "bollinger" in spec:
+        w, k = spec["bollinger"]["window"], spec["bollinger"]["num_std"]
+        mean, std = close.rolling(w).mean(), close.rolling(w).std()
+        features.update({f"BB_Upper_{w}": mean + k * std, f"BB_Lower_{w}": mean - k * std,
+                         f"BB_Width_{w}": 2 * k * std / mean})
+    for w in spec.get("realized_volatility", {}).get("windows", []):
+        features[f"Realized_Vol_{w}"] = np.sqrt((np.log(close).diff() ** 2).rolling(w).sum())
+    for lag in spec.get("lags", {}).get("lags", []):
+        features[f"Lag_{lag}"] = close.shift(lag)
+    return pd.DataFrame(features)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--params", default="params.yaml")
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--bars", type=int, default=730)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    spec = read_yaml(args.params)["features"].to_dict()
+    frames = synthetic_frames(args.symbols, args.bars)
+    vectorised, fast = best_time(lambda: indicator_frames(frames, spec), args.repeat)
+    naive, slow = best_time(lambda: {s: pandas_indicators(f, spec) for s, f in frames.items()}, args.repeat)
+
+    worst = 0.0
+    for symbol, expected in slow.items():
+        actual = fast[symbol][expected.columns]
+        scale = expected.abs().where(expected.abs() > 1, 1)
+        worst = max(worst, float(((actual - expected).abs() / scale).max().max()))
+    print(f"{args.symbols} symbols x {args.bars} bars, {len(next(iter(fast.values())).columns)} features")
+    print(f"vectorised: {vectorised * 1000:9.1f} ms")
+    print(f"pandas:     {naive * 1000:9.1f} ms  ({naive / vectorised:.1f}x slower)")
+    print(f"largest relative difference: {worst:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Forecast intervals: cost of the residual-bootstrap quantiles next to the point forecast.
+
+Builds `--symbols` random-walk series of `--bars` closes and times `horizon_quantiles` for every
+symbol and horizon 1 .. `--horizon` in one batch, then reports the empirical coverage of each
+interval on the following `--horizon` closes of fresh random walks (which should come close to the
+nominal coverage, since the series are stationary in their returns).
+
+Usage:
+    python benchmarks/intervals.py [--symbols 500] [--bars 1100] [--horizon 180] [--window 365] [--repeat 3]
+"""
+import time
+import argparse
+import numpy as np
+from PortfolioOptimizer.components.forecastintervals import horizon_quantiles
+
+QUANTILES = [0.05, 0.25, 0.75, 0.95]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--bars", type=int, default=1100)
+    parser.add_argument("--horizon", type=int, default=180)
+    parser.add_argument("--window", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    steps = rng.normal(0, 0.03, (args.symbols, args.bars + args.horizon))
+    log_closes = np.cumsum(steps, axis=1)
+    history, future = log_closes[:, :args.bars], log_closes[:, args.bars:]
+    horizons = np.arange(1, args.horizon + 1)
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        offsets = horizon_quantiles(list(history), horizons, QUANTILES, args.window)
+        timings.append(time.perf_counter() - start)
+    print(f"{args.symbols} symbols x {args.horizon} horizons: {1000 * min(timings):.1f} ms")
+
+    # A driftless random walk's point forecast is its last close
+    errors = future - history[:, -1:]
+    for low, high in ((0, 3), (1, 2)):
+        inside = (errors >= offsets[:, low]) & (errors <= offsets[:, high])
+        nominal = QUANTILES[high] - QUANTILES[low]
+        print(f"{nominal:.0%} interval: empirical coverage {inside.mean():.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Per-symbol DataProcessing time with cold Prophet/ETS fits versus warm starts.
+
+For every symbol with raw data, the previous day's state is produced by processing the
+history minus its last `--new-rows` candles; the full history is then processed once from
+scratch (the old behaviour) and once warm-started from that state (a daily incremental run).
+Nothing is written to the artifact store.
+
+Usage:
+    python benchmarks/processing_warm_start.py [--symbols BTCUSDT ETHUSDT] [--new-rows 1] [--repeat 3]
+"""
+import argparse
+import logging
+import time
+import warnings
+from PortfolioOptimizer.utils.utils import read_yaml
+from PortfolioOptimizer.components.artifactstore import get_artifact_store
+from PortfolioOptimizer.components.dataprocessing import DataProcessing
+
+warnings.filterwarnings("ignore")
+logging.getLogger("cmdstanpy").disabled = True
+logging.getLogger("prophet").disabled = True
+
+
+def best_time(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        processor = run()
+        timings.append(time.perf_counter() - start)
+    return min(timings), processor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--symbols", nargs="*")
+    parser.add_argument("--new-rows", type=int, default=1, help="Candles appended since the previous run.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    config = read_yaml(args.config)
+    store = get_artifact_store(config)
+    symbols = args.symbols or [s for s in config["symbols"]["currencies"] if store.exists("raw", s)]
+    processing = dict(config["processing"])
+
+    print(f"{'symbol':<10} {'rows':>7} {'cold (s)':>10} {'warm (s)':>10} {'speedup':>8}  warm mode")
+    total_cold = total_warm = 0.0
+    for symbol in symbols:
+        raw = store.read("raw", symbol)
+        previous = DataProcessing(raw.iloc[:-args.new_rows], **processing)
+        previous.process_data()
+
+        def cold():
+            processor = DataProcessing(raw, **processing)
+            processor.process_data()
+            return processor
+
+        def warm():
+            processor = DataProcessing(raw, fit_state=previous.fit_state, **processing)
+            processor.process_data()
+            return processor
+
+        cold_seconds, _ = best_time(cold, args.repeat)
+        warm_seconds, processor = best_time(warm, args.repeat)
+        total_cold += cold_seconds
+        total_warm += warm_seconds
+        mode = "full refit (drift)" if processor.full_refit else "warm start"
+        print(f"{symbol:<10} {len(raw):>7} {cold_seconds:>10.3f} {warm_seconds:>10.3f} "
+              f"{cold_seconds / warm_seconds:>7.1f}x  {mode}")
+    if symbols:
+        print(f"{'total':<10} {'':>7} {total_cold:>10.3f} {total_warm:>10.3f} {total_cold / total_warm:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+API startup benchmark and import budget.
+
+Imports `main` in fresh interpreters under `python -X importtime` and reports the median import
+time, the slowest top-level imports and any heavy library that was loaded eagerly. With `--serve`
+it also times a real `uvicorn main:app` process from launch until its port accepts connections.
+Exits with status 1 when the median import time exceeds `--budget-ms` or a heavy library is
+imported at startup, so the budget can gate CI.
+
+Usage:
+    python benchmarks/startup.py [--runs 5] [--budget-ms 1000] [--top 15] [--serve]
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Libraries that must only load once a route needs them (or during the background warm-up)
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "scipy", "sklearn", "statsmodels", "prophet", "xgboost",
+                 "matplotlib", "seaborn", "plotly")
+
+CHILD = """
+import sys, time, json
+start = time.perf_counter()
+import main
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "heavy": sorted(name for name in %r if name in sys.modules)}))
+""" % (HEAVY_MODULES,)
+
+
+def parse_importtime(stderr):
+    """
+    Returns:
+    - List of (cumulative microseconds, module) for top-level imports, slowest first.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented (two spaces per level) under the module that triggered them
+        if not name.startswith("  "):
+            imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)
+
+
+def import_main():
+    """Import `main` in a fresh interpreter; returns (seconds, heavy modules loaded, top-level imports)."""
+    env = {**os.environ, "METRICS_RECORDS_FILE": ""}
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD], cwd=REPO_ROOT,
+                               capture_output=True, text=True, env=env)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing main failed:\n{completed.stderr[-2000:]}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return result["seconds"], result["heavy"], parse_importtime(completed.stderr)
+
+
+def time_to_listen(port, timeout=60.0):
+    """Seconds from launching `uvicorn main:app` until its port accepts connections."""
+    env = {**os.environ, "METRICS_RECORDS_FILE": ""}
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)], cwd=REPO_ROOT,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {process.returncode}")
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=0.05):
+                    return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"Port {port} did not open within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="Allowed median import time of main.")
+    parser.add_argument("--top", type=int, default=15, help="Slowest top-level imports to list.")
+    parser.add_argument("--serve", action="store_true", help="Also time uvicorn until its port opens.")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    # The first import also compiles bytecode; keep it out of the timings
+    import_main()
+    runs = [import_main() for _ in range(args.runs)]
+    median_ms = 1000 * statistics.median(seconds for seconds, _, _ in runs)
+    heavy = sorted({name for _, loaded, _ in runs for name in loaded})
+
+    print(f"import main: median {median_ms:.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print("slowest top-level imports:")
+    for cumulative, name in runs[-1][2][:args.top]:
+        print(f"  {cumulative / 1000:>9.1f} ms  {name}")
+    if args.serve:
+        print(f"uvicorn time to listen: {1000 * time_to_listen(args.port):.1f} ms")
+
+    failed = False
+    if heavy:
+        print(f"FAIL: heavy libraries imported at startup: {', '.join(heavy)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"FAIL: import time {median_ms:.1f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
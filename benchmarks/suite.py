@@ -0,0 +1,268 @@
+"""
+Benchmark suite: pipeline stages and API routes on synthetic klines at several scales.
+
+Every scale ("SYMBOLSxBARS[@interval]") runs in a fresh process inside a throwaway workspace
+(see fixtures.py) and times:
+- ingestion.process_data     parsing raw kline pages into typed frames, all symbols
+- processing.process_data    DataProcessing with Prophet/ETS and indicators, `--sample` symbols
+- training.train_model       XGBoostForecasting training, `--sample` symbols
+- training.forecast          XGBoostForecasting forecast, `--sample` symbols
+- load_data.cold / .warm     ModelForecasting.load_data for all symbols, empty / filled cache
+- route:<path>               in-process ASGI requests at `--concurrency` (p50/p95 latency, throughput)
+- page:/CoinsForecasting     streamed forecast page for up to 20 symbols: time to first byte, total
+                             time and gzip-compressed payload size
+Stages report the median of `--repeat` runs plus the traced Python peak memory of one more run;
+each scale also reports the process's peak RSS. Results are written as JSON and, with
+`--baseline`, compared against an earlier run (exit status 1 on regressions, see compare.py).
+
+Usage:
+    python benchmarks/suite.py [--scales 5x730 50x730 500x730 5x50000@1h] [--sample 2]
+        [--repeat 3] [--concurrency 16] [--requests 200] [--output FILE]
+        [--baseline FILE] [--threshold 0.2]
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import resource
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+import multiprocessing
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SCALES = ["5x730", "50x730", "500x730", "5x50000@1h"]
+
+
+def measure(run, repeat, trace_memory=True):
+    """Median/min wall time over `repeat` runs, plus the traced peak of one extra run."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    result = {"seconds": statistics.median(timings), "min_seconds": min(timings), "runs": repeat}
+    if trace_memory:
+        tracemalloc.start()
+        run()
+        result["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+        tracemalloc.stop()
+    return result
+
+
+async def load_test(app, path, concurrency, requests):
+    """Fire `requests` GETs at `path` with at most `concurrency` in flight."""
+    import httpx
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        await client.get(path)
+        latencies, errors = [], 0
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - start)
+                errors += response.status_code >= 400
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "p50_ms": round(1000 * latencies[len(latencies) // 2], 3),
+        "p95_ms": round(1000 * latencies[int(len(latencies) * 0.95) - 1], 3),
+        "max_ms": round(1000 * latencies[-1], 3),
+        "rps": round(requests / elapsed, 1),
+        "errors": errors,
+        "concurrency": concurrency,
+    }
+
+
+async def page_test(app, path, headers=None):
+    """Time to first byte, total time and wire size of one streamed GET (rendered once beforehand)."""
+    import httpx
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        await client.get(path, headers=headers)
+        start = time.perf_counter()
+        first_byte, size = None, 0
+        async with client.stream("GET", path, headers=headers) as response:
+            async for chunk in response.aiter_raw():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - start
+                size += len(chunk)
+        total = time.perf_counter() - start
+    return {
+        "ttfb_ms": round(1000 * (first_byte or total), 3),
+        "total_ms": round(1000 * total, 3),
+        "bytes": size,
+        "errors": int(response.status_code >= 400),
+    }
+
+
+def run_scale(scale, args):
+    """Build the workspace for `scale` and run every benchmark in it (executed in a fresh process)."""
+    sys.path.insert(0, REPO_ROOT)
+    import logging
+    from fixtures import build_workspace, parse_scale
+    from PortfolioOptimizer.logging import logger
+    from PortfolioOptimizer.utils.utils import read_yaml
+
+    logger.setLevel(logging.WARNING)
+    logging.getLogger("cmdstanpy").disabled = True
+    logging.getLogger("prophet").disabled = True
+    symbols, bars, interval = parse_scale(scale)
+    base_config = read_yaml(os.path.join(REPO_ROOT, "config", "config.yaml"))
+    base_params = read_yaml(os.path.join(REPO_ROOT, "params.yaml"))
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix="bench-") as root:
+        config, klines = build_workspace(root, symbols, bars, interval, base_config, base_params)
+        os.chdir(root)
+
+        from PortfolioOptimizer.components.artifactstore import get_artifact_store
+        from PortfolioOptimizer.components.dataingestion_binance import klines_to_frame
+        from PortfolioOptimizer.components.dataprocessing import DataProcessing
+        from PortfolioOptimizer.components.modeltrainingXGBoost import XGBoostForecasting
+        from PortfolioOptimizer.components.modelforecasting import ModelForecasting, load_data_cache
+        from PortfolioOptimizer.components.modelregistry import get_model_registry, training_fingerprint
+        from PortfolioOptimizer.pipeline.stage03_ModelTrainingXGBoost import training_params
+
+        store = get_artifact_store(config)
+        names = config['symbols']['currencies']
+        sample = names[:args.sample]
+        raw = {symbol: store.read("raw", symbol) for symbol in sample}
+        processed = {symbol: store.read("processed", symbol) for symbol in sample}
+
+        results["ingestion.process_data"] = measure(
+            lambda: [klines_to_frame(rows) for rows in klines.values()], args.repeat)
+        results["processing.process_data"] = measure(
+            lambda: [DataProcessing(raw[s], features=base_params.get('features')).process_data() for s in sample],
+            args.heavy_repeat, trace_memory=False)
+
+        def forecaster(symbol):
+            model = XGBoostForecasting(processed[symbol], 'ds', 'y', config)
+            model.preprocess_data()
+            return model
+
+        def train():
+            return [forecaster(s).train_model(config['training']['training_period']) for s in sample]
+
+        results["training.train_model"] = measure(train, args.heavy_repeat, trace_memory=False)
+        # Register the sample's models so /forecast can serve them
+        trained = {}
+        registry, params = get_model_registry(config), training_params(config)
+        for symbol in sample:
+            trained[symbol] = forecaster(symbol)
+            trained[symbol].train_model(config['training']['training_period'])
+            registry.register(symbol, trained[symbol].model, {
+                **trained[symbol].model_metadata(),
+                "params": params,
+                "fingerprint": training_fingerprint(store, [symbol], params),
+            })
+        results["training.forecast"] = measure(
+            lambda: [trained[s].forecast(config['forecast_period']) for s in sample], args.repeat)
+
+        model_forecasting = ModelForecasting(config_path="config/config.yaml")
+
+        def load_all():
+            return [model_forecasting.load_data(s) for s in names]
+
+        def load_cold():
+            load_data_cache.clear()
+            load_all()
+
+        load_data_cache.maxsize = max(load_data_cache.maxsize, len(names))
+        results["load_data.cold"] = measure(load_cold, args.repeat)
+        load_all()
+        results["load_data.warm"] = measure(load_all, args.repeat)
+
+        if not args.skip_routes:
+            from main import app
+            from routes import dependencies
+
+            routes = ["/", f"/forecast/{sample[0]}?horizon=30", "/portfolio?method=min_variance",
+                      f"/SeabornForecastPlot?symbol={sample[0]}", f"/CoinsForecasting?currencies={sample[0]}"]
+            try:
+                for path in routes:
+                    results[f"route:{path.split('?')[0]}"] = asyncio.run(
+                        load_test(app, path, args.concurrency, args.requests))
+                page = f"/CoinsForecasting?currencies={','.join(names[:20])}&display=true"
+                results["page:/CoinsForecasting"] = asyncio.run(
+                    page_test(app, page, headers={"Accept-Encoding": "gzip"}))
+            finally:
+                dependencies.render_pool().shutdown()
+
+    results = {f"{scale}/{name}": result for name, result in results.items()}
+    results[f"{scale}/peak_rss_mb"] = {"value": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="*", default=DEFAULT_SCALES)
+    parser.add_argument("--sample", type=int, default=2, help="Symbols used for the per-symbol model stages.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--heavy-repeat", type=int, default=1, help="Repeats for Prophet/ETS and XGBoost training.")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--skip-routes", action="store_true")
+    parser.add_argument("--output", help="Result file (defaults to benchmarks/results/<timestamp>.json).")
+    parser.add_argument("--baseline", help="Earlier result file to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before a regression.")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": {},
+    }
+    for scale in args.scales:
+        print(f"Running scale {scale} ...", flush=True)
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            report["results"].update(executor.submit(run_scale, scale, args).result())
+
+    output = args.output or os.path.join(REPO_ROOT, "benchmarks", "results",
+                                         f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    for name, result in report["results"].items():
+        summary = ", ".join(f"{key}={value}" for key, value in result.items())
+        print(f"{name:<48} {summary}")
+    print(f"Saved results to {output}")
+
+    if args.baseline:
+        from compare import report as compare_report
+
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare_report(baseline, report, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
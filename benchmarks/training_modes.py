@@ -0,0 +1,66 @@
+"""
+XGBoost training time per mode as the number of symbols grows.
+
+For the first 1, 2, ... N symbols with processed data, trains and forecasts once per symbol
+(the per-symbol mode) and once across all of them (the panel mode). Nothing is written to the
+artifact store.
+
+Usage:
+    python benchmarks/training_modes.py [--symbols BTCUSDT ETHUSDT] [--repeat 1]
+"""
+import argparse
+import time
+from PortfolioOptimizer.utils.utils import read_yaml
+from PortfolioOptimizer.components.artifactstore import get_artifact_store
+from PortfolioOptimizer.components.modeltrainingXGBoost import XGBoostForecasting, PanelXGBoostForecasting
+
+
+def best_time(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def per_symbol(frames, config):
+    for data in frames.values():
+        model = XGBoostForecasting(data=data, date_column='ds', target_column='y', config=config)
+        model.preprocess_data()
+        model.train_model(training_period=config['training']['training_period'])
+        model.forecast(future_periods=config['forecast_period'])
+
+
+def panel(frames, config):
+    model = PanelXGBoostForecasting(
+        frames, config,
+        training_period=config['training']['training_period'],
+        horizon_stride=config['training']['horizon_stride'],
+    )
+    model.train_model(future_periods=config['forecast_period'])
+    model.forecast(future_periods=config['forecast_period'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--symbols", nargs="*")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    config = read_yaml(args.config)
+    store = get_artifact_store(config)
+    symbols = args.symbols or [s for s in config["symbols"]["currencies"] if store.exists("processed", s)]
+    frames = {symbol: store.read("processed", symbol) for symbol in symbols}
+
+    print(f"{'symbols':>7} {'per-symbol (s)':>15} {'panel (s)':>10} {'speedup':>8}")
+    for count in range(1, len(symbols) + 1):
+        subset = {symbol: frames[symbol] for symbol in symbols[:count]}
+        separate = best_time(lambda: per_symbol(subset, config), args.repeat)
+        shared = best_time(lambda: panel(subset, config), args.repeat)
+        print(f"{count:>7} {separate:>15.2f} {shared:>10.2f} {separate / shared:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,34 @@
-from fastapi import FastAPI, HTTPException, status
-from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
-from routes import currencies_plots, seaborn_plots
-import subprocess
+from routes import currencies_plots, seaborn_plots, pipeline_jobs, portfolio, forecasts, dependencies
+from PortfolioOptimizer.components import renderpool
+from PortfolioOptimizer.components.renderpool import RenderPoolUnavailable
+from PortfolioOptimizer.instrumentation import RECORDS_ENV, DEFAULT_RECORDS_FILE, get_metrics, span
 import os
-from pydantic import BaseModel
+import asyncio
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Heavy libraries load on first use; optionally load them in the background once the port is open
+    # Records already in the file were reported by earlier API processes
+    get_metrics().skip_records(os.environ.get(RECORDS_ENV, DEFAULT_RECORDS_FILE))
+    api_config = dependencies.config.get('api', {})
+    warm_up = None
+    if api_config.get('warm_up', True):
+        warm_up = asyncio.create_task(dependencies.warm_up_after(api_config.get('warm_up_delay', 1.0)))
+    yield
+    if warm_up is not None:
+        warm_up.cancel()
+    if renderpool.render_pool is not None:
+        renderpool.render_pool.shutdown()
 
 app = FastAPI(
     title="Currency Forecast API",
     description="An API to generate and display forecast plots for selected currencies using Plotly.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Add the CORSMiddleware to allow all origins
@@ -22,10 +40,34 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
-
 app.include_router(currencies_plots.router)
 app.include_router(seaborn_plots.router)
+app.include_router(pipeline_jobs.router)
+app.include_router(portfolio.router)
+app.include_router(forecasts.router)
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    """
+    Time every request under its route template (e.g. /forecast/{symbol}), not the raw path.
+    """
+    with span("http_request", method=request.method) as timing:
+        response = await call_next(request)
+        route = request.scope.get("route")
+        timing.set(route=route.path if route is not None else "unmatched", status=response.status_code)
+    return response
+
+@app.exception_handler(RenderPoolUnavailable)
+async def render_pool_unavailable(request: Request, exc: RenderPoolUnavailable):
+    """
+    Backpressure: shed load with 503 instead of queueing renders without bound, and
+    answer 503 as well while crashed render workers are being replaced.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
 
 @app.get("/")
 async def root():
@@ -37,42 +79,29 @@ async def root():
     }
 
 
-class PipelineResponse(BaseModel):
-    success: bool
-    message: str
-
-@app.post("/run_pipeline", response_model=PipelineResponse)
-async def run_pipeline():
+@app.get("/render_stats")
+async def render_stats():
     """
-    Runs a specified Python pipeline file and checks for success.
+    Per-plot-kind render timings and queue state of the rendering worker pool.
     """
-    pipeline_file = "src/PortfolioOptimizer/pipeline/pipeline.py"  # Replace with your pipeline file name
-    try:
-        # Check if the file exists
-        if not os.path.exists(pipeline_file):
-            raise FileNotFoundError(f"Pipeline file '{pipeline_file}' not found.")
-
-        # Run the pipeline file using subprocess
-        process = subprocess.run(
-            ["python", pipeline_file],
-            capture_output=True,
-            text=True,
-            check=True,  # Raise CalledProcessError for non-zero exit codes
-        )
-
-        return PipelineResponse(success=True, message="Pipeline executed successfully.")
+    return dependencies.render_pool().stats()
 
-    except FileNotFoundError as e:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
-    except subprocess.CalledProcessError as e:
-        # Pipeline execution failed
-        error_message = f"Pipeline execution failed with exit code {e.returncode}. Output: {e.stderr}"
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=error_message)
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """
+    Span metrics (stages, symbols, model fits, file I/O, Binance requests, routes) in the Prometheus text format,
+    including the spans pipeline and streaming processes appended to the records file since the API started.
+    """
+    metrics = get_metrics()
+    await asyncio.to_thread(metrics.ingest_records, os.environ.get(RECORDS_ENV, DEFAULT_RECORDS_FILE))
+    render = dependencies.render_pool().stats()
+    metrics.set("portfolio_render_in_flight", render["in_flight"])
+    metrics.set("portfolio_render_rejected", render["rejected"])
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
-    except Exception as e:
-        # Other unexpected errors
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"An unexpected error occurred: {str(e)}")
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,183 +1,231 @@
 import os
-import pandas as pd
-import io
-import matplotlib.pyplot as plt
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, StreamingResponse
-from fastapi.staticfiles import StaticFiles
-from PortfolioOptimizer.utils.utils import read_yaml
-from PortfolioOptimizer.components.modelforecasting import ModelForecasting
-import plotly.graph_objects as go
+import json
+import asyncio
+import threading
+from collections import OrderedDict
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from PortfolioOptimizer.components.outputstore import MEDIA_TYPES
+from PortfolioOptimizer.components.plotcache import make_etag, plot_version
+from routes.dependencies import PlotOptions, lazy, symbols, model_forecasting, output_store, plot_cache, render_symbol_plot
+from routes.responses import (
+    compress, compressed_response, encoded_etag, etag_matches, etag_response, negotiate_encoding, streaming_response
+)
 
 router = APIRouter(tags=["Currencies Plots"])
 
-config_path = "config/config.yaml"
-config = read_yaml(config_path)
-symbols = config['symbols']['currencies']
-model_forecasting = ModelForecasting(config_path=config_path)
+page_head = """<!DOCTYPE html>
+<html>
+    <head>
+        <meta charset="utf-8">
+        <title>Forecast Results</title>
+        <style>
+            body {{
+                max-width: 1200px;
+                margin: 0 auto;
+                padding: 20px;
+                font-family: Arial, sans-serif;
+            }}
+            h1 {{
+                color: #333;
+                text-align: center;
+            }}
+            h2 {{
+                color: #666;
+                margin-top: 30px;
+            }}
+            .plot-container {{
+                margin-bottom: 40px;
+                min-height: 600px;
+            }}
+        </style>
+        <script src="{plotlyjs_url}"></script>
+    </head>
+    <body>
+        <h1>Forecast Results</h1>
+        {containers}
+"""
+plot_container = """<h2>{symbol}</h2><div id="plot-{symbol}" class="plot-container"></div>
+"""
+page_tail = """    </body>
+</html>
+"""
+
+PLOTLYJS_URL = "/assets/plotly.min.js"
+# plotly.js is versioned with the installed plotly package, so browsers may keep it for a day
+PLOTLYJS_MAX_AGE = 86400
+# Outputs under /display/ are named after their content and never change
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Output-store names of recently built forecast pages, by page ETag
+page_names = OrderedDict()
+MAX_PAGE_NAMES = 1024
+
+
+def data_version(symbol, resolution=None):
+    try:
+        return model_forecasting().plot_data_version(symbol, resolution)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Data files for {symbol} are missing!")
 
-output_dir = "static"
-os.makedirs(output_dir, exist_ok=True)
 
-def generate_plot(symbol):
+async def generate_figure(symbol, options):
     """
-    Generate a Plotly forecast plot for a given symbol.
+    Return the Plotly figure JSON for a given symbol, rendering it in the render pool only when its data changed.
     """
     try:
-        historical_data, forecast_data = model_forecasting.load_data(symbol)
-
-        fig = go.Figure()
-
-        fig.add_trace(go.Scatter(
-            x=historical_data['ds'], 
-            y=historical_data['y'], 
-            mode='lines', 
-            name='Historical Data', 
-            line=dict(color='black')
-        ))
-
-        fig.add_trace(go.Scatter(
-            x=forecast_data['ds'], 
-            y=forecast_data['yhat'], 
-            mode='lines', 
-            name='Forecast', 
-            line=dict(color='red', dash='dash')
-        ))
-
-        fig.update_layout(
-            title=f"{symbol} Forecasting",
-            xaxis_title="Date",
-            yaxis_title="Value",
-            template="plotly_white",  
-            legend=dict(orientation="h", x=0.5, y=-0.2, xanchor="center"),
-            height=600
+        return await plot_cache().get_or_render_async(
+            "plotly_json", options.key(symbol), data_version(symbol, options.resolution),
+            lambda: render_symbol_plot("plotly_json", symbol, options)
         )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
-        return fig.to_html(full_html=False, include_plotlyjs=True)  
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail=f"Data files for {symbol} are missing!")
-    
 
-def generate_matplotlib_plot(symbol):
+async def generate_matplotlib_plot(symbol, options):
     """
-    Generate an enhanced Matplotlib forecast plot for a given symbol.
+    Return the enhanced Matplotlib forecast plot for a given symbol, rendering it in the render pool only when its data changed.
     """
     try:
-        historical_data, forecast_data = model_forecasting.load_data(symbol)
-        
-        forecast_start_date = forecast_data['ds'].iloc[0]
-        today_date = pd.Timestamp.now().normalize()
-        
-        current_value = None
-        if today_date in historical_data['ds'].values:
-            current_value = historical_data.loc[historical_data['ds'] == today_date, 'y'].values[0]
-        
-        plt.figure(figsize=(16, 9))
-        plt.plot(historical_data['ds'], historical_data['y'], label="Historical Data", color="black", linewidth=2)
-        plt.plot(forecast_data['ds'], forecast_data['yhat'], label="Forecast", color="red", linestyle="--", linewidth=2)
-        
-        plt.axvline(forecast_start_date, color="blue", linestyle="--", linewidth=1.5, label="Forecast Start")
-        
-        if current_value is not None:
-            plt.scatter(today_date, current_value, color="green", label=f"Today's Value: {current_value:.2f}", zorder=5)
-            plt.text(
-                today_date, current_value, f" {current_value:.2f}",
-                color="green", fontsize=10, fontweight="bold", verticalalignment="bottom"
-            )
-
-        plt.title(f"{symbol} Forecasting with Highlights", fontsize=18, fontweight="bold")
-        plt.xlabel("Date", fontsize=14)
-        plt.ylabel("Value", fontsize=14)
-        plt.xticks(fontsize=12)
-        plt.yticks(fontsize=12)
-        plt.legend(fontsize=12)
-        plt.grid(True, linestyle="--", alpha=0.6)
-        
-        buffer = io.BytesIO()
-        plt.tight_layout()
-        plt.savefig(buffer, format="png", dpi=150)
-        buffer.seek(0)
-        plt.close()
-
-        return buffer
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail=f"Data files for {symbol} are missing!")
+        return await plot_cache().get_or_render_async(
+            "matplotlib", options.key(symbol), plot_version("matplotlib", data_version(symbol, options.resolution)),
+            lambda: render_symbol_plot("matplotlib", symbol, options)
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+def script_json(value):
+    """JSON bytes that are safe to inline in a <script> element."""
+    return value.replace(b"</", b"<\\/")
+
+
+async def figure_script(symbol, options):
+    """
+    Script drawing one symbol's figure into its placeholder. Failures are reported in the placeholder
+    instead, since the response status has already been sent when figures are streamed.
+    """
+    target = json.dumps(f"plot-{symbol}").encode("utf-8")
+    try:
+        figure = (await generate_figure(symbol, options)).content
+    except Exception as e:
+        detail = e.detail if isinstance(e, HTTPException) else str(e)
+        message = script_json(json.dumps(f"Could not render {symbol}: {detail}").encode("utf-8"))
+        return b"<script>document.getElementById(" + target + b").textContent = " + message + b";</script>\n"
+    return (b"<script>(function (figure) { Plotly.newPlot(" + target + b", figure.data, figure.layout, {responsive: true}); })("
+            + script_json(figure) + b");</script>\n")
+
+
+async def forecast_page_chunks(selected_currencies, options):
+    """
+    Yield the forecast page: the shell with one placeholder per symbol first, then each symbol's
+    figure as soon as it is ready (figures are generated concurrently), then the closing tags.
+    """
+    containers = "".join(plot_container.format(symbol=symbol) for symbol in selected_currencies)
+    yield page_head.format(plotlyjs_url=PLOTLYJS_URL, containers=containers).encode("utf-8")
+    tasks = [asyncio.ensure_future(figure_script(symbol, options)) for symbol in selected_currencies]
+    try:
+        for next_script in asyncio.as_completed(tasks):
+            yield await next_script
+    finally:
+        # Stops renders nobody will receive when the client disconnects mid-stream
+        for task in tasks:
+            task.cancel()
+    yield page_tail.encode("utf-8")
 
 
+async def collect(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
 
 @router.get("/CoinsForecasting")
-async def get_forecast(currencies: str = Query(..., description="Comma-separated list of currency symbols"), display: bool = Query(False, description="Whether to display the plots directly")):
+async def get_forecast(request: Request, currencies: str = Query(..., description="Comma-separated list of currency symbols"), display: bool = Query(False, description="Whether to display the plots directly"), options: PlotOptions = Depends()):
     selected_currencies = currencies.split(",")
     invalid_currencies = [sym for sym in selected_currencies if sym not in symbols]
 
     if invalid_currencies:
         raise HTTPException(status_code=400, detail=f"Invalid symbols: {', '.join(invalid_currencies)}")
 
-    plots = []
-    for symbol in selected_currencies:
-        plot_html = generate_plot(symbol)
-        plots.append(f"<h2>{symbol}</h2>{plot_html}")
-
-    unique_filename = f"forecast_{'_'.join(selected_currencies)}.html"
-    static_dir = "static"
-    os.makedirs(static_dir, exist_ok=True)
-    file_path = os.path.join(static_dir, unique_filename)
-
-    html_template = """
-    <html>
-        <head>
-            <title>Forecast Results</title>
-            <style>
-                body {{
-                    max-width: 1200px;
-                    margin: 0 auto;
-                    padding: 20px;
-                    font-family: Arial, sans-serif;
-                }}
-                h1 {{
-                    color: #333;
-                    text-align: center;
-                }}
-                h2 {{
-                    color: #666;
-                    margin-top: 30px;
-                }}
-                .plot-container {{
-                    margin-bottom: 40px;
-                }}
-            </style>
-        </head>
-        <body>
-            <h1>Forecast Results</h1>
-            <div class="plot-container">
-                {0}
-            </div>
-        </body>
-    </html>
-    """
-
-    combined_html = html_template.format("".join(plots))
-
-    with open(file_path, "w") as f:
-        f.write(combined_html)
+    # Resolved before streaming starts, so missing data is still answered with a 404
+    version = tuple(data_version(symbol, options.resolution) for symbol in selected_currencies)
+    etag = make_etag(repr((options.key(*selected_currencies), version)).encode("utf-8"))
 
     if display:
-        return RedirectResponse(url=f"/static/{unique_filename}")
-    return JSONResponse(content={"url": f"/static/{unique_filename}"})
+        return streaming_response(
+            request, lambda: forecast_page_chunks(selected_currencies, options), "text/html; charset=utf-8", etag
+        )
 
-@router.get("/display/{filename}", response_class=HTMLResponse)
-async def display_plots(filename: str):
-    file_path = os.path.join("static", filename)
-    if not os.path.exists(file_path):
+    # The page is only built when this version has not been stored yet (or was garbage-collected since)
+    name = page_names.get(etag)
+    if name is None or not output_store().exists(name):
+        page = await collect(forecast_page_chunks(selected_currencies, options))
+        name = await asyncio.to_thread(output_store().put, page, ".html")
+        page_names[etag] = name
+        while len(page_names) > MAX_PAGE_NAMES:
+            page_names.popitem(last=False)
+    page_names.move_to_end(etag)
+    content = json.dumps({"url": f"/display/{name}"}).encode("utf-8")
+    return etag_response(request, content, "application/json", etag)
+
+
+@lazy
+def plotlyjs():
+    from plotly.offline import get_plotlyjs
+    source = get_plotlyjs().encode("utf-8")
+    return {"etag": make_etag(source), "variants": {None: source}, "lock": threading.Lock()}
+
+
+def plotlyjs_variant(encoding):
+    """plotly.js in the given content coding, compressed once per coding and kept in memory."""
+    asset = plotlyjs()
+    with asset["lock"]:
+        if encoding not in asset["variants"]:
+            asset["variants"][encoding] = compress(asset["variants"][None], encoding)
+        return asset["variants"][encoding]
+
+
+@router.get(PLOTLYJS_URL)
+async def get_plotlyjs(request: Request):
+    """
+    The plotly.js bundle shared by every forecast page, served compressed and cacheable.
+    """
+    asset = await asyncio.to_thread(plotlyjs)
+    encoding = negotiate_encoding(request)
+    await asyncio.to_thread(plotlyjs_variant, encoding)
+    return compressed_response(
+        request, plotlyjs_variant, "application/javascript", asset["etag"],
+        headers={"Cache-Control": f"public, max-age={PLOTLYJS_MAX_AGE}"}
+    )
+
+@router.get("/display/{filename}")
+async def display_plots(request: Request, filename: str):
+    """
+    Serve a page or plot image from the output store. Names are content hashes, so a name always
+    refers to the same bytes and browsers may cache them for good. Pages are compressed once per
+    coding and the compressed copy is kept in the store.
+    """
+    if not output_store().exists(filename):
+        raise HTTPException(status_code=404, detail="Plot file not found")
+
+    stem, extension = os.path.splitext(filename)
+    # PNG is already compressed
+    encoding = negotiate_encoding(request) if extension != ".png" else None
+    headers = {"ETag": encoded_etag(f'"{stem}"', encoding), "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if extension != ".png":
+        headers["Vary"] = "Accept-Encoding"
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    try:
+        content = await asyncio.to_thread(output_store().read_variant, filename, encoding, compress)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Plot file not found")
-    
-    with open(file_path, "r") as f:
-        content = f.read()
-    return HTMLResponse(content=content)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=content, media_type=MEDIA_TYPES[extension], headers=headers)
 
 @router.get("/CoinForecastingPlots")
 async def get_forecast_enhanced(
-    currencies: list[str] = Query(..., description="List of currency symbols (e.g., ETHUSDT,BTCUSDT)")
+    request: Request,
+    currencies: list[str] = Query(..., description="List of currency symbols (e.g., ETHUSDT,BTCUSDT)"),
+    options: PlotOptions = Depends(),
 ):
     """
     Generate and return Matplotlib forecast plots for multiple currencies.
@@ -190,20 +238,14 @@ async def get_forecast_enhanced(
             detail=f"Invalid symbols: {', '.join(invalid_currencies)}"
         )
 
-    buffers = {}
-    for symbol in currencies:
-        buffer = generate_matplotlib_plot(symbol)
-        buffers[symbol] = buffer
-
-    # Save plots and prepare response
-    plots_dir = "static/plots"
-    os.makedirs(plots_dir, exist_ok=True)
+    # Store the plots under their content hash; identical plots are only written once
     plot_files = []
-    for symbol, buffer in buffers.items():
-        filename = f"{symbol}_forecast.png"
-        file_path = os.path.join(plots_dir, filename)
-        with open(file_path, "wb") as f:
-            f.write(buffer.getvalue())
-        plot_files.append(f"/{plots_dir}/{filename}")
-
-    return JSONResponse(content={"plots": plot_files})
\ No newline at end of file
+    etags = []
+    renders = await asyncio.gather(*(generate_matplotlib_plot(symbol, options) for symbol in currencies))
+    for rendered in renders:
+        name = await asyncio.to_thread(output_store().put, rendered.content, ".png")
+        plot_files.append(f"/display/{name}")
+        etags.append(rendered.etag)
+
+    content = json.dumps({"plots": plot_files}).encode("utf-8")
+    return etag_response(request, content, "application/json", make_etag("".join(etags).encode("utf-8")))
@@ -0,0 +1,115 @@
+import time
+import asyncio
+import threading
+import functools
+from typing import Optional
+from fastapi import HTTPException, Query
+from PortfolioOptimizer.logging import logger
+from PortfolioOptimizer.utils.utils import read_yaml
+
+# Shared by every router. The components below pull in pandas, xgboost and the plotting
+# libraries, so they are imported and built on first use rather than when the API starts.
+config_path = "config/config.yaml"
+config = read_yaml(config_path)
+symbols = config['symbols']['currencies']
+
+
+def lazy(factory):
+    """Build `factory()` on the first call (once, even across threads) and return that object afterwards."""
+    lock = threading.Lock()
+    instance = []
+
+    @functools.wraps(factory)
+    def get():
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+    return get
+
+
+@lazy
+def model_forecasting():
+    from PortfolioOptimizer.components.modelforecasting import get_model_forecasting
+    return get_model_forecasting(config_path)
+
+
+@lazy
+def plot_cache():
+    from PortfolioOptimizer.components.plotcache import get_plot_cache
+    return get_plot_cache(config)
+
+
+@lazy
+def output_store():
+    from PortfolioOptimizer.components.outputstore import get_output_store
+    return get_output_store(config)
+
+
+@lazy
+def render_pool():
+    from PortfolioOptimizer.components.renderpool import get_render_pool
+    return get_render_pool(config)
+
+
+@lazy
+def forecast_inference():
+    from PortfolioOptimizer.components.modelinference import ForecastInference
+    return ForecastInference(config_path=config_path)
+
+
+@lazy
+def portfolio_optimization():
+    from PortfolioOptimizer.components.portfoliooptimization import PortfolioOptimization
+    return PortfolioOptimization(config_path=config_path)
+
+
+class PlotOptions:
+    def __init__(
+        self,
+        max_points: Optional[int] = Query(None, ge=3, description="Points per plotted series (defaults to plots.max_points)"),
+        resolution: Optional[str] = Query(None, description="Plot OHLC bars rolled up to this resolution (see plots.resolutions)"),
+    ):
+        """
+        Downsampling options shared by the plot and series routes (use with `Depends()`).
+        Raises:
+        - HTTPException(400): for a max_points above `plots.max_points_limit` or an unknown resolution.
+        """
+        plots = config['plots']
+        if max_points is not None and max_points > plots['max_points_limit']:
+            raise HTTPException(status_code=400, detail=f"max_points must be at most {plots['max_points_limit']}")
+        if resolution is not None and resolution not in plots['resolutions']:
+            raise HTTPException(status_code=400, detail=f"Unknown resolution {resolution}; use one of {', '.join(plots['resolutions'])}")
+        self.max_points = max_points or plots['max_points']
+        self.resolution = resolution
+
+    def key(self, *symbols):
+        """Plot-cache key of `symbols` plotted with these options; the bare symbols for the defaults the pipeline pre-renders."""
+        if self.max_points == config['plots']['max_points'] and self.resolution is None:
+            return symbols
+        return (*symbols, f"{self.resolution or 'raw'}@{self.max_points}")
+
+
+async def render_symbol_plot(kind, symbol, options):
+    """Downsample the plotted series off the event loop, then render them in the render pool."""
+    frames = await asyncio.to_thread(model_forecasting().plot_data, symbol, options.max_points, options.resolution)
+    return await render_pool().render(kind, symbol, *frames)
+
+
+def warm_up():
+    """Import the heavy libraries and build every shared component ahead of the first requests."""
+    start = time.perf_counter()
+    for component in (model_forecasting, plot_cache, output_store, render_pool, forecast_inference, portfolio_optimization):
+        component()
+    logger.info(f"API warm-up finished in {time.perf_counter() - start:.2f}s")
+
+
+async def warm_up_after(delay):
+    """Run `warm_up` in a worker thread once `delay` seconds have passed, leaving the server time to bind first."""
+    await asyncio.sleep(delay)
+    try:
+        await asyncio.to_thread(warm_up)
+    except Exception as e:
+        # Components that fail here are built (and report the error) on their first request instead
+        logger.warning(f"API warm-up failed: {e}")
@@ -0,0 +1,78 @@
+import json
+import math
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from PortfolioOptimizer.components.plotcache import make_etag
+from routes.dependencies import PlotOptions, symbols, forecast_inference, model_forecasting
+from routes.responses import etag_response
+
+router = APIRouter(tags=["Forecasts"])
+
+
+@router.get("/forecast/{symbol}")
+async def get_symbol_forecast(request: Request, symbol: str, horizon: int = Query(None, ge=1, le=1825)):
+    """
+    Forecast `symbol` for `horizon` days (defaults to `forecast_period`) from its registered model.
+    Returns plain numbers as parallel `ds`/`yhat` arrays (plus one `yhat_q<quantile>` array per
+    forecast quantile), revalidated with an ETag.
+    """
+    if symbol not in symbols:
+        raise HTTPException(status_code=400, detail=f"Invalid symbol: {symbol}")
+    try:
+        forecast, (model_version, _) = await forecast_inference().forecast_async(symbol, horizon)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    content = json.dumps({
+        "symbol": symbol,
+        "horizon": len(forecast),
+        "model_version": model_version,
+        **series_columns(forecast, forecast_columns(forecast)),
+    }, allow_nan=False).encode("utf-8")
+    return etag_response(request, content, "application/json", make_etag(content))
+
+
+def finite_or_none(values):
+    """JSON has no NaN or infinity: missing values (indicator warm-up, quantiles without history) become null."""
+    return [value if math.isfinite(value) else None for value in values]
+
+
+def series_columns(frame, columns):
+    """Parallel JSON arrays of `frame`: ISO dates under "ds" and floats (null where missing) for every other present column."""
+    dates = frame['ds'].dt.strftime("%Y-%m-%dT%H:%M:%S").tolist()
+    series = {"ds": [date if isinstance(date, str) else None for date in dates]}
+    for column in columns:
+        if column in frame:
+            series[column] = finite_or_none(frame[column].astype(float).tolist())
+    return series
+
+
+def forecast_columns(frame):
+    """The point forecast and its quantile columns (`yhat_q<quantile>`), in frame order."""
+    return [column for column in frame.columns if column == "yhat" or column.startswith("yhat_q")]
+
+
+@router.get("/series/{symbol}")
+async def get_symbol_series(request: Request, symbol: str, options: PlotOptions = Depends()):
+    """
+    The plotted historical and forecast series of `symbol` as JSON, downsampled like the plots
+    (`max_points` per series, or OHLC bars at `resolution`).
+    """
+    if symbol not in symbols:
+        raise HTTPException(status_code=400, detail=f"Invalid symbol: {symbol}")
+    try:
+        historical, forecast = await asyncio.to_thread(
+            model_forecasting().plot_data, symbol, options.max_points, options.resolution
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    content = json.dumps({
+        "symbol": symbol,
+        "resolution": options.resolution,
+        "historical": series_columns(historical, ["y", "Open", "High", "Low"] if options.resolution else ["y"]),
+        "forecast": series_columns(forecast, forecast_columns(forecast)),
+    }, allow_nan=False).encode("utf-8")
+    return etag_response(request, content, "application/json", make_etag(content))
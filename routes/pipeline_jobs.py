@@ -0,0 +1,61 @@
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from PortfolioOptimizer.components.pipelinejobs import PipelineJobManager, PipelineBusy
+from routes.dependencies import symbols
+
+router = APIRouter(tags=["Pipeline Jobs"])
+
+pipeline_file = "src/PortfolioOptimizer/pipeline/pipeline.py"
+job_manager = PipelineJobManager(pipeline_file)
+
+def get_job_or_404(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job '{job_id}' not found.")
+    return job
+
+@router.post("/run_pipeline", status_code=status.HTTP_202_ACCEPTED)
+async def run_pipeline(force: bool = Query(False), only: Optional[List[str]] = Query(None)):
+    """
+    Start the pipeline as a background job and return its id immediately.
+    Only one job runs at a time; triggering while a job is active returns that job instead.
+    """
+    unknown = [symbol for symbol in only or [] if symbol not in symbols]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Invalid symbols: {', '.join(unknown)}")
+    try:
+        job, deduplicated = job_manager.submit(force=force, only=only)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except PipelineBusy as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e), headers={"Retry-After": "1"})
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"job_id": job.job_id, "status": job.status, "deduplicated": deduplicated,
+                 "status_url": f"/jobs/{job.job_id}"},
+        headers={"Location": f"/jobs/{job.job_id}"},
+    )
+
+@router.get("/jobs")
+async def list_jobs(limit: int = Query(20, ge=1, le=200)):
+    """
+    Most recent pipeline jobs, newest first.
+    """
+    return {"jobs": job_manager.list_jobs(limit)}
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Job status with per-symbol stage progress and timings.
+    """
+    job = get_job_or_404(job_id)
+    return {**job.to_dict(), "progress": job_manager.progress(job)}
+
+@router.get("/jobs/{job_id}/logs")
+async def get_job_logs(job_id: str, lines: int = Query(100, ge=1, le=5000)):
+    """
+    Last `lines` lines of the job's combined stdout/stderr.
+    """
+    job = get_job_or_404(job_id)
+    return {"job_id": job.job_id, "status": job.status, "lines": job_manager.log_tail(job, lines)}
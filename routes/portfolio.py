@@ -0,0 +1,54 @@
+import asyncio
+from typing import List, Literal, Optional
+from fastapi import APIRouter, HTTPException, Query
+from routes.dependencies import symbols, portfolio_optimization
+
+router = APIRouter(tags=["Portfolio Optimization"])
+
+
+def validate_symbols(selected):
+    unknown = [symbol for symbol in selected or [] if symbol not in symbols]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Invalid symbols: {', '.join(unknown)}")
+    if selected is not None and len(set(selected)) < 2:
+        raise HTTPException(status_code=400, detail="At least two distinct symbols are required.")
+    return list(dict.fromkeys(selected)) if selected else None
+
+
+async def run_optimizer(function, *args, **kwargs):
+    """
+    Run a solve in a worker thread so the event loop keeps serving other requests.
+    """
+    try:
+        return await asyncio.to_thread(function, *args, **kwargs)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/portfolio")
+async def get_portfolio(
+    method: Literal["mean_variance", "min_variance", "risk_parity"] = Query("mean_variance"),
+    symbols: Optional[List[str]] = Query(None),
+    risk_aversion: Optional[float] = Query(None, gt=0),
+):
+    """
+    Long-only allocation across the selected symbols (all configured currencies by default).
+    Expected returns come from the XGBoost forecasts, the covariance from recent candle returns.
+    """
+    return await run_optimizer(
+        portfolio_optimization().optimize, method, validate_symbols(symbols), risk_aversion=risk_aversion
+    )
+
+
+@router.get("/portfolio/frontier")
+async def get_efficient_frontier(
+    symbols: Optional[List[str]] = Query(None),
+    points: Optional[int] = Query(None, ge=2, le=500),
+):
+    """
+    Long-only efficient frontier, solved for every point in a single batch.
+    """
+    frontier = await run_optimizer(portfolio_optimization().efficient_frontier, validate_symbols(symbols), points)
+    return {"points": frontier}
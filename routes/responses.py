@@ -0,0 +1,128 @@
+import zlib
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+try:
+    import brotli
+except ImportError:  # optional: without it responses are only gzip-compressed
+    brotli = None
+
+# Content codings we can produce, most preferred first
+CONTENT_CODINGS = ("br", "gzip")
+
+
+def etag_matches(request: Request, etag):
+    """Whether the request's If-None-Match header already names `etag`."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def etag_response(request: Request, content, media_type, etag, headers=None):
+    """
+    Serve `content` with a strong ETag, or an empty 304 if the client already holds it.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache", **(headers or {})}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type=media_type, headers=headers)
+
+
+def negotiate_encoding(request: Request):
+    """Best content coding the client accepts ("br" only when brotli is installed, then "gzip"), or None."""
+    accepted = {}
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, _, parameters = part.partition(";")
+        quality = 1.0
+        parameters = parameters.strip()
+        if parameters.startswith("q="):
+            try:
+                quality = float(parameters[2:])
+            except ValueError:
+                quality = 0.0
+        if coding.strip():
+            accepted[coding.strip().lower()] = quality
+    for coding in CONTENT_CODINGS:
+        if coding == "br" and brotli is None:
+            continue
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+def encoded_etag(etag, encoding):
+    """A strong ETag must differ between content codings of the same representation."""
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+
+class StreamCompressor:
+    def __init__(self, encoding):
+        """
+        Incremental gzip or brotli compressor whose every chunk is flushed, so the client can
+        decode (and render) each part of a streamed response as soon as it arrives.
+        """
+        self.encoding = encoding
+        if encoding == "br":
+            self.compressor = brotli.Compressor(quality=5)
+        else:
+            self.compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, chunk):
+        if self.encoding == "br":
+            return self.compressor.process(chunk) + self.compressor.flush()
+        return self.compressor.compress(chunk) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self.encoding == "br":
+            return self.compressor.finish()
+        return self.compressor.flush()
+
+
+def compress(content, encoding):
+    """One-shot compression of `content` with `encoding` (None returns it unchanged)."""
+    if encoding is None:
+        return content
+    compressor = StreamCompressor(encoding)
+    return compressor.compress(content) + compressor.finish()
+
+
+def streaming_response(request: Request, chunks, media_type, etag=None, headers=None):
+    """
+    Stream the byte chunks yielded by `chunks()` (an async generator function, only called when
+    a body is sent), compressed with the coding negotiated for this request.
+    With `etag`, answers an empty 304 when the client already holds this version.
+    """
+    encoding = negotiate_encoding(request)
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding", **(headers or {})}
+    if etag is not None:
+        headers["ETag"] = encoded_etag(etag, encoding)
+        if etag_matches(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+
+    async def body():
+        compressor = StreamCompressor(encoding) if encoding is not None else None
+        async for chunk in chunks():
+            yield compressor.compress(chunk) if compressor is not None else chunk
+        if compressor is not None:
+            yield compressor.finish()
+
+    return StreamingResponse(body(), media_type=media_type, headers=headers)
+
+
+def compressed_response(request: Request, variants, media_type, etag, headers=None):
+    """
+    Serve one of several pre-compressed copies of the same content with a coding-specific ETag.
+    Parameters:
+    - variants: Callable taking a coding (or None) and returning the bytes in that coding, e.g. cached per coding.
+    """
+    encoding = negotiate_encoding(request)
+    headers = {"ETag": encoded_etag(etag, encoding), "Vary": "Accept-Encoding", **(headers or {})}
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=variants(encoding), media_type=media_type, headers=headers)
@@ -0,0 +1,265 @@
+import os
+import time
+import hashlib
+import pandas as pd
+from PortfolioOptimizer.logging import logger
+from PortfolioOptimizer.instrumentation import span
+
+# kind -> (config path key, file stem, datetime column)
+ARTIFACT_KINDS = {
+    "raw": ("artifacts_dir", "{symbol}_2Y", "Open Time"),
+    "processed": ("processed_dir", "{symbol}_Featured", "ds"),
+    "forecast": ("foresast_dir", "{symbol}_Forecast", "ds"),
+    "live": ("live_dir", "{symbol}_Live", "Open Time"),
+    "rollup": ("rollup_dir", "{symbol}_Rollups", "ds"),
+}
+# Kinds stored with their datetime column as the index
+INDEXED_KINDS = ("raw", "live")
+# Appended segments an artifact may collect before they are folded back into its main file
+DEFAULT_COMPACT_SEGMENTS = 64
+
+
+class ArtifactStore:
+    """
+    Base class for per-symbol pipeline artifacts.
+    Raw candles and streamed live features are stored indexed by "Open Time"; processed, forecast and OHLC rollup frames keep
+    "ds" as a datetime column. Subclasses only implement the on-disk format.
+    Appended rows go to small segment files in `<artifact>.segments/` next to the main file, so an append
+    costs the size of the new rows rather than of the history; reads stitch the segments back on, and
+    every `compact_segments` appends they are folded into the main file.
+    """
+    extension = None
+
+    def __init__(self, config):
+        """
+        Parameters:
+        - config: Pipeline configuration (ConfigBox) providing the `paths` and `artifact_store` sections.
+        """
+        self.directories = {kind: config["paths"][key] for kind, (key, _, _) in ARTIFACT_KINDS.items()}
+        self.compact_segments = config.get("artifact_store", {}).get("compact_segments", DEFAULT_COMPACT_SEGMENTS)
+
+    def path(self, kind, symbol):
+        _, stem, _ = ARTIFACT_KINDS[kind]
+        return os.path.join(self.directories[kind], stem.format(symbol=symbol) + self.extension)
+
+    def segment_dir(self, kind, symbol):
+        return self.path(kind, symbol) + ".segments"
+
+    def segments(self, kind, symbol):
+        """Paths of the artifact's appended segments, oldest first."""
+        segment_dir = self.segment_dir(kind, symbol)
+        try:
+            names = os.listdir(segment_dir)
+        except FileNotFoundError:
+            return []
+        return [os.path.join(segment_dir, name) for name in sorted(names) if name.endswith(self.extension)]
+
+    def files(self, kind, symbol):
+        """The main file followed by its segments: every file the artifact's content is read from."""
+        return [self.path(kind, symbol), *self.segments(kind, symbol)]
+
+    def exists(self, kind, symbol):
+        return os.path.exists(self.path(kind, symbol))
+
+    def signature(self, kind, symbol):
+        """Return (mtime_ns, size) of the artifact across its segments; changes whenever the artifact is rewritten or appended to."""
+        stats = [os.stat(path) for path in self.files(kind, symbol)]
+        return max(stat.st_mtime_ns for stat in stats), sum(stat.st_size for stat in stats)
+
+    def digest(self, kind, symbol):
+        """
+        Return the SHA-256 of the artifact's content; unlike `signature`, unchanged by a rewrite of identical data.
+        Compacting the segments changes the digest once, even though the rows stay the same.
+        """
+        digest = hashlib.sha256()
+        for path in self.files(kind, symbol):
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+    def read(self, kind, symbol, columns=None):
+        """
+        Load an artifact.
+        Parameters:
+        - kind: One of ARTIFACT_KINDS ("raw", "processed", "forecast", "live" or "rollup").
+        - symbol: The coin symbol.
+        - columns: Optional list of columns to load (the datetime index/column is always kept).
+        Raises:
+        - FileNotFoundError: if the artifact does not exist.
+        """
+        path = self.path(kind, symbol)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Artifact not found: {path}")
+        with span("artifact_read", kind=kind, format=self.extension.lstrip(".")) as timing:
+            df, size = self._read(path, kind, columns), os.path.getsize(path)
+            parts = [df]
+            for segment in self.segments(kind, symbol):
+                try:
+                    parts.append(self._read(segment, kind, columns))
+                    size += os.path.getsize(segment)
+                except FileNotFoundError:
+                    # Folded into the main file by a concurrent compaction
+                    continue
+            if len(parts) > 1:
+                df = pd.concat(parts)
+                if kind in INDEXED_KINDS:
+                    # A read racing a compaction can see a segment both in the main file and on its own
+                    df = df[~df.index.duplicated(keep="last")]
+            timing.set(rows=len(df), bytes=size)
+        return df
+
+    def _write_file(self, path, kind, df):
+        """Write one file atomically (temp file + rename) so readers never see a torn file."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        try:
+            with span("artifact_write", kind=kind, format=self.extension.lstrip(".")) as timing:
+                self._write(tmp_path, kind, df)
+                timing.set(rows=len(df), bytes=os.path.getsize(tmp_path))
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _remove_segments(self, segments):
+        for segment in segments:
+            try:
+                os.remove(segment)
+            except FileNotFoundError:
+                pass
+
+    def write(self, kind, symbol, df):
+        """Write an artifact atomically, replacing its main file and dropping any appended segments."""
+        path = self.path(kind, symbol)
+        segments = self.segments(kind, symbol)
+        self._write_file(path, kind, df)
+        self._remove_segments(segments)
+        logger.info(f"Saved {kind} artifact for {symbol} at: {path}")
+
+    def append(self, kind, symbol, df):
+        """
+        Append rows to an existing artifact by writing them as a new segment.
+        Raises:
+        - FileNotFoundError: if the artifact does not exist.
+        """
+        path = self.path(kind, symbol)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Artifact not found: {path}")
+        # Zero-padded nanoseconds keep the segments in append order when listed by name
+        segment = os.path.join(self.segment_dir(kind, symbol), f"{time.time_ns():020d}-{os.getpid()}{self.extension}")
+        self._write_file(segment, kind, df)
+        if len(self.segments(kind, symbol)) >= self.compact_segments:
+            self.compact(kind, symbol)
+
+    def compact(self, kind, symbol):
+        """Fold the artifact's segments into its main file, keeping the last copy of any repeated index for indexed kinds."""
+        segments = self.segments(kind, symbol)
+        if not segments:
+            return
+        with span("artifact_compact", kind=kind, format=self.extension.lstrip(".")) as timing:
+            parts = [self._read(self.path(kind, symbol), kind, None), *(self._read(segment, kind, None) for segment in segments)]
+            df = pd.concat(parts)
+            if kind in INDEXED_KINDS:
+                # Overlapping appends (e.g. the stream and a batch run) must not leave duplicate bars behind
+                df = df[~df.index.duplicated(keep="last")]
+            self._write_file(self.path(kind, symbol), kind, df)
+            self._remove_segments(segments)
+            timing.set(rows=len(segments))
+        logger.info(f"Compacted {len(segments)} appended segments into the {kind} artifact for {symbol}")
+
+    def _read(self, path, kind, columns):
+        raise NotImplementedError
+
+    def _write(self, path, kind, df):
+        raise NotImplementedError
+
+
+class CSVArtifactStore(ArtifactStore):
+    """Legacy CSV layout; dtypes are re-inferred and dates re-parsed on every read."""
+    extension = ".csv"
+
+    def _read(self, path, kind, columns):
+        date_column = ARTIFACT_KINDS[kind][2]
+        usecols = None if columns is None else [date_column, *[c for c in columns if c != date_column]]
+        if kind in INDEXED_KINDS:
+            return pd.read_csv(path, usecols=usecols, index_col=date_column, parse_dates=[date_column])
+        return pd.read_csv(path, usecols=usecols, parse_dates=[date_column])
+
+    def _write(self, path, kind, df):
+        df.to_csv(path, index=kind in INDEXED_KINDS)
+
+    def append(self, kind, symbol, df):
+        with span("artifact_write", kind=kind, format="csv") as timing:
+            df.to_csv(self.path(kind, symbol), mode="a", header=False, index=kind in INDEXED_KINDS)
+            timing.set(rows=len(df))
+
+
+class ParquetArtifactStore(ArtifactStore):
+    """Columnar Parquet files; the datetime index and float32/float64 dtypes round-trip unchanged."""
+    extension = ".parquet"
+
+    def _read(self, path, kind, columns):
+        return pd.read_parquet(path, engine="pyarrow", columns=columns)
+
+    def _write(self, path, kind, df):
+        df.to_parquet(path, engine="pyarrow")
+
+
+class ArrowArtifactStore(ArtifactStore):
+    """Arrow IPC files that readers memory-map, so loading does not copy the column buffers."""
+    extension = ".arrow"
+
+    def _read(self, path, kind, columns):
+        import pyarrow as pa
+
+        with pa.memory_map(path, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            index_columns = [c for c in (table.schema.pandas_metadata or {}).get("index_columns", []) if isinstance(c, str)]
+            table = table.select([*columns, *[c for c in index_columns if c not in columns]])
+        return table.to_pandas(split_blocks=True)
+
+    def _write(self, path, kind, df):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df)
+        with pa.OSFile(path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+
+ARTIFACT_STORES = {
+    "csv": CSVArtifactStore,
+    "parquet": ParquetArtifactStore,
+    "arrow": ArrowArtifactStore,
+}
+
+
+def get_artifact_store(config):
+    """Build the artifact store selected by `artifact_store.format` in the configuration."""
+    store_format = config.get("artifact_store", {}).get("format", "parquet")
+    if store_format not in ARTIFACT_STORES:
+        raise ValueError(f"Unknown artifact store format: {store_format}")
+    return ARTIFACT_STORES[store_format](config)
+
+
+def migrate_csv_artifacts(config, store=None):
+    """
+    One-shot conversion of existing CSV artifacts into the configured store.
+    Artifacts already present in the target store are left untouched, so this is safe to re-run.
+    Returns:
+    - List of (kind, symbol) pairs that were migrated.
+    """
+    store = store or get_artifact_store(config)
+    if isinstance(store, CSVArtifactStore):
+        return []
+    csv_store = CSVArtifactStore(config)
+    migrated = []
+    for symbol in config["symbols"]["currencies"]:
+        for kind in ARTIFACT_KINDS:
+            if not csv_store.exists(kind, symbol) or store.exists(kind, symbol):
+                continue
+            store.write(kind, symbol, csv_store.read(kind, symbol))
+            migrated.append((kind, symbol))
+    return migrated
@@ -0,0 +1,275 @@
+import os
+import time
+import shutil
+import logging
+import tempfile
+import multiprocessing
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from PortfolioOptimizer.logging import logger
+from PortfolioOptimizer.utils.utils import read_yaml
+from PortfolioOptimizer.components.artifactstore import get_artifact_store
+
+
+def forecast_naive(ds, y, horizon, config):
+    """Last observed value carried forward; the baseline every model should beat."""
+    return np.full(horizon, y[-1])
+
+
+def forecast_xgboost(ds, y, horizon, config, adjust=True):
+    from PortfolioOptimizer.components.modeltrainingXGBoost import XGBoostForecasting
+
+    model = XGBoostForecasting(pd.DataFrame({'ds': ds, 'y': y}), 'ds', 'y', config)
+    model.preprocess_data()
+    model.train_model(training_period=config['training']['training_period'])
+    return model.forecast(horizon, adjust=adjust, quantiles=())['yhat'].to_numpy()
+
+
+def forecast_prophet(ds, y, horizon, config):
+    from PortfolioOptimizer.components.dataprocessing import make_prophet
+
+    model = make_prophet()
+    model.fit(pd.DataFrame({'ds': ds, 'y': y}))
+    future = pd.DataFrame({'ds': ds[-1] + pd.to_timedelta(np.arange(1, horizon + 1), unit='D')})
+    return model.predict(future)['yhat'].to_numpy()
+
+
+def forecast_ets(ds, y, horizon, config, kind="add"):
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+    from PortfolioOptimizer.components.dataprocessing import ETS_SEASONAL_PERIODS
+
+    fit = ExponentialSmoothing(y, trend=kind, seasonal=kind, seasonal_periods=ETS_SEASONAL_PERIODS).fit()
+    return np.asarray(fit.forecast(horizon))
+
+
+def forecast_xgboost_panel(symbol, cutoff, horizon, config):
+    """
+    Panel XGBoost trained on every backtested symbol's history up to `cutoff`, forecasting `symbol`.
+    The forecasts of all symbols at one cutoff come from the same model, so each worker keeps the
+    last few cutoffs' forecasts instead of retraining for every symbol.
+    """
+    from PortfolioOptimizer.components.modeltrainingXGBoost import PanelXGBoostForecasting
+
+    panels = _worker["panels"]
+    if cutoff not in panels:
+        frames = {}
+        for name in _worker["symbols"]:
+            ds, y, high_low = _series(name)
+            end = int(np.searchsorted(ds, cutoff.to_datetime64(), side="right"))
+            if end:
+                frames[name] = pd.DataFrame({'ds': np.asarray(ds[:end]), 'y': np.asarray(y[:end]),
+                                             'High_Low_Diff': np.asarray(high_low[:end])})
+        model = PanelXGBoostForecasting(frames, config, config['training']['training_period'],
+                                        config['training']['horizon_stride'])
+        model.train_model(horizon)
+        if len(panels) >= PANEL_CACHE_SIZE:
+            panels.pop(next(iter(panels)))
+        panels[cutoff] = model.forecast(horizon, quantiles=())
+    return panels[cutoff][symbol]['yhat'].to_numpy()
+
+
+# name -> callable(ds, y, horizon, config) returning `horizon` predictions
+BACKTEST_MODELS = {
+    "naive": forecast_naive,
+    "xgboost": forecast_xgboost,
+    "xgboost_unadjusted": partial(forecast_xgboost, adjust=False),
+    "prophet": forecast_prophet,
+    "ets_additive": partial(forecast_ets, kind="add"),
+    "ets_multiplicative": partial(forecast_ets, kind="mul"),
+}
+# name -> callable(symbol, cutoff, horizon, config) for models trained across every backtested symbol
+PANEL_BACKTEST_MODELS = {
+    "xgboost_panel": forecast_xgboost_panel,
+}
+# Cutoffs whose panel forecasts each worker keeps
+PANEL_CACHE_SIZE = 8
+
+
+# Columns produced by `score` for every successful fold
+SCORE_COLUMNS = ("mae", "mape", "directional_accuracy")
+
+
+def score(origin, actual, predicted):
+    """MAE, MAPE and the share of steps whose direction from the origin close was called correctly."""
+    errors = np.abs(predicted - actual)
+    return {
+        "mae": float(errors.mean()),
+        "mape": float((errors / np.abs(actual)).mean()),
+        "directional_accuracy": float((np.sign(predicted - origin) == np.sign(actual - origin)).mean()),
+    }
+
+
+# Per-worker state: configuration, the backtested symbols, read-only memory maps of their series
+# and cached panel forecasts
+_worker = {}
+
+
+def _init_worker(array_dir, config_path, threads_per_worker, symbols):
+    # Must run before xgboost/prophet/statsmodels load so each worker keeps to its share of the cores
+    for variable in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variable] = str(threads_per_worker)
+    logging.getLogger("cmdstanpy").disabled = True
+    logging.getLogger("prophet").disabled = True
+    _worker.update(array_dir=array_dir, config=read_yaml(config_path), series={}, symbols=symbols, panels={})
+
+
+def _series(symbol):
+    series = _worker["series"]
+    if symbol not in series:
+        series[symbol] = tuple(
+            np.load(os.path.join(_worker["array_dir"], f"{symbol}_{name}.npy"), mmap_mode="r")
+            for name in ("ds", "y", "high_low")
+        )
+    return series[symbol]
+
+
+def run_folds(symbol, model, folds, horizon, window):
+    """
+    Worker entry point: evaluate `model` on the given (fold, cutoff) pairs of one symbol.
+    Each fold trains on the rows up to and including `cutoff` (the last `window` of them, or all
+    with `window` 0) and is scored on the `horizon` rows after it. Panel models ignore `window`
+    and train on every symbol's history up to the cutoff date.
+    Returns:
+    - List of per-fold result dicts; a failing fold records its error instead of scores.
+    """
+    ds, y, _ = _series(symbol)
+    rows = []
+    for fold, cutoff in folds:
+        start = max(0, cutoff + 1 - window) if window else 0
+        train_ds = pd.DatetimeIndex(np.asarray(ds[start:cutoff + 1]))
+        train_y = np.asarray(y[start:cutoff + 1])
+        actual = np.asarray(y[cutoff + 1:cutoff + 1 + horizon])
+        row = {"symbol": symbol, "model": model, "fold": fold, "cutoff": train_ds[-1], "train_rows": len(train_y)}
+        began = time.perf_counter()
+        try:
+            if model in PANEL_BACKTEST_MODELS:
+                predicted = PANEL_BACKTEST_MODELS[model](symbol, train_ds[-1], horizon, _worker["config"])
+            else:
+                predicted = BACKTEST_MODELS[model](train_ds, train_y, horizon, _worker["config"])
+            row.update(score(train_y[-1], actual, np.asarray(predicted, dtype=np.float64)))
+        except Exception as e:
+            row["error"] = f"{type(e).__name__}: {e}"
+        row["seconds"] = round(time.perf_counter() - began, 3)
+        rows.append(row)
+    return rows
+
+
+class Backtester:
+    def __init__(self, config, config_path="config/config.yaml"):
+        """
+        Rolling-origin backtests of the forecasting models on the raw closes.
+        Folds run on a process pool; every symbol's dates and closes are written once to `.npy`
+        files that the workers memory-map read-only, so no series is pickled per task.
+        Parameters:
+        - config: Pipeline configuration; reads the `backtest` section.
+        - config_path: Path the workers re-read the configuration from.
+        """
+        self.config = config
+        self.config_path = config_path
+        self.settings = config["backtest"]
+        self.store = get_artifact_store(config)
+        self.output_dir = config["paths"]["backtest_dir"]
+        self.max_workers = self.settings["workers"] or os.cpu_count()
+
+    def cutoffs(self, rows):
+        """(fold, cutoff row) pairs, most recent first; folds without `min_train` rows of history are dropped."""
+        horizon, step = self.settings["horizon"], self.settings["step"]
+        pairs = [(fold, rows - 1 - horizon - fold * step) for fold in range(self.settings["folds"])]
+        valid = [(fold, cutoff) for fold, cutoff in pairs if cutoff + 1 >= self.settings["min_train"]]
+        if len(valid) < len(pairs):
+            logger.warning(f"Only {len(valid)} of {len(pairs)} folds have {self.settings['min_train']} rows of history")
+        return valid
+
+    def write_arrays(self, symbols, array_dir):
+        """Write each symbol's dates (int64 ns), closes and high-low ranges to `.npy` files; returns symbol -> row count."""
+        rows = {}
+        for symbol in symbols:
+            candles = self.store.read("raw", symbol, columns=["High", "Low", "Close"]).sort_index()
+            np.save(os.path.join(array_dir, f"{symbol}_ds.npy"), candles.index.to_numpy(dtype="datetime64[ns]"))
+            np.save(os.path.join(array_dir, f"{symbol}_y.npy"), candles["Close"].to_numpy(dtype=np.float64))
+            np.save(os.path.join(array_dir, f"{symbol}_high_low.npy"),
+                    (candles["High"] - candles["Low"]).to_numpy(dtype=np.float64))
+            rows[symbol] = len(candles)
+        return rows
+
+    def run(self, symbols=None, models=None):
+        """
+        Backtest every (symbol, model) pair.
+        Parameters:
+        - symbols: Symbols to backtest (defaults to every configured currency with raw data).
+        - models: Names from BACKTEST_MODELS or PANEL_BACKTEST_MODELS (defaults to `backtest.models`).
+        Returns:
+        - (folds, summary): per-fold scores, and their means per symbol and model.
+        Raises:
+        - ValueError: for unknown model names, or when no symbol has enough history for a single fold.
+        """
+        symbols = symbols or [s for s in self.config["symbols"]["currencies"] if self.store.exists("raw", s)]
+        models = models or list(self.settings["models"])
+        unknown = [model for model in models if model not in BACKTEST_MODELS and model not in PANEL_BACKTEST_MODELS]
+        if unknown:
+            raise ValueError(f"Unknown backtest models: {', '.join(unknown)}")
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        array_dir = tempfile.mkdtemp(prefix="arrays-", dir=self.output_dir)
+        try:
+            rows = self.write_arrays(symbols, array_dir)
+            tasks = []
+            chunk = self.settings["folds_per_task"]
+            for symbol in symbols:
+                folds = self.cutoffs(rows[symbol])
+                for model in models:
+                    tasks.extend((symbol, model, folds[i:i + chunk]) for i in range(0, len(folds), chunk))
+            if not tasks:
+                needed = self.settings["min_train"] + self.settings["horizon"]
+                raise ValueError(f"No backtest folds: every symbol has fewer than min_train + horizon = {needed} rows")
+            workers = max(1, min(self.max_workers, len(tasks)))
+            threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+            logger.info(f"Backtesting {len(symbols)} symbols x {len(models)} models in {len(tasks)} tasks "
+                        f"on {workers} worker processes")
+
+            results = []
+            start = time.perf_counter()
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(array_dir, self.config_path, threads_per_worker, symbols),
+            ) as executor:
+                futures = [
+                    executor.submit(run_folds, symbol, model, folds, self.settings["horizon"], self.settings["window"])
+                    for symbol, model, folds in tasks
+                ]
+                for future in as_completed(futures):
+                    results.extend(future.result())
+            logger.info(f"Backtest finished in {time.perf_counter() - start:.1f}s")
+        finally:
+            shutil.rmtree(array_dir, ignore_errors=True)
+
+        folds = pd.DataFrame(results).sort_values(["symbol", "model", "fold"], ignore_index=True)
+        if "error" not in folds:
+            folds["error"] = None
+        for column in SCORE_COLUMNS:
+            if column not in folds:
+                # Every fold failed, so no scores were recorded
+                folds[column] = np.nan
+        failed = folds["error"].notna()
+        if failed.any():
+            logger.warning(f"{int(failed.sum())} folds failed, e.g. {folds.loc[failed, 'error'].iloc[0]}")
+        summary = (
+            folds[~failed]
+            .groupby(["symbol", "model"])
+            .agg(folds=("fold", "size"), mae=("mae", "mean"), mape=("mape", "mean"),
+                 directional_accuracy=("directional_accuracy", "mean"), seconds=("seconds", "mean"))
+            .reset_index()
+        )
+        return folds, summary
+
+    def save(self, folds, summary):
+        """Write the per-fold scores and the summary as CSV reports under `paths.backtest_dir`."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        for name, frame in (("folds", folds), ("summary", summary)):
+            path = os.path.join(self.output_dir, f"backtest_{name}.csv")
+            frame.to_csv(path, index=False)
+            logger.info(f"Saved backtest {name} at: {path}")
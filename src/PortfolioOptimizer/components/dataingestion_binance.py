@@ -1,85 +1,264 @@
 import pandas as pd
-import requests
 import datetime
 import time
 import os
+import asyncio
+import aiohttp
 from dotenv import load_dotenv
+from PortfolioOptimizer.instrumentation import span
 
 
 load_dotenv()
 
+KLINE_COLUMNS = [
+    "Open Time", "Open", "High", "Low", "Close", "Volume", "Close Time",
+    "Quote Asset Volume", "Number of Trades", "Taker Buy Base Asset Volume",
+    "Taker Buy Quote Asset Volume", "Ignore"
+]
+
+INTERVAL_MS = {
+    "1m": 60_000,
+    "3m": 3 * 60_000,
+    "5m": 5 * 60_000,
+    "15m": 15 * 60_000,
+    "30m": 30 * 60_000,
+    "1h": 3_600_000,
+    "2h": 2 * 3_600_000,
+    "4h": 4 * 3_600_000,
+    "6h": 6 * 3_600_000,
+    "8h": 8 * 3_600_000,
+    "12h": 12 * 3_600_000,
+    "1d": 86_400_000,
+    "3d": 3 * 86_400_000,
+    "1w": 7 * 86_400_000,
+}
+
+# Response header carrying the request weight the caller's IP has used in the current minute
+USED_WEIGHT_HEADER = "X-MBX-USED-WEIGHT-1M"
+
+
+def to_millis(value):
+    """Convert a "%Y-%m-%d" string, datetime or Timestamp to epoch milliseconds."""
+    if isinstance(value, str):
+        value = datetime.datetime.strptime(value, "%Y-%m-%d")
+    if isinstance(value, pd.Timestamp):
+        return int(value.value // 1_000_000)
+    return int(value.timestamp() * 1000)
+
+
+def klines_to_frame(data):
+    """Typed candle frame indexed by "Open Time" from raw kline rows (lists in KLINE_COLUMNS order)."""
+    df = pd.DataFrame(data, columns=KLINE_COLUMNS)
+
+    df["Open Time"] = pd.to_datetime(df["Open Time"], unit="ms")
+    df.set_index("Open Time", inplace=True)
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    df = df.astype({
+        "Open": "float",
+        "High": "float",
+        "Low": "float",
+        "Close": "float",
+        "Volume": "float",
+        "Quote Asset Volume": "float",
+        "Number of Trades": "int",
+        "Taker Buy Base Asset Volume": "float",
+        "Taker Buy Quote Asset Volume": "float"
+    })
+
+    return df
+
+
+class IncrementalIngestionError(Exception):
+    """Raised when stored candles cannot be extended in place and a full backfill is needed."""
+
+
+def kline_request_weight(limit):
+    """Request weight Binance charges for a single klines call with the given `limit`."""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+class RequestWeightBudget:
+    def __init__(self, weight_per_minute=1200, max_concurrency=20):
+        """
+        Token bucket shared by every concurrent klines request.
+        Parameters:
+        - weight_per_minute: Request weight that may be spent per rolling minute.
+        - max_concurrency: Maximum number of requests in flight at once.
+        """
+        self.capacity = float(weight_per_minute)
+        self.tokens = float(weight_per_minute)
+        self.refill_rate = weight_per_minute / 60.0
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def acquire(self, weight):
+        """Wait until `weight` tokens are available and spend them."""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_rate)
+                self.updated = now
+                if self.tokens >= weight:
+                    self.tokens -= weight
+                    return
+                await asyncio.sleep((weight - self.tokens) / self.refill_rate)
+
+    def drain(self):
+        """Empty the bucket, e.g. after the exchange answered with HTTP 429."""
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+
+    def observe(self, used_weight):
+        """
+        Align the bucket with the weight the exchange reports as used this minute (USED_WEIGHT_HEADER),
+        which also counts requests made by other processes sharing the IP.
+        """
+        now = time.monotonic()
+        refilled = min(self.capacity, self.tokens + (now - self.updated) * self.refill_rate)
+        self.tokens = min(refilled, self.capacity - used_weight)
+        self.updated = now
+
+
 class BinanceIngestionData:
-    def __init__(self, symbol, interval, start_date, end_date, output_dir):
+    def __init__(self, symbol, interval, start_date, end_date, store,
+                 base_url="https://api.binance.com/api/v3/klines", page_limit=1000):
         self.symbol = symbol
         self.interval = interval
         self.start_date = start_date
         self.end_date = end_date
-        self.output_dir = output_dir
-        self.base_url = "https://api.binance.com/api/v1/klines"
-        self.api_key = os.getenv("BINANCE_API_KEY")  
-        self.secret_key = os.getenv("BINANCE_SECRET_KEY")  
-        self.max_retries = 5  
-        self.retry_delay = 5  
+        self.store = store
+        self.base_url = base_url
+        self.page_limit = page_limit
+        self.api_key = os.getenv("BINANCE_API_KEY")
+        self.secret_key = os.getenv("BINANCE_SECRET_KEY")
+        self.max_retries = 5
+        self.retry_delay = 5
 
         if not self.api_key or not self.secret_key:
             raise ValueError("API key and/or secret key not found in environment variables")
+        if self.interval not in INTERVAL_MS:
+            raise ValueError(f"Unsupported kline interval: {self.interval}")
 
-    def fetch_data(self):
+    def build_windows(self, start_ms=None):
+        """Split [start, end_date) into `startTime`/`endTime` windows of at most `page_limit` candles."""
+        start_ms = to_millis(self.start_date) if start_ms is None else start_ms
+        end_ms = to_millis(self.end_date)
+        step = INTERVAL_MS[self.interval] * self.page_limit
+        return [(window_start, min(window_start + step, end_ms) - 1) for window_start in range(start_ms, end_ms, step)]
+
+    async def fetch_window(self, session, budget, start_ms, end_ms):
         params = {
             "symbol": self.symbol,
             "interval": self.interval,
-            "startTime": int(datetime.datetime.strptime(self.start_date, "%Y-%m-%d").timestamp() * 1000),
-            "endTime": int(datetime.datetime.strptime(self.end_date, "%Y-%m-%d").timestamp() * 1000),
-            "limit": 1000
+            "startTime": start_ms,
+            "endTime": end_ms,
+            "limit": self.page_limit
         }
 
         headers = {
-            "X-MBX-APIKEY": self.api_key  
+            "X-MBX-APIKEY": self.api_key
         }
 
         for attempt in range(1, self.max_retries + 1):
+            retry_delay = self.retry_delay
             try:
-                response = requests.get(self.base_url, params=params, headers=headers)
-                data = response.json()
-
-                if response.status_code == 200 and data:
-                    return data
-                else:
-                    raise Exception(f"Error {response.status_code}: {response.text}")
+                await budget.acquire(kline_request_weight(self.page_limit))
+                async with budget.semaphore:
+                    with span("binance_request", endpoint="klines") as timing:
+                        async with session.get(self.base_url, params=params, headers=headers) as response:
+                            timing.set(status=response.status)
+                            if USED_WEIGHT_HEADER in response.headers:
+                                budget.observe(int(response.headers[USED_WEIGHT_HEADER]))
+                            if response.status in (418, 429):
+                                budget.drain()
+                                retry_delay = int(response.headers.get("Retry-After", self.retry_delay))
+                                raise Exception(f"Rate limited ({response.status}), retry after {retry_delay}s")
+                            if response.status != 200:
+                                raise Exception(f"Error {response.status}: {await response.text()}")
+                            page = await response.json()
+                            timing.set(rows=len(page), bytes=response.content_length)
+                            return page
 
             except Exception as e:
-                print(f"Attempt {attempt}: Failed to fetch data for {self.symbol}. Error: {e}")
+                print(f"Attempt {attempt}: Failed to fetch data for {self.symbol} window {start_ms}-{end_ms}. Error: {e}")
                 if attempt < self.max_retries:
-                    print(f"Retrying in {self.retry_delay} seconds...")
-                    time.sleep(self.retry_delay)
+                    print(f"Retrying in {retry_delay} seconds...")
+                    await asyncio.sleep(retry_delay)
                 else:
                     raise Exception(f"Exceeded maximum retries for {self.symbol}.") from e
 
+    async def fetch_data_async(self, session, budget, start_ms=None):
+        """
+        Fetch every window concurrently and stitch the pages, de-duplicated on Open Time.
+        Candles still open at `end_date` are dropped so that stored bars are final.
+        Parameters:
+        - start_ms: Optional epoch-ms start overriding `start_date` (used for incremental runs).
+        """
+        pages = await asyncio.gather(*(
+            self.fetch_window(session, budget, window_start, window_end)
+            for window_start, window_end in self.build_windows(start_ms)
+        ))
+        end_ms = to_millis(self.end_date)
+        rows = {}
+        for page in pages:
+            for row in page:
+                if row[6] < end_ms:
+                    rows[row[0]] = row
+        if not rows and start_ms is None:
+            raise Exception(f"No kline data returned for {self.symbol}.")
+        return [rows[open_time] for open_time in sorted(rows)]
+
+    def fetch_data(self):
+        """Synchronous entry point; runs the paginated fetch on its own event loop."""
+        async def _run():
+            async with aiohttp.ClientSession() as session:
+                return await self.fetch_data_async(session, RequestWeightBudget())
+        return asyncio.run(_run())
+
     def process_data(self, data):
-        df = pd.DataFrame(data, columns=[
-            "Open Time", "Open", "High", "Low", "Close", "Volume", "Close Time", 
-            "Quote Asset Volume", "Number of Trades", "Taker Buy Base Asset Volume", 
-            "Taker Buy Quote Asset Volume", "Ignore"
-        ])
-
-        df["Open Time"] = pd.to_datetime(df["Open Time"], unit="ms")
-        df.set_index("Open Time", inplace=True)
-        df = df.astype({
-            "Open": "float", 
-            "High": "float", 
-            "Low": "float", 
-            "Close": "float", 
-            "Volume": "float", 
-            "Quote Asset Volume": "float", 
-            "Number of Trades": "int", 
-            "Taker Buy Base Asset Volume": "float", 
-            "Taker Buy Quote Asset Volume": "float"
-        })
-
-        return df
-
-    def save_to_csv(self, df):
-        file_path = f"{self.output_dir}/{self.symbol}_2Y.csv"
-        df.to_csv(file_path)
-        print(f"Data for {self.symbol} saved to {file_path}")
+        return klines_to_frame(data)
+
+    def save_data(self, df):
+        self.store.write("raw", self.symbol, df)
+        print(f"Data for {self.symbol} saved to {self.store.path('raw', self.symbol)}")
+
+    def load_existing(self):
+        """Return the candles already stored for this symbol, or None when nothing is on disk."""
+        if not self.store.exists("raw", self.symbol):
+            return None
+        return self.store.read("raw", self.symbol)
+
+    def new_candles(self, existing, fetched):
+        """
+        Validate the overlap between stored and freshly fetched candles and return only the new rows.
+        Parameters:
+        - existing: DataFrame already on disk (from `load_existing`).
+        - fetched: DataFrame from `process_data`, requested from the last stored Open Time onwards.
+        Returns:
+        - DataFrame with the candles strictly newer than the last stored bar.
+        Raises:
+        - IncrementalIngestionError: on a schema mismatch, a gap or a boundary bar that disagrees.
+        """
+        if list(existing.columns) != list(fetched.columns):
+            raise IncrementalIngestionError(f"Schema mismatch in stored data for {self.symbol}")
+        boundary = existing.index[-1]
+        if boundary not in fetched.index:
+            raise IncrementalIngestionError(f"Gap after {boundary} for {self.symbol}: boundary bar not returned")
+        price_columns = ["Open", "High", "Low", "Close", "Volume"]
+        stored_bar = existing.loc[boundary, price_columns].to_numpy(dtype=float)
+        fetched_bar = fetched.loc[boundary, price_columns].to_numpy(dtype=float)
+        if not (abs(stored_bar - fetched_bar) <= 1e-9 * abs(fetched_bar) + 1e-12).all():
+            raise IncrementalIngestionError(f"Boundary bar {boundary} for {self.symbol} does not match the exchange")
+        return fetched[fetched.index > boundary]
+
+    def append_data(self, df):
+        self.store.append("raw", self.symbol, df)
+        print(f"Appended {len(df)} candles for {self.symbol} to {self.store.path('raw', self.symbol)}")
 
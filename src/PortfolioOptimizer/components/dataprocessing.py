@@ -1,15 +1,49 @@
+import numpy as np
 import pandas as pd
+from datetime import datetime, timedelta, timezone
 from prophet import Prophet
 from statsmodels.tsa.holtwinters import ExponentialSmoothing
+from PortfolioOptimizer.logging import logger
+from PortfolioOptimizer.instrumentation import span
+from PortfolioOptimizer.components.indicators import indicator_frames
 import warnings
 
 warnings.filterwarnings("ignore")
 
+ETS_MODELS = {"Triple_Multiplicative_ETS": "mul", "Triple_Additive_ETS": "add"}
+ETS_SEASONAL_PERIODS = 24 * 7
+
+
+def make_prophet():
+    """The Prophet configuration used for the features (and by the backtests)."""
+    return Prophet(
+        growth='linear',
+        seasonality_mode='additive',
+        interval_width=0.95,
+        daily_seasonality=True,
+        weekly_seasonality=True,
+        yearly_seasonality=False
+    )
+
 
 class DataProcessing:
-    def __init__(self, csv_path):
-        self.csv_path = csv_path
-        self.df = pd.read_csv(self.csv_path, parse_dates=["Open Time"])
+    def __init__(self, data, fit_state=None, full_refit_days=7, drift_tolerance=1.5, drift_window=30, features=None):
+        """
+        Parameters:
+        - data: Raw candles indexed by "Open Time", as read from the artifact store.
+        - fit_state: Parameters saved by the previous run (see `fit_state` after `process_data`), or None for cold fits.
+        - full_refit_days: Maximum age of the last cold fit before warm starts stop being used.
+        - drift_tolerance: Refit cold when the recent in-sample error grows beyond this multiple of the last cold fit's.
+        - drift_window: Number of most recent rows the in-sample error is measured on.
+        - features: Technical indicators to add (the `features` section of params.yaml, see `indicators.INDICATORS`).
+        """
+        self.df = data.reset_index()
+        self.fit_state = fit_state
+        self.full_refit_days = full_refit_days
+        self.drift_tolerance = drift_tolerance
+        self.drift_window = drift_window
+        self.features = features or {}
+        self.full_refit = True
 
     def add_features(self):
         self.df = self.df.rename(columns={"Open Time": "ds", "Close": "y"})
@@ -18,35 +52,103 @@ class DataProcessing:
         self.df['Open_Close_Diff'] = self.df['Open'] - self.df['y']
         self.df['Average_Price'] = (self.df['High'] + self.df['Low'] + self.df['y']) / 3
         self.df['Volume_Weighted_Price'] = self.df['Quote Asset Volume'] / self.df['Volume']
+        if self.features:
+            self.df = self.df.join(indicator_frames({None: self.df}, self.features)[None])
 
-    def generate_prophet_features(self):
-        prophet_model = Prophet(
-            growth='linear',
-            seasonality_mode='additive',
-            interval_width=0.95,
-            daily_seasonality=True,
-            weekly_seasonality=True,
-            yearly_seasonality=False
-        )
-        prophet_model.fit(self.df[['ds', 'y']])
+    def needs_full_refit(self):
+        """
+        Warm starts are only valid while the series keeps its start (initial ETS states) and only grows.
+        """
+        state = self.fit_state
+        if not state or any(key not in state for key in ("prophet", "ets", "baseline_errors")):
+            return True
+        if state["first_ds"] != str(self.df['ds'].iloc[0]) or state["rows"] > len(self.df):
+            return True
+        last_full_refit = datetime.fromisoformat(state["last_full_refit"])
+        return datetime.now(timezone.utc) - last_full_refit >= timedelta(days=self.full_refit_days)
+
+    def generate_prophet_features(self, warm=False):
+        prophet_model = make_prophet()
+        if warm:
+            init = {name: np.asarray(value) if isinstance(value, list) else value
+                    for name, value in self.fit_state["prophet"].items()}
+            try:
+                # Start the Stan optimizer from the previous optimum instead of its default initialisation
+                with span("model_fit", model="prophet", warm=True) as timing:
+                    timing.set(rows=len(self.df))
+                    prophet_model.fit(self.df[['ds', 'y']], init=init)
+            except Exception as e:
+                logger.warning(f"Prophet warm start failed ({e}); fitting from scratch")
+                return self.generate_prophet_features(warm=False)
+        else:
+            with span("model_fit", model="prophet", warm=False) as timing:
+                timing.set(rows=len(self.df))
+                prophet_model.fit(self.df[['ds', 'y']])
+        self.prophet_params = {name: float(prophet_model.params[name][0][0]) for name in ('k', 'm', 'sigma_obs')}
+        self.prophet_params.update({name: prophet_model.params[name][0].tolist() for name in ('delta', 'beta')})
         prophet_results = prophet_model.predict(self.df[['ds']])
         return prophet_results
 
-    def generate_ets_features(self):
-        self.df['Triple_Multiplicative_ETS'] = ExponentialSmoothing(
-            self.df['y'], trend='mul', seasonal='mul', seasonal_periods=24 * 7
-        ).fit().fittedvalues
+    def generate_ets_features(self, warm=False):
+        self.ets_params = {}
+        for column, kind in ETS_MODELS.items():
+            with span("model_fit", model=column, warm=warm) as timing:
+                timing.set(rows=len(self.df))
+                if warm:
+                    # Re-run the smoothing recursions with the stored parameters; no optimisation
+                    params = self.fit_state["ets"][column]
+                    fit = ExponentialSmoothing(
+                        self.df['y'], trend=kind, seasonal=kind, seasonal_periods=ETS_SEASONAL_PERIODS,
+                        initialization_method='known', initial_level=params['initial_level'],
+                        initial_trend=params['initial_trend'], initial_seasonal=params['initial_seasons']
+                    ).fit(
+                        smoothing_level=params['smoothing_level'], smoothing_trend=params['smoothing_trend'],
+                        smoothing_seasonal=params['smoothing_seasonal'], optimized=False
+                    )
+                else:
+                    fit = ExponentialSmoothing(
+                        self.df['y'], trend=kind, seasonal=kind, seasonal_periods=ETS_SEASONAL_PERIODS
+                    ).fit()
+            self.df[column] = fit.fittedvalues
+            self.ets_params[column] = {
+                name: np.asarray(fit.params[name]).tolist()
+                for name in ('smoothing_level', 'smoothing_trend', 'smoothing_seasonal',
+                             'initial_level', 'initial_trend', 'initial_seasons')
+            }
+
+    def recent_errors(self, prophet_results):
+        """Mean absolute percentage error of each model over the last `drift_window` rows."""
+        actual = self.df['y'].to_numpy()[-self.drift_window:]
+        fitted = {"prophet": prophet_results['yhat'].to_numpy()[-self.drift_window:]}
+        fitted.update({column: self.df[column].to_numpy()[-self.drift_window:] for column in ETS_MODELS})
+        return {name: float(np.nanmean(np.abs(actual - values) / np.abs(actual))) for name, values in fitted.items()}
 
-        self.df['Triple_Additive_ETS'] = ExponentialSmoothing(
-            self.df['y'], trend='add', seasonal='add', seasonal_periods=24 * 7
-        ).fit().fittedvalues
+    def drifted(self, errors):
+        baseline = self.fit_state["baseline_errors"]
+        return any(errors[name] > self.drift_tolerance * max(baseline[name], 1e-12) for name in errors)
 
     def process_data(self):
         self.add_features()
-        prophet_results = self.generate_prophet_features()
-        self.generate_ets_features()
-        # Merge Prophet results with the original dataframe
-        prophet_results['ds'] = prophet_results['ds'].astype(str)
-        self.df['ds'] = self.df['ds'].astype(str)
+        self.full_refit = self.needs_full_refit()
+        prophet_results = self.generate_prophet_features(warm=not self.full_refit)
+        self.generate_ets_features(warm=not self.full_refit)
+        errors = self.recent_errors(prophet_results)
+        if not self.full_refit and self.drifted(errors):
+            logger.info(f"In-sample error drifted to {errors}; refitting Prophet and ETS from scratch")
+            self.full_refit = True
+            prophet_results = self.generate_prophet_features()
+            self.generate_ets_features()
+            errors = self.recent_errors(prophet_results)
+        self.fit_state = {
+            "first_ds": str(self.df['ds'].iloc[0]),
+            "rows": len(self.df),
+            "last_full_refit": (datetime.now(timezone.utc).isoformat() if self.full_refit
+                                else self.fit_state["last_full_refit"]),
+            "baseline_errors": errors if self.full_refit else self.fit_state["baseline_errors"],
+            "prophet": self.prophet_params,
+            "ets": self.ets_params,
+        }
+        # Merge Prophet results with the original dataframe on the typed datetime column
+        prophet_results['ds'] = prophet_results['ds'].astype(self.df['ds'].dtype)
         featured_df = pd.merge(self.df, prophet_results, how='left', on='ds')
         return featured_df
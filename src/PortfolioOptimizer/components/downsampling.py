@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+# Aggregation of each candle column when rolling bars up to a coarser resolution
+OHLC_AGGREGATIONS = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets: pick `threshold` points that keep the visual shape of a series.
+    The first and last points are always kept; every bucket in between keeps the point forming the
+    largest triangle with the previously kept point and the average of the next bucket. Bucket
+    bounds and averages are computed in one vectorised pass; only the per-bucket argmax, which
+    depends on the previous pick, runs in a loop.
+    Parameters:
+    - x, y: 1-D float arrays of equal length, x ascending.
+    - threshold: Number of points to keep.
+    Returns:
+    - Ascending integer indices into x/y (all of them if the series is already short enough).
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    # Offset x so the cumulative sums keep their precision (x is typically epoch nanoseconds)
+    x = np.asarray(x, dtype=np.float64) - x[0]
+    y = np.asarray(y, dtype=np.float64)
+    # threshold - 2 buckets over the interior points 1 .. n - 2
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    x_sums = np.concatenate([[0.0], np.cumsum(x)])
+    y_sums = np.concatenate([[0.0], np.cumsum(y)])
+    counts = ends - starts
+    # The last bucket looks ahead to the final point itself
+    next_x = np.append(((x_sums[ends] - x_sums[starts]) / counts)[1:], x[-1])
+    next_y = np.append(((y_sums[ends] - y_sums[starts]) / counts)[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket, (start, end) in enumerate(zip(starts, ends)):
+        previous_x, previous_y = x[previous], y[previous]
+        areas = np.abs((previous_x - next_x[bucket]) * (y[start:end] - previous_y)
+                       - (previous_x - x[start:end]) * (next_y[bucket] - previous_y))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample(frame, max_points, x_column='ds', y_column='y'):
+    """
+    Reduce `frame` to at most `max_points` rows with LTTB on (x_column, y_column); other columns follow the kept rows.
+    Rows with a missing y are dropped first. Returns `frame` itself when it is already small enough.
+    """
+    if max_points is None or len(frame) <= max_points:
+        return frame
+    frame = frame[frame[y_column].notna()]
+    x = frame[x_column].to_numpy()
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype("datetime64[ns]").view(np.int64)
+    return frame.iloc[lttb_indices(x, frame[y_column].to_numpy(), max_points)]
+
+
+def ohlc_rollups(raw, resolutions):
+    """
+    Roll raw candles up to each of `resolutions` (pandas offsets, e.g. "4h", "1D", "1W").
+    Resolutions no coarser than the candles themselves are skipped.
+    Parameters:
+    - raw: Candles indexed by "Open Time", as read from the artifact store.
+    Returns:
+    - DataFrame with "ds", "resolution" and the OHLCV columns, one block of rows per resolution.
+    """
+    bar = raw.index.to_series().diff().median() if len(raw) > 1 else pd.Timedelta(0)
+    candles = raw[list(OHLC_AGGREGATIONS)]
+    rollups = []
+    for resolution in resolutions:
+        if pd.to_timedelta(resolution) <= bar:
+            continue
+        bars = candles.resample(resolution, label="left", closed="left").agg(OHLC_AGGREGATIONS)
+        rollups.append(bars.dropna(subset=["Close"]).assign(resolution=resolution))
+    if not rollups:
+        empty = {"ds": pd.Series(dtype="datetime64[ns]"), "resolution": pd.Series(dtype=object)}
+        return pd.DataFrame({**empty, **{column: pd.Series(dtype=np.float64) for column in OHLC_AGGREGATIONS}})
+    return pd.concat(rollups).rename_axis("ds").reset_index()
@@ -0,0 +1,36 @@
+import os
+import json
+from PortfolioOptimizer.logging import logger
+
+
+class FitStateStore:
+    def __init__(self, state_dir):
+        """
+        Per-symbol JSON store for fitted Prophet/ETS parameters reused as warm starts by DataProcessing.
+        Parameters:
+        - state_dir: Directory holding one `{symbol}.json` file per symbol.
+        """
+        self.state_dir = state_dir
+
+    def path(self, symbol):
+        return os.path.join(self.state_dir, f"{symbol}.json")
+
+    def load(self, symbol):
+        """Return the stored state, or None if there is none (or it cannot be read)."""
+        path = self.path(symbol)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable fit state {path}: {e}")
+            return None
+
+    def save(self, symbol, state):
+        os.makedirs(self.state_dir, exist_ok=True)
+        path = self.path(symbol)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, path)
@@ -0,0 +1,80 @@
+import warnings
+import numpy as np
+
+# Upper bound on the (symbols x window x horizons) block of returns held in memory at once
+MAX_BLOCK_VALUES = 1 << 24
+
+
+def quantile_column(quantile):
+    """Forecast column holding the `quantile` of the forecast distribution, e.g. 0.05 -> "yhat_q0.05"."""
+    return f"yhat_q{quantile:g}"
+
+
+def quantile_bands(columns):
+    """
+    Prediction intervals available among the forecast `columns`.
+    Returns:
+    - List of (lower column, upper column, coverage) for every quantile q < 0.5 whose 1 - q is also present, widest first.
+    """
+    present = {float(column[len("yhat_q"):]): column for column in columns if column.startswith("yhat_q")}
+    bands = []
+    for quantile in sorted(present):
+        upper = next((column for q, column in present.items() if np.isclose(q, 1 - quantile)), None)
+        if quantile < 0.5 and upper is not None:
+            bands.append((present[quantile], upper, 1 - 2 * quantile))
+    return bands
+
+
+def horizon_quantiles(log_closes, horizons, quantiles, window=365):
+    """
+    Residual-bootstrap quantiles of the forecast error at every horizon, for many symbols at once.
+    The error of an h-step forecast is taken from the `window` most recent h-step log returns of the
+    symbol, centred on their median, so the point forecast keeps the drift and the quantiles only add
+    the spread the series has actually shown over h steps. Every symbol and horizon is computed in
+    vectorised blocks; nothing is refitted.
+    Parameters:
+    - log_closes: Sequence of 1-D arrays of log closes, one per symbol, oldest first.
+    - horizons: 1-D array of steps ahead.
+    - quantiles: Probabilities in (0, 1).
+    - window: Returns per horizon the quantiles are taken over.
+    Returns:
+    - Array of shape (symbols, quantiles, horizons) of log offsets from the point forecast
+      (NaN where a symbol's history holds no return of that length).
+    """
+    horizons = np.asarray(horizons, dtype=np.int64)
+    length = window + int(horizons.max())
+    # Right-align every series in one matrix, padding short histories with NaN
+    closes = np.full((len(log_closes), length), np.nan, dtype=np.float32)
+    for row, series in enumerate(log_closes):
+        tail = np.asarray(series, dtype=np.float32)[-length:]
+        closes[row, length - len(tail):] = tail
+    ends = np.arange(length - window, length)
+    starts = ends[:, None] - horizons[None, :]
+
+    offsets = np.empty((len(log_closes), len(quantiles), len(horizons)), dtype=np.float64)
+    block = max(1, MAX_BLOCK_VALUES // (window * len(horizons)))
+    levels = [*quantiles, 0.5]
+    for first in range(0, len(log_closes), block):
+        rows = closes[first:first + block]
+        # (symbols, window, horizons): every h-step return ending at each of the last `window` closes
+        returns = rows[:, ends, None] - rows[:, starts]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            if np.isnan(returns).any():
+                values = np.nanquantile(returns, levels, axis=1)
+            else:
+                values = np.quantile(returns, levels, axis=1)
+        offsets[first:first + block] = np.moveaxis(values[:-1] - values[-1], 0, 1)
+    return offsets
+
+
+def add_quantiles(forecast, offsets, quantiles):
+    """
+    Add one column per quantile to `forecast` (with 'yhat' for horizons 1, 2, ...): 'yhat' scaled by exp(offset).
+    Parameters:
+    - offsets: Array of shape (quantiles, horizons) as returned by `horizon_quantiles` for one symbol.
+    """
+    yhat = forecast['yhat'].to_numpy(dtype=np.float64)
+    for quantile, offset in zip(quantiles, offsets):
+        forecast[quantile_column(quantile)] = yhat * np.exp(offset[:len(yhat)])
+    return forecast
@@ -0,0 +1,193 @@
+import numpy as np
+import pandas as pd
+
+# Every kernel takes and returns 2-D float64 arrays of shape (symbols, time), oldest bar first.
+# NaN marks bars a symbol does not have (e.g. before its listing); like pandas' rolling(window),
+# windowed results stay NaN until the window holds `window` valid values.
+
+
+def shift(x, periods=1):
+    out = np.full_like(x, np.nan)
+    if periods < x.shape[1]:
+        out[:, periods:] = x[:, :x.shape[1] - periods]
+    return out
+
+
+def rolling_sum(x, window):
+    """Sum over the trailing `window` bars via cumulative sums: one pass regardless of `window`."""
+    valid = ~np.isnan(x)
+    zeros = np.zeros((x.shape[0], 1))
+    sums = np.concatenate([zeros, np.cumsum(np.where(valid, x, 0.0), axis=1)], axis=1)
+    counts = np.concatenate([zeros, np.cumsum(valid, axis=1)], axis=1)
+    out = np.full_like(x, np.nan)
+    if window <= x.shape[1]:
+        full = counts[:, window:] - counts[:, :-window] == window
+        out[:, window - 1:] = np.where(full, sums[:, window:] - sums[:, :-window], np.nan)
+    return out
+
+
+def rolling_mean(x, window):
+    return rolling_sum(x, window) / window
+
+
+def rolling_std(x, window):
+    """Sample standard deviation over the trailing `window` bars."""
+    # Centre each row first so the sums of squares do not lose precision on large prices
+    centred = x - np.nanmean(x, axis=1, keepdims=True)
+    sums = rolling_sum(centred, window)
+    squares = rolling_sum(centred * centred, window)
+    return np.sqrt(np.maximum(squares - sums * sums / window, 0.0) / (window - 1))
+
+
+def ema(x, alpha):
+    """
+    Exponential moving average (pandas' `ewm(alpha=alpha, adjust=False)`), seeded with each row's
+    first valid value. The recursion runs over time, vectorised across symbols.
+    """
+    out = np.full_like(x, np.nan)
+    previous = np.full(x.shape[0], np.nan)
+    for t in range(x.shape[1]):
+        current = x[:, t]
+        previous = np.where(np.isnan(previous), current,
+                            np.where(np.isnan(current), previous, alpha * current + (1 - alpha) * previous))
+        out[:, t] = previous
+    return out
+
+
+def returns(panel, periods=(1,)):
+    close = panel['close']
+    return {f'Return_{p}': close / shift(close, p) - 1.0 for p in periods}
+
+
+def log_returns(panel, periods=(1,)):
+    log_close = np.log(panel['close'])
+    return {f'Log_Return_{p}': log_close - shift(log_close, p) for p in periods}
+
+
+def rolling(panel, windows=(7, 30)):
+    close = panel['close']
+    features = {}
+    for window in windows:
+        mean, std = rolling_mean(close, window), rolling_std(close, window)
+        features[f'Rolling_Mean_{window}'] = mean
+        features[f'Rolling_Std_{window}'] = std
+        with np.errstate(divide='ignore', invalid='ignore'):
+            features[f'Zscore_{window}'] = (close - mean) / std
+    return features
+
+
+def ema_features(panel, spans=(12, 26)):
+    return {f'EMA_{span}': ema(panel['close'], 2.0 / (span + 1)) for span in spans}
+
+
+def rsi(panel, window=14):
+    """Wilder's relative strength index."""
+    delta = panel['close'] - shift(panel['close'])
+    gains = ema(np.maximum(delta, 0.0), 1.0 / window)
+    losses = ema(np.maximum(-delta, 0.0), 1.0 / window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = 100.0 - 100.0 / (1.0 + gains / losses)
+    return {f'RSI_{window}': np.where((losses == 0) & (gains >= 0), 100.0, values)}
+
+
+def macd(panel, fast=12, slow=26, signal=9):
+    line = ema(panel['close'], 2.0 / (fast + 1)) - ema(panel['close'], 2.0 / (slow + 1))
+    signal_line = ema(line, 2.0 / (signal + 1))
+    return {'MACD': line, 'MACD_Signal': signal_line, 'MACD_Hist': line - signal_line}
+
+
+def atr(panel, window=14):
+    """Average true range with Wilder smoothing."""
+    previous_close = shift(panel['close'])
+    true_range = np.fmax(panel['high'] - panel['low'],
+                         np.fmax(np.abs(panel['high'] - previous_close), np.abs(panel['low'] - previous_close)))
+    return {f'ATR_{window}': ema(true_range, 1.0 / window)}
+
+
+def bollinger(panel, window=20, num_std=2.0):
+    mean, std = rolling_mean(panel['close'], window), rolling_std(panel['close'], window)
+    upper, lower = mean + num_std * std, mean - num_std * std
+    return {f'BB_Upper_{window}': upper, f'BB_Lower_{window}': lower, f'BB_Width_{window}': (upper - lower) / mean}
+
+
+def realized_volatility(panel, windows=(7, 30)):
+    """Square root of the summed squared log returns over each window."""
+    log_close = np.log(panel['close'])
+    squared = (log_close - shift(log_close)) ** 2
+    return {f'Realized_Vol_{window}': np.sqrt(rolling_sum(squared, window)) for window in windows}
+
+
+def lags(panel, lags=(1, 2, 3, 7)):
+    return {f'Lag_{lag}': shift(panel['close'], lag) for lag in lags}
+
+
+# params.yaml `features` key -> kernel; each section's values are passed as keyword arguments
+INDICATORS = {
+    'returns': returns,
+    'log_returns': log_returns,
+    'rolling': rolling,
+    'ema': ema_features,
+    'rsi': rsi,
+    'macd': macd,
+    'atr': atr,
+    'bollinger': bollinger,
+    'realized_volatility': realized_volatility,
+    'lags': lags,
+}
+
+# panel field -> candle column, for frames as produced by DataProcessing.add_features
+PANEL_COLUMNS = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'y', 'volume': 'Volume'}
+
+
+def compute_indicators(panel, spec):
+    """
+    Compute the indicators selected in `spec` over a whole panel.
+    Parameters:
+    - panel: Dict of field ("open", "high", "low", "close", "volume") -> (symbols, time) array.
+    - spec: Dict of indicator name -> keyword arguments (or None for the defaults), e.g. the
+      `features` section of params.yaml.
+    Returns:
+    - Dict of feature column -> (symbols, time) array.
+    Raises:
+    - ValueError: for unknown indicator names.
+    """
+    unknown = [name for name in spec if name not in INDICATORS]
+    if unknown:
+        raise ValueError(f"Unknown indicators: {', '.join(unknown)}")
+    features = {}
+    for name, params in spec.items():
+        features.update(INDICATORS[name](panel, **dict(params or {})))
+    return features
+
+
+def stack_frames(frames, date_column='ds'):
+    """
+    Align per-symbol candle frames on the union of their dates.
+    Returns:
+    - (symbols, dates, panel) with NaN where a symbol has no bar.
+    """
+    symbols = list(frames)
+    dates = pd.DatetimeIndex(np.unique(np.concatenate([frame[date_column].to_numpy() for frame in frames.values()])))
+    panel = {field: np.full((len(symbols), len(dates)), np.nan) for field in PANEL_COLUMNS}
+    for row, symbol in enumerate(symbols):
+        frame = frames[symbol]
+        positions = dates.get_indexer(frame[date_column])
+        for field, column in PANEL_COLUMNS.items():
+            panel[field][row, positions] = frame[column].to_numpy(dtype=np.float64)
+    return symbols, dates, panel
+
+
+def indicator_frames(frames, spec, date_column='ds'):
+    """
+    Compute `spec` for many symbols in one pass.
+    Returns:
+    - Dict of symbol -> DataFrame of feature columns aligned to that symbol's rows.
+    """
+    symbols, dates, panel = stack_frames(frames, date_column)
+    features = compute_indicators(panel, spec)
+    result = {}
+    for row, symbol in enumerate(symbols):
+        positions = dates.get_indexer(frames[symbol][date_column])
+        result[symbol] = pd.DataFrame({column: values[row, positions] for column, values in features.items()},
+                                      index=frames[symbol].index)
+    return result
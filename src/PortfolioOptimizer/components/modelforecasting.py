@@ -1,10 +1,57 @@
-import os
-import pandas as pd
-import plotly.graph_objects as go
+import threading
+from collections import OrderedDict
 from PortfolioOptimizer.logging import logger
 from PortfolioOptimizer.utils.utils import read_yaml
+from PortfolioOptimizer.components.artifactstore import get_artifact_store
+from PortfolioOptimizer.components.seriesstore import get_series_store
+from PortfolioOptimizer.components.downsampling import downsample
 from datetime import timedelta
 
+# Days of history shown by the plots
+PLOT_HISTORY_DAYS = 180
+
+
+class LoadDataCache:
+    def __init__(self, maxsize=32):
+        """
+        Bounded LRU cache of `ModelForecasting.load_data` results shared by every instance in the process.
+        Keys embed the (mtime_ns, size) signature of the artifacts, so rewriting them invalidates the entry.
+        Parameters:
+        - maxsize: Maximum number of cached symbols/versions.
+        """
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        symbol = key[0]
+        with self.lock:
+            # Drop stale versions of the same symbol before inserting the fresh one
+            for stale_key in [k for k in self.entries if k[0] == symbol]:
+                del self.entries[stale_key]
+            self.entries[key] = value
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+load_data_cache = LoadDataCache()
+
+
 class ModelForecasting:
     def __init__(self, config_path):
         """
@@ -13,10 +60,32 @@ class ModelForecasting:
         - config_path: Path to the configuration YAML file.
         """
         self.config = read_yaml(config_path)
-        self.processed_dir = self.config['paths']['processed_dir']
-        self.forecast_dir = self.config['paths']['foresast_dir']
+        self.store = get_artifact_store(self.config)
+        self.series_store = get_series_store(self.config)
         self.forecast_period = self.config['forecast_period']
         self.symbols = self.config['symbols']['currencies']
+        self.max_points = self.config['plots'].get('max_points', 2000)
+        load_data_cache.maxsize = self.config.get('cache', {}).get('load_data_maxsize', load_data_cache.maxsize)
+
+    def data_version(self, symbol):
+        """
+        Return the version of the artifacts behind `load_data(symbol)`.
+        Raises:
+        - FileNotFoundError: if the processed or forecast artifact is missing.
+        """
+        try:
+            return self.store.signature("processed", symbol) + self.store.signature("forecast", symbol)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Data files for {symbol} are missing!")
+
+    def read_data(self, symbol):
+        """Read the last 6 months of processed data and the forecast of `symbol` from the artifact store."""
+        historical_data = self.store.read("processed", symbol)
+        forecast_data = self.store.read("forecast", symbol)
+        last_date = historical_data['ds'].max()
+        start_date = last_date - timedelta(days=PLOT_HISTORY_DAYS)
+        historical_data = historical_data[historical_data['ds'] >= start_date]
+        return historical_data, forecast_data
 
     def load_data(self, symbol):
         """
@@ -26,26 +95,87 @@ class ModelForecasting:
         Returns:
         - historical_data: DataFrame containing the last 6 months of processed data.
         - forecast_data: DataFrame containing the forecast results.
+        While the published series store holds the current artifacts, the frames are zero-copy views
+        of it; otherwise they come from the shared `load_data_cache` until the artifacts change on disk.
+        Either way callers may add columns but must not edit values.
         """
-        processed_file = os.path.join(self.processed_dir, f"{symbol}_Featured.csv")
-        forecast_file = os.path.join(self.forecast_dir, f"{symbol}_Forecast.csv")
-        if not os.path.exists(processed_file) or not os.path.exists(forecast_file):
-            raise FileNotFoundError(f"Data files for {symbol} are missing!")
-        historical_data = pd.read_csv(processed_file)
-        forecast_data = pd.read_csv(forecast_file)
-        historical_data['ds'] = pd.to_datetime(historical_data['ds'])
-        forecast_data['ds'] = pd.to_datetime(forecast_data['ds'])
-        last_date = historical_data['ds'].max()
-        start_date = last_date - timedelta(days=180)
-        historical_data = historical_data[historical_data['ds'] >= start_date]
-        return historical_data, forecast_data
+        version = self.data_version(symbol)
+        published = self.series_store.data_version(symbol)
+        if published is not None and tuple(published) == version:
+            return self.series_store.frames(symbol)
+        key = (symbol, type(self.store).__name__, version)
+        cached = load_data_cache.get(key)
+        if cached is None:
+            cached = self.read_data(symbol)
+            load_data_cache.put(key, cached)
+        historical_data, forecast_data = cached
+        return historical_data.copy(deep=False), forecast_data.copy(deep=False)
     
+    def load_rollup(self, symbol, resolution):
+        """
+        Load the OHLC bars of `symbol` at `resolution` (built by the pipeline) over the plotted window, with the close as "y".
+        Raises:
+        - FileNotFoundError: if the rollups are missing or hold no bars at this resolution.
+        """
+        try:
+            signature = self.store.signature("rollup", symbol)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"OHLC rollups for {symbol} are missing!")
+        key = ((symbol, resolution), type(self.store).__name__, signature)
+        cached = load_data_cache.get(key)
+        if cached is None:
+            rollups = self.store.read("rollup", symbol)
+            bars = rollups[rollups['resolution'] == resolution].drop(columns='resolution').rename(columns={'Close': 'y'})
+            if bars.empty:
+                raise FileNotFoundError(f"No {resolution} rollup for {symbol}")
+            cached = bars[bars['ds'] >= bars['ds'].max() - timedelta(days=PLOT_HISTORY_DAYS)].reset_index(drop=True)
+            load_data_cache.put(key, cached)
+        return cached.copy(deep=False)
+
+    def plot_data_version(self, symbol, resolution=None):
+        """Version of the artifacts behind `plot_data(symbol, resolution=resolution)`."""
+        if resolution is None:
+            return self.data_version(symbol)
+        try:
+            return self.store.signature("rollup", symbol) + self.store.signature("forecast", symbol)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Data files for {symbol} are missing!")
+
+    def plot_data(self, symbol, max_points=None, resolution=None):
+        """
+        Frames to plot for `symbol`, bounded in size whatever the length or bar interval of its history.
+        Parameters:
+        - max_points: Points kept per series by LTTB downsampling (defaults to `plots.max_points`).
+        - resolution: Plot the OHLC rollup at this resolution (one of `plots.resolutions`) instead of every bar.
+        Returns:
+        - (historical_data, forecast_data) like `load_data`.
+        """
+        max_points = max_points or self.max_points
+        historical_data, forecast_data = self.load_data(symbol)
+        if resolution is not None:
+            historical_data = self.load_rollup(symbol, resolution)
+        return downsample(historical_data, max_points), downsample(forecast_data, max_points, y_column='yhat')
+
+    def publish_series_store(self):
+        """Publish every configured symbol with processed and forecast data to the shared series store."""
+        frames, versions = {}, {}
+        for symbol in self.symbols:
+            try:
+                versions[symbol] = self.data_version(symbol)
+            except FileNotFoundError:
+                continue
+            frames[symbol] = self.read_data(symbol)
+        if frames:
+            self.series_store.publish(frames, versions)
+
     def plot_forecast(self, symbol):
         """
         Plot forecast results alongside historical data for a given symbol.
         Parameters:
         - symbol: The coin symbol to plot data for.
         """
+        import plotly.graph_objects as go
+
         historical_data, forecast_data = self.load_data(symbol)
         fig = go.Figure()
         # Historical data
@@ -74,4 +204,15 @@ class ModelForecasting:
             height=600
         )
         logger.info(f"Plotting forecast for {symbol}.")
-        fig.show()
\ No newline at end of file
+        fig.show()
+
+
+model_forecasting = None
+
+
+def get_model_forecasting(config_path):
+    """Process-wide ModelForecasting shared by the API routers."""
+    global model_forecasting
+    if model_forecasting is None:
+        model_forecasting = ModelForecasting(config_path=config_path)
+    return model_forecasting
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from PortfolioOptimizer.utils.utils import read_yaml
+from PortfolioOptimizer.components.artifactstore import get_artifact_store
+from PortfolioOptimizer.components.modelregistry import PANEL_MODEL, get_model_registry
+from PortfolioOptimizer.components.modeltrainingXGBoost import XGBoostForecasting, PanelXGBoostForecasting
+
+
+class ForecastInference:
+    def __init__(self, config_path):
+        """
+        Serves forecasts from registered models without retraining.
+        Each model version is loaded from the registry once, each symbol's forecaster (processed data
+        and derived features) is prepared once per model and data version, and finished forecasts are
+        kept in a bounded LRU, so repeated requests only pay for a dictionary lookup.
+        Parameters:
+        - config_path: Path to the configuration YAML file.
+        """
+        self.config = read_yaml(config_path)
+        self.store = get_artifact_store(self.config)
+        self.registry = get_model_registry(self.config)
+        self.mode = self.config['training']['mode']
+        self.maxsize = self.config.get('cache', {}).get('forecast_maxsize', 256)
+        self.models = {}
+        self.forecasters = {}
+        self.results = OrderedDict()
+        self.inflight = {}
+        self.lock = threading.Lock()
+
+    def model_name(self, symbol):
+        return PANEL_MODEL if self.mode == "panel" else symbol
+
+    def model(self, name):
+        """
+        Return (model, metadata) of the latest registered version of `name`, loading it at most once.
+        Raises:
+        - FileNotFoundError: if no model is registered under `name`.
+        """
+        version = self.registry.latest_version(name)
+        if version is None:
+            raise FileNotFoundError(f"No model registered for {name}")
+        with self.lock:
+            cached = self.models.get(name)
+            if cached is not None and cached[1]['version'] == version:
+                return cached
+        loaded = self.registry.load(name, version)
+        with self.lock:
+            self.models[name] = loaded
+        return loaded
+
+    def version(self, symbol):
+        """
+        Return (model version, processed data signature) identifying the forecasts of `symbol`.
+        Raises:
+        - FileNotFoundError: if the processed data or the model is missing.
+        """
+        name = self.model_name(symbol)
+        model_version = self.registry.latest_version(name)
+        if model_version is None:
+            raise FileNotFoundError(f"No model registered for {name}")
+        return model_version, self.store.signature("processed", symbol)
+
+    def forecaster(self, symbol, version):
+        """Return the forecaster of `symbol` with its model attached, prepared once per `version`."""
+        with self.lock:
+            cached = self.forecasters.get(symbol)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+        model, metadata = self.model(self.model_name(symbol))
+        data = self.store.read("processed", symbol)
+        if metadata['mode'] == "panel":
+            forecaster = PanelXGBoostForecasting({symbol: data}, self.config, categories=metadata['categories'])
+        else:
+            forecaster = XGBoostForecasting(data=data, date_column='ds', target_column='y', config=self.config)
+            forecaster.preprocess_data()
+        forecaster.use_model(model)
+        with self.lock:
+            self.forecasters[symbol] = (version, forecaster)
+        return forecaster
+
+    def forecast(self, symbol, future_periods=None):
+        """
+        Forecast `symbol` from its latest processed data with the registered model.
+        Parameters:
+        - symbol: The coin symbol.
+        - future_periods: Forecast horizon (defaults to `forecast_period`). Panel models hold the
+          effect of the longest horizon they were trained on for anything beyond it.
+        Returns:
+        - (DataFrame with 'ds', 'yhat' and the `yhat_q<quantile>` columns, version); the frame is shared and must not be modified.
+        Raises:
+        - FileNotFoundError: if the processed data or the model is missing.
+        - ValueError: if the panel model was trained without `symbol`.
+        """
+        future_periods = future_periods or self.config['forecast_period']
+        version = self.version(symbol)
+        key = (symbol, future_periods, version)
+        with self.lock:
+            if key in self.results:
+                self.results.move_to_end(key)
+                return self.results[key], version
+        forecaster = self.forecaster(symbol, version)
+        if isinstance(forecaster, PanelXGBoostForecasting):
+            forecast = forecaster.forecast(future_periods)[symbol]
+        else:
+            forecast = forecaster.forecast(future_periods)
+        with self.lock:
+            self.results[key] = forecast
+            while len(self.results) > self.maxsize:
+                self.results.popitem(last=False)
+        return forecast, version
+
+    async def forecast_async(self, symbol, future_periods=None):
+        """
+        Like `forecast`, computed in a worker thread; concurrent identical requests share one computation.
+        """
+        key = (symbol, future_periods or self.config['forecast_period'])
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(asyncio.to_thread(self.forecast, *key))
+            self.inflight[key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        return await asyncio.shield(task)
@@ -0,0 +1,139 @@
+import os
+import json
+import shutil
+import hashlib
+from datetime import datetime, timedelta, timezone
+from PortfolioOptimizer.logging import logger
+
+# Registry name of the model shared by every symbol in panel training mode
+PANEL_MODEL = "_panel"
+MODEL_FILE = "model.ubj"
+META_FILE = "meta.json"
+
+
+def training_fingerprint(store, symbols, params):
+    """Hash of the processed artifacts and training parameters a model was fitted on."""
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode())
+    for symbol in sorted(symbols):
+        digest.update(f"{symbol}:{store.digest('processed', symbol)}".encode())
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    def __init__(self, models_dir, keep_versions=5):
+        """
+        File-backed, versioned store of trained XGBoost models.
+        Each model name (a symbol, or PANEL_MODEL) has one `v{n}` directory per version holding the
+        booster in XGBoost's native binary (UBJSON) format and a `meta.json` with its feature schema,
+        training fingerprint and parameters; `latest.json` points at the newest version.
+        Parameters:
+        - models_dir: Root directory of the registry.
+        - keep_versions: Number of versions kept per name; older ones are deleted on register.
+        """
+        self.models_dir = models_dir
+        self.keep_versions = keep_versions
+
+    def _name_dir(self, name):
+        return os.path.join(self.models_dir, name)
+
+    def _version_dir(self, name, version):
+        return os.path.join(self._name_dir(name), f"v{version:04d}")
+
+    def versions(self, name):
+        """Registered version numbers of `name`, oldest first."""
+        name_dir = self._name_dir(name)
+        if not os.path.isdir(name_dir):
+            return []
+        return sorted(int(entry[1:]) for entry in os.listdir(name_dir)
+                      if entry.startswith("v") and entry[1:].isdigit())
+
+    def latest_version(self, name):
+        """Version `latest.json` points at, or None if nothing is registered."""
+        path = os.path.join(self._name_dir(name), "latest.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)["version"]
+
+    def metadata(self, name, version=None):
+        """
+        Metadata of a registered model (the latest version by default).
+        Raises:
+        - FileNotFoundError: if no such model is registered.
+        """
+        version = self.latest_version(name) if version is None else version
+        if version is None:
+            raise FileNotFoundError(f"No model registered for {name}")
+        path = os.path.join(self._version_dir(name, version), META_FILE)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Model {name} v{version} not found in {self.models_dir}")
+        with open(path) as f:
+            return json.load(f)
+
+    def load(self, name, version=None):
+        """
+        Load a registered model (the latest version by default).
+        Returns:
+        - (XGBRegressor, metadata)
+        Raises:
+        - FileNotFoundError: if no such model is registered.
+        """
+        import xgboost as xgb
+
+        metadata = self.metadata(name, version)
+        model = xgb.XGBRegressor(enable_categorical=True)
+        model.load_model(os.path.join(self._version_dir(name, metadata["version"]), MODEL_FILE))
+        return model, metadata
+
+    def register(self, name, model, metadata):
+        """
+        Save `model` as the next version of `name` and make it the latest.
+        The version directory is written under a temporary name and renamed into place, so
+        readers never see a half-written model.
+        Returns:
+        - The new version number.
+        """
+        versions = self.versions(name)
+        version = versions[-1] + 1 if versions else 1
+        version_dir = self._version_dir(name, version)
+        tmp_dir = f"{version_dir}.tmp-{os.getpid()}"
+        os.makedirs(tmp_dir, exist_ok=True)
+        try:
+            model.save_model(os.path.join(tmp_dir, MODEL_FILE))
+            metadata = {**metadata, "name": name, "version": version,
+                        "created_at": datetime.now(timezone.utc).isoformat()}
+            with open(os.path.join(tmp_dir, META_FILE), "w") as f:
+                json.dump(metadata, f, indent=2, default=str)
+            os.replace(tmp_dir, version_dir)
+        finally:
+            if os.path.exists(tmp_dir):
+                shutil.rmtree(tmp_dir)
+
+        latest_path = os.path.join(self._name_dir(name), "latest.json")
+        with open(f"{latest_path}.tmp-{os.getpid()}", "w") as f:
+            json.dump({"version": version}, f)
+        os.replace(f"{latest_path}.tmp-{os.getpid()}", latest_path)
+        logger.info(f"Registered model {name} v{version} at {version_dir}")
+
+        for old_version in self.versions(name)[:-self.keep_versions]:
+            shutil.rmtree(self._version_dir(name, old_version), ignore_errors=True)
+        return version
+
+    def reusable(self, name, params, max_age_hours):
+        """
+        Return (model, metadata) of the latest version if it was trained with `params` less than
+        `max_age_hours` ago, else None. Lets forecasts refresh on new data without retraining.
+        """
+        try:
+            metadata = self.metadata(name)
+        except FileNotFoundError:
+            return None
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(metadata["created_at"])
+        if age >= timedelta(hours=max_age_hours) or metadata.get("params") != json.loads(json.dumps(params, default=str)):
+            return None
+        return self.load(name, metadata["version"])
+
+
+def get_model_registry(config):
+    """Build the model registry configured under `paths.models_dir` and `training.keep_versions`."""
+    return ModelRegistry(config["paths"]["models_dir"], config["training"]["keep_versions"])
@@ -1,11 +1,16 @@
-import os
 import xgboost as xgb
+import numpy as np
 import pandas as pd
 from datetime import timedelta
 from PortfolioOptimizer.logging import logger
+from PortfolioOptimizer.instrumentation import span
 from PortfolioOptimizer.utils.utils import read_yaml
+from PortfolioOptimizer.components.artifactstore import get_artifact_store
+from PortfolioOptimizer.components.forecastintervals import add_quantiles, horizon_quantiles
 import plotly.graph_objects as go
 
+CALENDAR_FEATURES = ['day', 'month', 'weekday']
+
 
 class XGBoostForecasting:
     def __init__(self, data, date_column, target_column, config):
@@ -36,7 +41,7 @@ class XGBoostForecasting:
         last_date = self.data['ds'].max()
         start_date = last_date - timedelta(days=training_period)
         training_data = self.data[self.data['ds'] >= start_date]
-        features = training_data[['day', 'month', 'weekday']]
+        features = training_data[CALENDAR_FEATURES]
         target = training_data['y']
         return features, target, training_data
 
@@ -48,33 +53,50 @@ class XGBoostForecasting:
             learning_rate=0.01, max_depth=6,
             subsample=0.8, colsample_bytree=0.8
         )
-        self.model.fit(features, target)
+        with span("model_fit", model="xgboost") as timing:
+            timing.set(rows=len(features))
+            self.model.fit(features, target)
+
+    def use_model(self, model):
+        """Forecast with an already trained model (e.g. loaded from the model registry) instead of training."""
+        self.model = model
+
+    def model_metadata(self):
+        """Feature schema stored with the model in the registry."""
+        return {"mode": "per_symbol", "features": CALENDAR_FEATURES, "last_ds": self.data['ds'].max()}
 
-    def forecast(self, future_periods=180):
-        """Forecast future data using XGBoost."""
+    def forecast(self, future_periods=180, adjust=True, quantiles=None):
+        """
+        Forecast future data using XGBoost.
+        With `adjust`, the forecast is shifted so its first value equals the last observed value.
+        Parameters:
+        - quantiles: Quantiles added as `yhat_q<quantile>` columns (defaults to `forecast_intervals.quantiles`; empty for none).
+        """
         last_date = self.data['ds'].max()
-        forecast_dates = [last_date + timedelta(days=i) for i in range(1, future_periods + 1)]
+        forecast_dates = last_date + pd.to_timedelta(np.arange(1, future_periods + 1), unit='D')
         future_features = pd.DataFrame({
-            'day': [d.day for d in forecast_dates],
-            'month': [d.month for d in forecast_dates],
-            'weekday': [d.weekday() for d in forecast_dates]
+            'day': forecast_dates.day,
+            'month': forecast_dates.month,
+            'weekday': forecast_dates.weekday
         })
         forecast_values = self.model.predict(future_features)
-        last_training_value = self.data['y'].iloc[-1]
-        first_forecast_value = forecast_values[0]
-        adjustment_factor = last_training_value - first_forecast_value
-        forecast_values += adjustment_factor
+        if adjust:
+            last_training_value = self.data['y'].iloc[-1]
+            first_forecast_value = forecast_values[0]
+            adjustment_factor = last_training_value - first_forecast_value
+            forecast_values += adjustment_factor
 
-        return pd.DataFrame({'ds': forecast_dates, 'yhat': forecast_values})
+        forecast = pd.DataFrame({'ds': forecast_dates, 'yhat': forecast_values})
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_closes = np.log(self.data['y'].to_numpy(dtype=np.float64))
+        return with_intervals([forecast], [log_closes], quantiles, self.config)[0]
 
 
     def save_forecast(self, forecast, coin_name):
-        """Save the forecast results to a specified directory."""
-        forecast_dir = self.config['paths']['foresast_dir']
-        os.makedirs(forecast_dir, exist_ok=True)
-        forecast_path = os.path.join(forecast_dir, f"{coin_name}_Forecast.csv")
-        forecast.to_csv(forecast_path, index=False)
-        logger.info(f"Forecast saved at: {forecast_path}")
+        """Save the forecast results to the configured artifact store."""
+        store = get_artifact_store(self.config)
+        store.write("forecast", coin_name, forecast)
+        logger.info(f"Forecast saved at: {store.path('forecast', coin_name)}")
 
     def plot_forecast(self, forecast, coin_name):
         """Plot the forecast results."""
@@ -83,3 +105,179 @@ class XGBoostForecasting:
         fig.add_trace(go.Scatter(x=forecast['ds'], y=forecast['yhat'], mode='lines', name='Forecast', line=dict(color='green')))
         fig.update_layout(title=f'Forecast for {coin_name}', xaxis_title='Date', yaxis_title='Value', template='plotly_dark')
         fig.show()
+
+
+def with_intervals(forecasts, log_closes, quantiles, config):
+    """
+    Add residual-bootstrap quantile columns to one forecast per symbol, computed for all of them in one batch.
+    Parameters:
+    - forecasts: List of DataFrames with 'ds' and 'yhat' for horizons 1 .. n.
+    - log_closes: Log closes of each forecast's symbol, oldest first.
+    - quantiles: Quantiles to add (None uses `forecast_intervals.quantiles`).
+    Returns:
+    - The list of forecasts.
+    """
+    if quantiles is None:
+        quantiles = config['forecast_intervals']['quantiles']
+    if not len(quantiles):
+        return forecasts
+    horizons = np.arange(1, max(len(forecast) for forecast in forecasts) + 1)
+    offsets = horizon_quantiles(log_closes, horizons, quantiles, config['forecast_intervals']['window'])
+    return [add_quantiles(forecast, offsets[row], quantiles) for row, forecast in enumerate(forecasts)]
+
+
+# Features describing a symbol as of the forecast origin, computed only from candles up to it; the
+# panel model adds the horizon, the target date's calendar and the symbol itself. The processed
+# Prophet/ETS columns are left out: they come from fits over the whole history, so at a past
+# origin they would carry information about later prices.
+ORIGIN_FEATURES = ['ret_1', 'ret_7', 'ret_30', 'vol_7', 'vol_30', 'ma_gap_30', 'range_pct']
+
+
+class PanelXGBoostForecasting:
+    def __init__(self, frames, config, training_period=730, horizon_stride=6, categories=None):
+        """
+        One direct multi-horizon XGBoost model shared by every symbol.
+        Each row pairs an origin date with a horizon `h`; the features describe the series as of
+        the origin (lagged returns, rolling volatility, moving-average gap, daily range) plus
+        `h`, the target date's calendar and the symbol as a categorical, and the target is the log
+        return from the origin close to the close `h` steps later.
+
+        Parameters:
+        - frames: Dict of symbol -> DataFrame with 'ds', 'y' and 'High_Low_Diff' (e.g. as written by DataProcessing).
+        - config: Dictionary with configuration details.
+        - training_period: Days of origins used for training, counted back from each symbol's last date.
+        - horizon_stride: Spacing of the horizons sampled per origin during training.
+        - categories: Symbol category order of a previously trained model (defaults to the order of `frames`).
+        Raises:
+        - ValueError: if a symbol in `frames` is not one of `categories`.
+        """
+        self.frames = frames
+        self.config = config
+        self.symbols = list(frames)
+        self.categories = list(categories or frames)
+        unknown = [symbol for symbol in self.symbols if symbol not in self.categories]
+        if unknown:
+            raise ValueError(f"Symbols not known to the panel model: {', '.join(unknown)}")
+        self.training_period = training_period
+        self.horizon_stride = horizon_stride
+        self.state = {symbol: self.origin_features(frame) for symbol, frame in frames.items()}
+
+    @staticmethod
+    def origin_features(frame):
+        """Per-origin features and log closes of one symbol, oldest first."""
+        frame = frame.sort_values('ds')
+        y = frame['y'].to_numpy(dtype=np.float64)
+        log_y = np.log(y)
+        log_returns = pd.Series(np.diff(log_y, prepend=np.nan))
+        log_close = pd.Series(log_y)
+        features = pd.DataFrame({
+            'ret_1': log_returns,
+            'ret_7': log_close - log_close.shift(7),
+            'ret_30': log_close - log_close.shift(30),
+            'vol_7': log_returns.rolling(7).std(),
+            'vol_30': log_returns.rolling(30).std(),
+            'ma_gap_30': log_close - np.log(pd.Series(y).rolling(30).mean()),
+            'range_pct': frame['High_Low_Diff'].to_numpy() / y,
+        })
+        return {
+            'ds': pd.DatetimeIndex(frame['ds']),
+            'log_y': log_y,
+            'features': features[ORIGIN_FEATURES].to_numpy(dtype=np.float32),
+        }
+
+    def design_matrix(self, symbol_codes, features, horizons, target_dates):
+        """Stack origin features, horizons, target-date calendar and symbol codes into one frame."""
+        X = pd.DataFrame(features, columns=ORIGIN_FEATURES)
+        X['horizon'] = horizons.astype(np.float32)
+        X['day'] = target_dates.day
+        X['month'] = target_dates.month
+        X['weekday'] = target_dates.weekday
+        X['symbol'] = pd.Categorical.from_codes(symbol_codes, categories=self.categories)
+        return X
+
+    def training_rows(self, future_periods):
+        """Build the stacked training set: every (symbol, origin, sampled horizon) with a known outcome."""
+        horizons = np.unique(np.r_[np.arange(1, future_periods + 1, self.horizon_stride), future_periods])
+        codes, features, steps, dates, targets = [], [], [], [], []
+        for symbol in self.symbols:
+            code = self.categories.index(symbol)
+            state = self.state[symbol]
+            ds, log_y, origin_features = state['ds'], state['log_y'], state['features']
+            eligible = np.flatnonzero(
+                (ds >= ds[-1] - timedelta(days=self.training_period)) & ~np.isnan(origin_features).any(axis=1)
+            )
+            for h in horizons:
+                origins = eligible[eligible + h < len(ds)]
+                codes.append(np.full(len(origins), code))
+                features.append(origin_features[origins])
+                steps.append(np.full(len(origins), h))
+                dates.append(ds[origins + h])
+                targets.append(log_y[origins + h] - log_y[origins])
+        X = self.design_matrix(
+            np.concatenate(codes), np.concatenate(features), np.concatenate(steps),
+            pd.DatetimeIndex(np.concatenate([d.to_numpy() for d in dates]))
+        )
+        return X, np.concatenate(targets)
+
+    def train_model(self, future_periods=180):
+        """Train the shared model once on all symbols with the histogram tree method on every core."""
+        X, target = self.training_rows(future_periods)
+        logger.info(f"Training panel XGBoost model on {len(X)} rows from {len(self.symbols)} symbols")
+        self.model = xgb.XGBRegressor(
+            objective='reg:squarederror', n_estimators=500,
+            learning_rate=0.05, max_depth=6,
+            subsample=0.8, colsample_bytree=0.8,
+            tree_method='hist', enable_categorical=True, n_jobs=-1
+        )
+        with span("model_fit", model="xgboost_panel") as timing:
+            timing.set(rows=len(X))
+            self.model.fit(X, target)
+
+    def use_model(self, model):
+        """Forecast with an already trained model (e.g. loaded from the model registry) instead of training."""
+        self.model = model
+
+    def model_metadata(self):
+        """Feature schema and symbol categories stored with the model in the registry."""
+        return {
+            "mode": "panel",
+            "features": [*ORIGIN_FEATURES, 'horizon', *CALENDAR_FEATURES, 'symbol'],
+            "categories": self.categories,
+            "last_ds": {symbol: self.state[symbol]['ds'][-1] for symbol in self.symbols},
+        }
+
+    def forecast(self, future_periods=180, quantiles=None):
+        """
+        Forecast every symbol's horizon with a single `predict` call.
+        Parameters:
+        - quantiles: Quantiles added as `yhat_q<quantile>` columns (defaults to `forecast_intervals.quantiles`; empty for none).
+        Returns:
+        - Dict of symbol -> DataFrame with 'ds', 'yhat' and the quantile columns, anchored on the symbol's last close.
+        """
+        horizons = np.arange(1, future_periods + 1)
+        codes, features, steps, dates = [], [], [], []
+        for symbol in self.symbols:
+            code = self.categories.index(symbol)
+            state = self.state[symbol]
+            last_date = state['ds'][-1]
+            codes.append(np.full(future_periods, code))
+            features.append(np.repeat(state['features'][-1:], future_periods, axis=0))
+            steps.append(horizons)
+            dates.append(last_date + pd.to_timedelta(horizons, unit='D'))
+        X = self.design_matrix(
+            np.concatenate(codes), np.concatenate(features), np.concatenate(steps),
+            pd.DatetimeIndex(np.concatenate([d.to_numpy() for d in dates]))
+        )
+        predictions = self.model.predict(X).reshape(len(self.symbols), future_periods)
+        forecasts = [
+            pd.DataFrame({'ds': dates[row], 'yhat': np.exp(self.state[symbol]['log_y'][-1] + predictions[row])})
+            for row, symbol in enumerate(self.symbols)
+        ]
+        log_closes = [self.state[symbol]['log_y'] for symbol in self.symbols]
+        return dict(zip(self.symbols, with_intervals(forecasts, log_closes, quantiles, self.config)))
+
+    def save_forecasts(self, forecasts):
+        """Save every symbol's forecast to the configured artifact store."""
+        store = get_artifact_store(self.config)
+        for symbol, forecast in forecasts.items():
+            store.write("forecast", symbol, forecast)
@@ -0,0 +1,194 @@
+import os
+import re
+import time
+import hashlib
+import threading
+from PortfolioOptimizer.logging import logger
+from PortfolioOptimizer.instrumentation import span
+
+# Extensions the API hands out, with the media type they are served as
+MEDIA_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".png": "image/png",
+    ".json": "application/json",
+}
+NAME_PATTERN = re.compile(r"^[0-9a-f]{32}(" + "|".join(re.escape(extension) for extension in MEDIA_TYPES) + r")$")
+# Suffix of the compressed copy kept next to an output for each content coding
+VARIANT_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+FILE_PATTERN = re.compile(NAME_PATTERN.pattern[:-1] + "(" + "|".join(re.escape(suffix) for suffix in VARIANT_SUFFIXES.values()) + r")?$")
+# Temporary files older than this are leftovers of interrupted writes
+STALE_TMP_SECONDS = 3600
+
+
+class OutputStore:
+    def __init__(self, output_dir, max_bytes=512 * 1024 * 1024, low_water=0.9):
+        """
+        Content-addressed, size-bounded directory of rendered outputs (pages and plot images) served by the API.
+        Files are named after the SHA-256 of their content and written through a temporary file and
+        `os.replace`, so concurrent writers of the same output never produce torn files and the
+        name never depends on user input. Compressed copies are kept next to an output once they
+        have been asked for. Reads and rewrites refresh a file's mtime, and once the directory
+        outgrows `max_bytes` the least recently used files are deleted.
+        Parameters:
+        - output_dir: Directory holding the outputs.
+        - max_bytes: Size cap of the directory.
+        - low_water: Fraction of `max_bytes` garbage collection shrinks the directory to.
+        """
+        self.output_dir = output_dir
+        self.max_bytes = max_bytes
+        self.low_water = low_water
+        self.size = None
+        self.lock = threading.Lock()
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    @staticmethod
+    def name(content, extension):
+        return f"{hashlib.sha256(content).hexdigest()[:32]}{extension}"
+
+    def path(self, name):
+        """
+        On-disk path of a stored output.
+        Raises:
+        - FileNotFoundError: for names this store never hands out (which also rules out path traversal).
+        """
+        if not NAME_PATTERN.match(name):
+            raise FileNotFoundError(f"Not a stored output: {name}")
+        return os.path.join(self.output_dir, name)
+
+    def _scan(self):
+        """(path, mtime, size) of every stored file, oldest first, removing stale temporary files on the way."""
+        entries = []
+        now = time.time()
+        with os.scandir(self.output_dir) as scan:
+            for entry in scan:
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if FILE_PATTERN.match(entry.name):
+                    entries.append((entry.path, stat.st_mtime, stat.st_size))
+                elif ".tmp-" in entry.name and now - stat.st_mtime > STALE_TMP_SECONDS:
+                    self._remove(entry.path)
+        return sorted(entries, key=lambda entry: entry[1])
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def collect_garbage(self):
+        """
+        Delete the least recently used outputs until the directory fits in `low_water * max_bytes`.
+        Other processes may share the directory, so the sizes are always re-read from disk.
+        Returns:
+        - Number of files deleted.
+        """
+        with self.lock, span("output_gc") as timing:
+            entries = self._scan()
+            size = sum(entry[2] for entry in entries)
+            target = self.low_water * self.max_bytes if size > self.max_bytes else size
+            removed = freed = 0
+            for path, _, file_size in entries:
+                if size - freed <= target:
+                    break
+                if self._remove(path):
+                    removed += 1
+                freed += file_size
+            self.size = size - freed
+            timing.set(rows=removed, bytes=freed)
+        if removed:
+            logger.info(f"Output store: removed {removed} least recently used files ({freed / 2 ** 20:.1f} MiB)")
+        return removed
+
+    def put(self, content, extension):
+        """
+        Store `content` (bytes) unless an identical output already exists.
+        Returns:
+        - The output's name (content hash and extension), to be passed to `path` or served under /display/.
+        """
+        if extension not in MEDIA_TYPES:
+            raise ValueError(f"Unsupported output type: {extension}")
+        name = self.name(content, extension)
+        path = os.path.join(self.output_dir, name)
+        try:
+            # Already stored: only mark it as recently used
+            os.utime(path)
+            return name
+        except FileNotFoundError:
+            pass
+        self._write(path, content, extension.lstrip("."))
+        return name
+
+    def _write(self, path, content, label):
+        if self.size is None:
+            self.collect_garbage()
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with span("output_write", format=label) as timing:
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            timing.set(bytes=len(content))
+        with self.lock:
+            self.size += len(content)
+            over_cap = self.size > self.max_bytes
+        if over_cap:
+            self.collect_garbage()
+
+    def exists(self, name):
+        """Whether `name` is a stored output that has not been garbage-collected."""
+        try:
+            return os.path.exists(self.path(name))
+        except FileNotFoundError:
+            return False
+
+    def read(self, name):
+        """
+        Return the bytes of a stored output and mark it as recently used.
+        Raises:
+        - FileNotFoundError: if the output does not exist (or was garbage-collected).
+        """
+        return self._read(self.path(name))
+
+    @staticmethod
+    def _read(path):
+        with open(path, "rb") as f:
+            content = f.read()
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return content
+
+    def read_variant(self, name, encoding, encode):
+        """
+        Return a stored output in the content coding `encoding` (None for the output itself).
+        The coded copy is made with `encode(content, encoding)` on first use and stored next to
+        the output, so each output is compressed at most once per coding.
+        Raises:
+        - FileNotFoundError: if the output does not exist (or was garbage-collected).
+        """
+        if encoding is None:
+            return self.read(name)
+        path = self.path(name) + VARIANT_SUFFIXES[encoding]
+        try:
+            return self._read(path)
+        except FileNotFoundError:
+            pass
+        content = encode(self.read(name), encoding)
+        self._write(path, content, encoding)
+        return content
+
+
+output_store = None
+
+
+def get_output_store(config):
+    """Process-wide OutputStore configured from the `outputs` section of the configuration."""
+    global output_store
+    if output_store is None:
+        output_config = config["outputs"]
+        output_store = OutputStore(output_config["dir"], output_config["max_bytes"])
+    return output_store
@@ -0,0 +1,285 @@
+import os
+import sys
+import json
+import uuid
+import fcntl
+import asyncio
+from collections import deque
+from datetime import datetime, timezone
+from PortfolioOptimizer.logging import logger
+
+ACTIVE_STATUSES = ("queued", "running")
+# Error recorded on jobs whose API worker and pipeline process both exited without recording a result
+INTERRUPTED_ERROR = "Job was interrupted: its pipeline process exited without reporting a result."
+
+
+class PipelineBusy(Exception):
+    """Raised when another API worker holds the run lock but has not recorded its job yet."""
+
+
+def utc_now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class PipelineJob:
+    def __init__(self, job_id, job_dir, force=False, only=None):
+        self.job_id = job_id
+        self.job_dir = job_dir
+        self.force = force
+        self.only = only
+        self.status = "queued"
+        self.created_at = utc_now()
+        self.started_at = None
+        self.finished_at = None
+        self.returncode = None
+        self.error = None
+        self.pid = None
+
+    @property
+    def progress_file(self):
+        return os.path.join(self.job_dir, "progress.jsonl")
+
+    @property
+    def log_file(self):
+        return os.path.join(self.job_dir, "output.log")
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "force": self.force,
+            "only": self.only,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "returncode": self.returncode,
+            "error": self.error,
+            "pid": self.pid,
+        }
+
+    def save(self):
+        tmp_path = os.path.join(self.job_dir, "job.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, os.path.join(self.job_dir, "job.json"))
+
+
+class PipelineJobManager:
+    def __init__(self, pipeline_file, jobs_dir="logs/jobs"):
+        """
+        Runs the pipeline as a background subprocess, one job at a time across every API worker.
+        A run is claimed with an exclusive `flock` on `<jobs_dir>/pipeline.lock`, which also records
+        the id of the job holding it. The pipeline process inherits the locked descriptor, so the
+        claim lasts until both the API worker and the pipeline have exited, and the OS releases it
+        even when they are killed. Jobs still "queued"/"running" while nobody holds the lock are stale
+        and get marked as finished on startup and whenever they are read.
+        Parameters:
+        - pipeline_file: Path of the pipeline script.
+        - jobs_dir: Directory holding one sub-directory (metadata, progress events, output) per job.
+        """
+        self.pipeline_file = pipeline_file
+        self.jobs_dir = jobs_dir
+        self.lock_file = os.path.join(jobs_dir, "pipeline.lock")
+        self.jobs = {}
+        self.active = None
+        self.task = None
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self.recover_stale_jobs()
+
+    def _try_lock(self):
+        """Open the run lock and take it without blocking; returns the locked descriptor, or None if it is held."""
+        fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        return fd
+
+    def lock_owner(self):
+        """
+        Id of the job holding the run lock.
+        Returns:
+        - The job id, "" while the holder has not recorded it yet, or None when no run is in progress.
+        """
+        fd = self._try_lock()
+        if fd is not None:
+            os.close(fd)
+            return None
+        with open(self.lock_file) as f:
+            return f.read().strip()
+
+    def _settle_stale(self, job):
+        """Give a job left active by a dead run its final status, from the pipeline's own run_finished event if any."""
+        finished = None
+        if os.path.exists(job.progress_file):
+            with open(job.progress_file) as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if event["event"] == "run_finished":
+                        finished = event
+        if finished is not None and finished["status"] == "success":
+            job.status = "succeeded"
+        else:
+            job.status = "failed"
+            job.error = finished.get("error") if finished is not None else INTERRUPTED_ERROR
+        job.finished_at = job.finished_at or utc_now()
+        job.save()
+        logger.warning(f"Pipeline job {job.job_id} was left {'running' if job.started_at else 'queued'} "
+                       f"by a process that exited; marked as {job.status}")
+
+    def recover_stale_jobs(self):
+        """
+        Finish every job recorded as queued/running that no live run holds the lock for.
+        Returns:
+        - Ids of the jobs that were settled.
+        """
+        owner = self.lock_owner()
+        settled = []
+        for job_id in sorted(os.listdir(self.jobs_dir)):
+            if job_id == owner or not os.path.isdir(os.path.join(self.jobs_dir, job_id)):
+                continue
+            job = self._load(job_id)
+            if job is not None and job.status in ACTIVE_STATUSES:
+                self._settle_stale(job)
+                settled.append(job_id)
+        return settled
+
+    def submit(self, force=False, only=None):
+        """
+        Start a pipeline job, or return the job already queued/running (concurrent triggers are de-duplicated).
+        Returns:
+        - (PipelineJob, deduplicated flag)
+        Raises:
+        - FileNotFoundError: if the pipeline script does not exist.
+        - PipelineBusy: if another API worker is starting a job right now.
+        """
+        if not os.path.exists(self.pipeline_file):
+            raise FileNotFoundError(f"Pipeline file '{self.pipeline_file}' not found.")
+        if self.active is not None and self.active.status in ACTIVE_STATUSES:
+            return self.active, True
+        lock_fd = self._try_lock()
+        if lock_fd is None:
+            # Another worker (or a pipeline outliving its worker) holds the run
+            owner = self.lock_owner()
+            job = self.get(owner) if owner else None
+            if job is None or job.status not in ACTIVE_STATUSES:
+                raise PipelineBusy("Another pipeline job is starting or finishing; retry shortly.")
+            return job, True
+        job_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:8]
+        try:
+            os.ftruncate(lock_fd, 0)
+            os.pwrite(lock_fd, job_id.encode(), 0)
+            job_dir = os.path.join(self.jobs_dir, job_id)
+            os.makedirs(job_dir, exist_ok=True)
+            job = PipelineJob(job_id, job_dir, force=force, only=only)
+            job.save()
+        except Exception:
+            os.close(lock_fd)
+            raise
+        self.jobs[job_id] = job
+        self.active = job
+        self.task = asyncio.get_running_loop().create_task(self._run(job, lock_fd))
+        return job, False
+
+    async def _run(self, job, lock_fd):
+        command = [sys.executable, self.pipeline_file, "--progress-file", job.progress_file]
+        if job.force:
+            command.append("--force")
+        for symbol in job.only or []:
+            command.extend(["--only", symbol])
+        job.status = "running"
+        job.started_at = utc_now()
+        job.save()
+        logger.info(f"Pipeline job {job.job_id} started: {' '.join(command)}")
+        try:
+            with open(job.log_file, "wb") as log:
+                # The pipeline keeps the run lock if this worker dies first
+                process = await asyncio.create_subprocess_exec(*command, stdout=log, stderr=asyncio.subprocess.STDOUT,
+                                                               pass_fds=(lock_fd,))
+                job.pid = process.pid
+                job.save()
+                job.returncode = await process.wait()
+            job.status = "succeeded" if job.returncode == 0 else "failed"
+            if job.returncode != 0:
+                job.error = f"Pipeline execution failed with exit code {job.returncode}."
+        except Exception as e:
+            job.status = "failed"
+            job.error = f"An unexpected error occurred: {e}"
+        finally:
+            job.finished_at = utc_now()
+            job.save()
+            os.close(lock_fd)
+        logger.info(f"Pipeline job {job.job_id} {job.status}")
+
+    def _load(self, job_id):
+        job_file = os.path.join(self.jobs_dir, os.path.basename(job_id), "job.json")
+        if not os.path.exists(job_file):
+            return None
+        with open(job_file) as f:
+            data = json.load(f)
+        job = PipelineJob(data["job_id"], os.path.dirname(job_file), data["force"], data["only"])
+        for key in ("status", "created_at", "started_at", "finished_at", "returncode", "error", "pid"):
+            setattr(job, key, data.get(key))
+        return job
+
+    def get(self, job_id):
+        """Return the job by id, loading jobs started by other API workers from disk (and settling them if their run died)."""
+        if job_id in self.jobs:
+            return self.jobs[job_id]
+        job = self._load(job_id)
+        if job is not None and job.status in ACTIVE_STATUSES and self.lock_owner() != job.job_id:
+            self._settle_stale(job)
+        return job
+
+    def list_jobs(self, limit=20):
+        job_ids = sorted((entry for entry in os.listdir(self.jobs_dir) if entry != "pipeline.lock"), reverse=True)[:limit]
+        return [job.to_dict() for job in map(self.get, job_ids) if job is not None]
+
+    def progress(self, job):
+        """
+        Summarise the job's progress events.
+        Returns:
+        - Dict with symbol counts, the stage each symbol is in, per-symbol stage timings and skipped stages.
+        """
+        symbols = {}
+        total = None
+        if os.path.exists(job.progress_file):
+            with open(job.progress_file) as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if event["event"] == "run_started":
+                        total = len(event["symbols"])
+                        for symbol in event["symbols"]:
+                            symbols.setdefault(symbol, {"status": "pending", "current_stage": None, "timings": {}, "skipped": []})
+                        continue
+                    if "symbol" not in event:
+                        continue
+                    state = symbols.setdefault(event["symbol"], {"status": "pending", "current_stage": None, "timings": {}, "skipped": []})
+                    if event["event"] == "stage_started":
+                        state.update(status="running", current_stage=event["stage"])
+                    elif event["event"] == "stage_skipped":
+                        state["skipped"].append(event["stage"])
+                    elif event["event"] == "stage_finished":
+                        state["timings"][event["stage"]] = event["seconds"]
+                    elif event["event"] == "symbol_finished":
+                        state.update(status=event["status"], current_stage=None, error=event.get("error"))
+        finished = [s for s, state in symbols.items() if state["status"] in ("success", "failed")]
+        return {
+            "symbols_total": total if total is not None else len(symbols),
+            "symbols_finished": len(finished),
+            "symbols_failed": [s for s in finished if symbols[s]["status"] == "failed"],
+            "symbols": symbols,
+        }
+
+    def log_tail(self, job, lines=100):
+        if not os.path.exists(job.log_file):
+            return []
+        with open(job.log_file, "r", errors="replace") as f:
+            return [line.rstrip("\n") for line in deque(f, maxlen=lines)]
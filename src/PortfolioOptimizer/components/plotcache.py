@@ -0,0 +1,136 @@
+import os
+import glob
+import asyncio
+import hashlib
+import threading
+from datetime import date
+from collections import OrderedDict, namedtuple
+from PortfolioOptimizer.logging import logger
+
+RenderedPlot = namedtuple("RenderedPlot", ["content", "etag"])
+
+
+def make_etag(content):
+    """Strong ETag derived from the rendered bytes."""
+    return f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+def plot_version(kind, data_version):
+    """Cache version of a rendered plot; the Matplotlib plot highlights today's value, so it also depends on the date."""
+    if kind == "matplotlib":
+        return (*data_version, date.today().isoformat())
+    return data_version
+
+
+class PlotCache:
+    def __init__(self, cache_dir, max_bytes=256 * 1024 * 1024):
+        """
+        Render-once cache of plot bytes keyed by (plot kind, symbol set, data version).
+        Entries live in a byte-bounded in-memory LRU backed by `cache_dir`, which lets the
+        pipeline pre-render plots that API workers then pick up without rendering.
+        Parameters:
+        - cache_dir: Directory holding the on-disk copies.
+        - max_bytes: Upper bound on the in-memory LRU size.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.inflight = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _names(kind, symbols, version):
+        prefix = f"{kind}-{hashlib.sha1('|'.join(symbols).encode()).hexdigest()[:16]}"
+        return prefix, f"{prefix}-{hashlib.sha1(repr(version).encode()).hexdigest()[:16]}"
+
+    def _remember(self, prefix, name, rendered):
+        with self.lock:
+            for stale in [key for key in self.entries if key[0] == prefix and key[1] != name]:
+                self.size -= len(self.entries.pop(stale).content)
+            if (prefix, name) not in self.entries:
+                self.size += len(rendered.content)
+            self.entries[(prefix, name)] = rendered
+            self.entries.move_to_end((prefix, name))
+            while self.size > self.max_bytes and len(self.entries) > 1:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted.content)
+
+    def get(self, kind, symbols, version):
+        """Return the cached RenderedPlot, or None if this version has not been rendered yet."""
+        prefix, name = self._names(kind, symbols, version)
+        with self.lock:
+            rendered = self.entries.get((prefix, name))
+            if rendered is not None:
+                self.entries.move_to_end((prefix, name))
+                return rendered
+        path = os.path.join(self.cache_dir, f"{name}.bin")
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            content = f.read()
+        rendered = RenderedPlot(content, make_etag(content))
+        self._remember(prefix, name, rendered)
+        return rendered
+
+    def put(self, kind, symbols, version, content, persist=True):
+        """Store freshly rendered bytes and drop older versions of the same plot."""
+        prefix, name = self._names(kind, symbols, version)
+        rendered = RenderedPlot(content, make_etag(content))
+        self._remember(prefix, name, rendered)
+        if persist:
+            path = os.path.join(self.cache_dir, f"{name}.bin")
+            tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            for stale in glob.glob(os.path.join(self.cache_dir, f"{prefix}-*.bin")):
+                if stale != path:
+                    try:
+                        os.remove(stale)
+                    except FileNotFoundError:
+                        pass
+        return rendered
+
+    def get_or_render(self, kind, symbols, version, render, persist=True):
+        """
+        Return the cached plot or call `render()` (which must return bytes) and cache the result.
+        """
+        rendered = self.get(kind, symbols, version)
+        if rendered is None:
+            logger.info(f"Rendering {kind} plot for {', '.join(symbols)}")
+            rendered = self.put(kind, symbols, version, render(), persist=persist)
+        return rendered
+
+    async def get_or_render_async(self, kind, symbols, version, render, persist=True):
+        """
+        Like `get_or_render`, but `render()` returns an awaitable resolving to bytes.
+        Concurrent misses for the same plot and version share one render.
+        """
+        rendered = self.get(kind, symbols, version)
+        if rendered is not None:
+            return rendered
+        key = self._names(kind, symbols, version)
+        task = self.inflight.get(key)
+        if task is None:
+            async def render_and_put():
+                logger.info(f"Rendering {kind} plot for {', '.join(symbols)}")
+                return self.put(kind, symbols, version, await render(), persist=persist)
+
+            task = asyncio.ensure_future(render_and_put())
+            self.inflight[key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+
+plot_cache = None
+
+
+def get_plot_cache(config):
+    """Process-wide PlotCache configured from the `plots` section of the configuration."""
+    global plot_cache
+    if plot_cache is None:
+        plot_config = config["plots"]
+        plot_cache = PlotCache(plot_config["cache_dir"], plot_config["cache_max_bytes"])
+    return plot_cache
@@ -0,0 +1,163 @@
+import io
+import time
+import pandas as pd
+from matplotlib.figure import Figure
+import seaborn as sns
+import plotly.graph_objects as go
+from PortfolioOptimizer.components.forecastintervals import quantile_bands
+
+# Opacity of each prediction-interval band; the narrower bands drawn on top of the wider ones darken the centre
+BAND_ALPHA = 0.15
+
+
+def plotly_figure(symbol, historical_data, forecast_data):
+    """
+    Build the Plotly forecast figure for a given symbol.
+    """
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=historical_data['ds'],
+        y=historical_data['y'],
+        mode='lines',
+        name='Historical Data',
+        line=dict(color='black')
+    ))
+
+    for lower, upper, coverage in quantile_bands(forecast_data.columns):
+        fig.add_trace(go.Scatter(
+            x=forecast_data['ds'], y=forecast_data[upper],
+            mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip',
+            legendgroup=lower
+        ))
+        fig.add_trace(go.Scatter(
+            x=forecast_data['ds'], y=forecast_data[lower],
+            mode='lines', line=dict(width=0), fill='tonexty',
+            fillcolor=f'rgba(255, 0, 0, {BAND_ALPHA})',
+            name=f'{coverage:.0%} Interval', legendgroup=lower
+        ))
+
+    fig.add_trace(go.Scatter(
+        x=forecast_data['ds'],
+        y=forecast_data['yhat'],
+        mode='lines',
+        name='Forecast',
+        line=dict(color='red', dash='dash')
+    ))
+
+    fig.update_layout(
+        title=f"{symbol} Forecasting",
+        xaxis_title="Date",
+        yaxis_title="Value",
+        template="plotly_white",
+        legend=dict(orientation="h", x=0.5, y=-0.2, xanchor="center"),
+        height=600
+    )
+    return fig
+
+
+def render_plotly_json(symbol, historical_data, forecast_data):
+    """
+    Render the Plotly forecast figure for a given symbol as its JSON specification.
+    Pages load plotly.js once and draw each figure with `Plotly.newPlot`, so nothing else is inlined.
+    Returns:
+    - UTF-8 encoded figure JSON.
+    """
+    return plotly_figure(symbol, historical_data, forecast_data).to_json().encode("utf-8")
+
+
+def fill_bands(ax, forecast_data, color="red"):
+    """Shade the forecast's prediction intervals (if it has quantile columns) on a Matplotlib axis."""
+    for lower, upper, coverage in quantile_bands(forecast_data.columns):
+        ax.fill_between(
+            forecast_data['ds'], forecast_data[lower], forecast_data[upper],
+            color=color, alpha=BAND_ALPHA, linewidth=0, label=f"{coverage:.0%} Interval"
+        )
+
+
+def render_matplotlib_png(symbol, historical_data, forecast_data):
+    """
+    Render an enhanced Matplotlib forecast plot for a given symbol.
+    Uses the object-oriented Figure API, so no pyplot global state is shared between renders.
+    Returns:
+    - PNG bytes.
+    """
+    forecast_start_date = forecast_data['ds'].iloc[0]
+    today_date = pd.Timestamp.now().normalize()
+
+    current_value = None
+    if today_date in historical_data['ds'].values:
+        current_value = historical_data.loc[historical_data['ds'] == today_date, 'y'].values[0]
+
+    fig = Figure(figsize=(16, 9))
+    ax = fig.subplots()
+    ax.plot(historical_data['ds'], historical_data['y'], label="Historical Data", color="black", linewidth=2)
+    ax.plot(forecast_data['ds'], forecast_data['yhat'], label="Forecast", color="red", linestyle="--", linewidth=2)
+    fill_bands(ax, forecast_data)
+
+    ax.axvline(forecast_start_date, color="blue", linestyle="--", linewidth=1.5, label="Forecast Start")
+
+    if current_value is not None:
+        ax.scatter(today_date, current_value, color="green", label=f"Today's Value: {current_value:.2f}", zorder=5)
+        ax.text(
+            today_date, current_value, f" {current_value:.2f}",
+            color="green", fontsize=10, fontweight="bold", verticalalignment="bottom"
+        )
+
+    ax.set_title(f"{symbol} Forecasting with Highlights", fontsize=18, fontweight="bold")
+    ax.set_xlabel("Date", fontsize=14)
+    ax.set_ylabel("Value", fontsize=14)
+    ax.tick_params(axis="both", labelsize=12)
+    ax.legend(fontsize=12)
+    ax.grid(True, linestyle="--", alpha=0.6)
+
+    buffer = io.BytesIO()
+    fig.tight_layout()
+    fig.savefig(buffer, format="png", dpi=150)
+
+    return buffer.getvalue()
+
+
+def render_seaborn_png(symbol, historical_data, forecast_data):
+    """
+    Render a Seaborn forecast plot for a given symbol on its own Figure.
+    Returns:
+    - PNG bytes.
+    """
+    combined_data = pd.concat([
+        historical_data[['ds', 'y']].assign(Type='Actual Data'),
+        forecast_data[['ds', 'yhat']].rename(columns={'yhat': 'y'}).assign(Type='Forecast')
+    ], ignore_index=True)
+
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    sns.lineplot(data=combined_data, x='ds', y='y', hue='Type', style='Type', markers=False, dashes=False, ax=ax)
+    fill_bands(ax, forecast_data)
+    ax.set_title(f"{symbol} Forecasting", fontsize=16)
+    ax.set_xlabel("Date", fontsize=14)
+    ax.set_ylabel("Value", fontsize=14)
+    ax.legend(title="Data Type", loc='upper left')
+    ax.grid(True)
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=150)
+
+    return buffer.getvalue()
+
+
+PLOT_RENDERERS = {
+    "plotly_json": render_plotly_json,
+    "matplotlib": render_matplotlib_png,
+    "seaborn": render_seaborn_png,
+}
+
+
+def render_plot(kind, symbol, historical_data, forecast_data):
+    """
+    Render-pool entry point.
+    Returns:
+    - (rendered bytes, render time in seconds measured inside the worker).
+    """
+    start = time.perf_counter()
+    content = PLOT_RENDERERS[kind](symbol, historical_data, forecast_data)
+    return content, time.perf_counter() - start
@@ -0,0 +1,215 @@
+import threading
+import numpy as np
+import pandas as pd
+from sklearn.covariance import ledoit_wolf
+from PortfolioOptimizer.logging import logger
+from PortfolioOptimizer.utils.utils import read_yaml
+from PortfolioOptimizer.components.artifactstore import get_artifact_store
+
+DAYS_PER_YEAR = 365.25
+
+
+def project_simplex(V):
+    """
+    Euclidean projection of every row of `V` onto the probability simplex {w >= 0, sum(w) = 1}.
+    Parameters:
+    - V: Array of shape (batch, assets).
+    Returns:
+    - Array of the same shape with non-negative rows summing to one.
+    """
+    n = V.shape[1]
+    U = -np.sort(-V, axis=1)
+    cumulative = np.cumsum(U, axis=1) - 1.0
+    positive = U - cumulative / np.arange(1, n + 1) > 0
+    rho = n - 1 - np.argmax(positive[:, ::-1], axis=1)
+    theta = cumulative[np.arange(V.shape[0]), rho] / (rho + 1)
+    return np.maximum(V - theta[:, None], 0.0)
+
+
+def solve_mean_variance(mu, cov, risk_aversions, tol=1e-8, max_iter=20000):
+    """
+    Long-only, fully invested mean-variance portfolios  max_w  w'mu - (lambda / 2) w'Cov w,
+    solved for every risk aversion at once by accelerated projected gradient (FISTA with
+    adaptive restart). Rows that have converged drop out of the batch.
+    Parameters:
+    - mu: Expected returns, shape (assets,).
+    - cov: Covariance matrix, shape (assets, assets).
+    - risk_aversions: Array of lambdas, shape (batch,).
+    Returns:
+    - Weights of shape (batch, assets).
+    """
+    risk_aversions = np.asarray(risk_aversions, dtype=float)
+    batch, n = len(risk_aversions), len(mu)
+    step = 1.0 / (risk_aversions * np.linalg.eigvalsh(cov)[-1])
+    W = np.full((batch, n), 1.0 / n)
+    Y = W.copy()
+    t = np.ones(batch)
+    active = np.arange(batch)
+    for _ in range(max_iter):
+        Y_a, W_a, t_a = Y[active], W[active], t[active]
+        gradient = risk_aversions[active, None] * (Y_a @ cov) - mu[None, :]
+        W_next = project_simplex(Y_a - step[active, None] * gradient)
+        # Restart the momentum of rows whose step points against it
+        t_a = np.where(np.einsum('ij,ij->i', Y_a - W_next, W_next - W_a) > 0, 1.0, t_a)
+        t_next = (1 + np.sqrt(1 + 4 * t_a * t_a)) / 2
+        Y[active] = W_next + ((t_a - 1) / t_next)[:, None] * (W_next - W_a)
+        change = np.abs(W_next - W_a).max(axis=1)
+        W[active] = W_next
+        t[active] = t_next
+        active = active[change >= tol]
+        if active.size == 0:
+            break
+    else:
+        logger.warning(f"Mean-variance solver stopped after {max_iter} iterations with {active.size} portfolios unconverged")
+    return W
+
+
+def solve_min_variance(cov, **kwargs):
+    """Long-only minimum-variance portfolio (mean-variance with zero expected returns)."""
+    return solve_mean_variance(np.zeros(len(cov)), cov, np.ones(1), **kwargs)[0]
+
+
+def solve_risk_parity(cov, budgets=None, tol=1e-12, max_iter=100):
+    """
+    Long-only risk-parity (equal or budgeted risk contribution) portfolio via Newton's method on
+    the convex formulation  min_y  y'Cov y / 2 - b'log(y),  w = y / sum(y).
+    Parameters:
+    - cov: Covariance matrix, shape (assets, assets).
+    - budgets: Risk budgets summing to one (defaults to equal budgets).
+    Returns:
+    - Weights of shape (assets,).
+    """
+    n = len(cov)
+    budgets = np.full(n, 1.0 / n) if budgets is None else np.asarray(budgets, dtype=float)
+    y = budgets / np.sqrt(np.diag(cov))
+    for _ in range(max_iter):
+        gradient = cov @ y - budgets / y
+        if np.abs(gradient).max() < tol:
+            break
+        direction = np.linalg.solve(cov + np.diag(budgets / y ** 2), gradient)
+        # Halve the step until y stays strictly positive
+        step = 1.0
+        while np.any(y - step * direction <= 0):
+            step *= 0.5
+        y = y - step * direction
+    return y / y.sum()
+
+
+class PortfolioOptimization:
+    def __init__(self, config_path):
+        """
+        Builds long-only allocations from the XGBoost forecasts (expected returns) and the raw
+        candles (covariance of returns).
+        Parameters:
+        - config_path: Path to the configuration YAML file.
+        """
+        self.config = read_yaml(config_path)
+        self.store = get_artifact_store(self.config)
+        self.symbols = self.config['symbols']['currencies']
+        self.lookback = self.config['portfolio']['lookback']
+        self.inputs_cache = {}
+        self.lock = threading.Lock()
+
+    def data_version(self, symbols):
+        """
+        Return the version of the raw and forecast artifacts of `symbols`.
+        Raises:
+        - FileNotFoundError: if any of them is missing.
+        """
+        try:
+            return tuple(self.store.signature(kind, symbol) for symbol in symbols for kind in ("raw", "forecast"))
+        except FileNotFoundError:
+            missing = [s for s in symbols if not (self.store.exists("raw", s) and self.store.exists("forecast", s))]
+            raise FileNotFoundError(f"Data files for {', '.join(missing)} are missing!")
+
+    def load_inputs(self, symbols=None):
+        """
+        Assemble per-period expected returns and the covariance matrix for `symbols`.
+        Closes are aligned on their common timestamps into one (periods, assets) array. Expected
+        returns are the per-period growth implied by each forecast's final value over the last close.
+        Results are cached until an artifact changes.
+        Returns:
+        - (mu, cov, periods_per_year)
+        """
+        symbols = tuple(symbols or self.symbols)
+        version = self.data_version(symbols)
+        with self.lock:
+            cached = self.inputs_cache.get(symbols)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+        closes = [self.store.read("raw", symbol, columns=["Close"])["Close"].rename(symbol) for symbol in symbols]
+        aligned = pd.concat(closes, axis=1, join="inner").sort_index().tail(self.lookback + 1)
+        if len(aligned) < 3:
+            raise ValueError(f"Not enough overlapping history for {', '.join(symbols)}")
+        prices = aligned.to_numpy(dtype=np.float64)
+        returns = prices[1:] / prices[:-1] - 1.0
+        cov = ledoit_wolf(returns)[0]
+
+        period = aligned.index.to_series().diff().median()
+        mu = np.empty(len(symbols))
+        for i, (symbol, close) in enumerate(zip(symbols, closes)):
+            forecast = self.store.read("forecast", symbol, columns=["ds", "yhat"])
+            horizon = max((forecast['ds'].iloc[-1] - close.index[-1]) / period, 1.0)
+            mu[i] = (float(forecast['yhat'].iloc[-1]) / close.iloc[-1]) ** (1.0 / horizon) - 1.0
+        inputs = (mu, cov, pd.Timedelta(days=DAYS_PER_YEAR) / period)
+
+        with self.lock:
+            self.inputs_cache[symbols] = (version, inputs)
+        return inputs
+
+    @staticmethod
+    def summarize(symbols, weights, mu, cov, periods_per_year):
+        """Annualised expected return, volatility, Sharpe ratio and per-asset risk contributions."""
+        variance = float(weights @ cov @ weights)
+        expected_return = float(weights @ mu) * periods_per_year
+        volatility = float(np.sqrt(variance * periods_per_year))
+        contributions = weights * (cov @ weights) / variance if variance > 0 else np.zeros_like(weights)
+        return {
+            "weights": dict(zip(symbols, np.round(weights, 6).tolist())),
+            "expected_return": expected_return,
+            "volatility": volatility,
+            "sharpe": expected_return / volatility if volatility > 0 else None,
+            "risk_contributions": dict(zip(symbols, np.round(contributions, 6).tolist())),
+        }
+
+    def optimize(self, method, symbols=None, risk_aversion=None):
+        """
+        Parameters:
+        - method: "mean_variance", "min_variance" or "risk_parity".
+        - symbols: Assets to allocate across (defaults to every configured currency).
+        - risk_aversion: Lambda for mean-variance (defaults to `portfolio.risk_aversion`).
+        Returns:
+        - Dict with the method, symbols and the `summarize` fields.
+        """
+        symbols = list(symbols or self.symbols)
+        mu, cov, periods_per_year = self.load_inputs(symbols)
+        if method == "mean_variance":
+            risk_aversion = risk_aversion or self.config['portfolio']['risk_aversion']
+            weights = solve_mean_variance(mu, cov, [risk_aversion])[0]
+        elif method == "min_variance":
+            weights = solve_min_variance(cov)
+        elif method == "risk_parity":
+            weights = solve_risk_parity(cov)
+        else:
+            raise ValueError(f"Unknown optimization method: {method}")
+        return {"method": method, "symbols": symbols, **self.summarize(symbols, weights, mu, cov, periods_per_year)}
+
+    def efficient_frontier(self, symbols=None, points=None):
+        """
+        Trace the long-only efficient frontier with one batched solve over a log-spaced risk-aversion grid,
+        scaled to the spread of expected returns relative to the average variance.
+        Returns:
+        - List of `summarize` dicts (plus the risk aversion) ordered by increasing volatility.
+        """
+        symbols = list(symbols or self.symbols)
+        points = points or self.config['portfolio']['frontier_points']
+        mu, cov, periods_per_year = self.load_inputs(symbols)
+        scale = max(np.ptp(mu), 1e-12) / np.mean(np.diag(cov))
+        risk_aversions = scale * np.logspace(-2, 3, points)
+        weights = solve_mean_variance(mu, cov, risk_aversions)
+        frontier = [
+            {"risk_aversion": float(risk_aversion), **self.summarize(symbols, w, mu, cov, periods_per_year)}
+            for risk_aversion, w in zip(risk_aversions, weights)
+        ]
+        return sorted(frontier, key=lambda point: point["volatility"])
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from PortfolioOptimizer.logging import logger
+
+
+class RenderPoolUnavailable(Exception):
+    """Raised when a plot cannot be rendered right now; the API answers 503."""
+
+
+class RenderPoolSaturated(RenderPoolUnavailable):
+    """Raised when every render worker is busy and the queue is full."""
+
+
+class RenderWorkerCrashed(RenderPoolUnavailable):
+    """Raised when a render worker died and the render also failed on a freshly started pool."""
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+class RenderPool:
+    def __init__(self, max_workers=2, queue_depth=8):
+        """
+        Bounded process pool that renders plots off the API event loop.
+        Parameters:
+        - max_workers: Number of rendering processes.
+        - queue_depth: Renders allowed to wait for a free worker before new ones are rejected.
+        """
+        self.max_workers = max_workers
+        self.capacity = max_workers + queue_depth
+        self.executor = None
+        self.in_flight = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+        self.timings = {}
+
+    def _get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                # spawn keeps the workers free of the server's threads and event loop state
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self.executor
+
+    def _discard_executor(self, broken):
+        """Drop `broken` so the next render starts a new pool (unless a concurrent render already replaced it)."""
+        with self.lock:
+            if self.executor is not broken:
+                return
+            self.executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _record(self, kind, render_seconds, total_seconds, failed=False):
+        with self.lock:
+            timing = self.timings.setdefault(kind, {
+                "count": 0, "errors": 0,
+                "render_seconds_total": 0.0, "render_seconds_max": 0.0,
+                "wait_seconds_total": 0.0,
+            })
+            timing["count"] += 1
+            timing["errors"] += int(failed)
+            timing["render_seconds_total"] += render_seconds
+            timing["render_seconds_max"] = max(timing["render_seconds_max"], render_seconds)
+            timing["wait_seconds_total"] += max(total_seconds - render_seconds, 0.0)
+
+    async def render(self, kind, symbol, historical_data, forecast_data):
+        """
+        Render one plot in a worker process.
+        Returns:
+        - Rendered bytes.
+        Raises:
+        - RenderPoolSaturated: if `max_workers + queue_depth` renders are already in flight.
+        - RenderWorkerCrashed: if a worker died (e.g. out of memory) during the render and during its retry.
+        """
+        with self.lock:
+            if self.in_flight >= self.capacity:
+                self.rejected += 1
+                raise RenderPoolSaturated(f"Render pool is saturated ({self.in_flight} renders in flight)")
+            self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            # Imported here so the API can start without pandas and the plotting libraries
+            from PortfolioOptimizer.components.plotrendering import render_plot
+
+            loop = asyncio.get_running_loop()
+            frames = historical_data[['ds', 'y']], forecast_data.filter(regex=r"^(ds|yhat|yhat_q.+)$")
+            for attempt in (1, 2):
+                executor = self._get_executor()
+                try:
+                    content, render_seconds = await loop.run_in_executor(executor, render_plot, kind, symbol, *frames)
+                    break
+                except BrokenProcessPool as e:
+                    # A dead worker breaks the whole pool; replace it so later renders do not keep failing
+                    logger.warning(f"Render pool broke while rendering {kind} plot for {symbol}; restarting it")
+                    self._discard_executor(executor)
+                    if attempt == 2:
+                        raise RenderWorkerCrashed(f"Render workers crashed while rendering {kind} plot for {symbol}") from e
+        except Exception:
+            self._record(kind, 0.0, time.perf_counter() - start, failed=True)
+            raise
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+        total_seconds = time.perf_counter() - start
+        self._record(kind, render_seconds, total_seconds)
+        logger.debug(f"Rendered {kind} plot for {symbol} in {render_seconds:.3f}s ({total_seconds:.3f}s including queueing)")
+        return content
+
+    def stats(self):
+        with self.lock:
+            return {
+                "workers": self.max_workers,
+                "capacity": self.capacity,
+                "in_flight": self.in_flight,
+                "rejected": self.rejected,
+                "renders": {kind: dict(timing) for kind, timing in self.timings.items()},
+            }
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+render_pool = None
+
+
+def get_render_pool(config):
+    """Process-wide RenderPool configured from the `rendering` section of the configuration."""
+    global render_pool
+    if render_pool is None:
+        render_config = config["rendering"]
+        render_pool = RenderPool(render_config["workers"], render_config["queue_depth"])
+    return render_pool
@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import shutil
+import threading
+import numpy as np
+import pandas as pd
+from PortfolioOptimizer.logging import logger
+
+# Tables held for every symbol, in the order `frames` returns them
+SERIES_TABLES = ("historical", "forecast")
+POINTER_FILE = "CURRENT"
+
+
+class SeriesStore:
+    def __init__(self, root, keep_versions=2):
+        """
+        Read-only columnar store of every symbol's plot/API series, shared by all API workers.
+        Each published version is a directory with one contiguous `.npy` block per table and field
+        (all symbols back to back: float64, int64, or datetimes as int64 nanoseconds) and an
+        `index.json` mapping each symbol to its offset and length. Workers memory-map the blocks,
+        so the operating system shares one copy of the data between them, and `CURRENT` names the
+        live version so a new one is published with a single atomic rename.
+        Parameters:
+        - root: Directory holding the versions and the pointer file.
+        - keep_versions: Versions kept on disk when publishing (mapped old versions stay readable).
+        """
+        self.root = root
+        self.keep_versions = keep_versions
+        self.lock = threading.Lock()
+        self.pointer_stat = None
+        self.index = None
+        self.arrays = {}
+
+    @property
+    def pointer_path(self):
+        return os.path.join(self.root, POINTER_FILE)
+
+    def publish(self, frames, versions):
+        """
+        Write a new version and make it current.
+        Parameters:
+        - frames: Dict of symbol -> (historical, forecast) DataFrames; all symbols must share the
+          schema of the first one (symbols that do not are skipped).
+        - versions: Dict of symbol -> data version the frames were read at.
+        Returns:
+        - Name of the published version.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        name = f"v{time.time_ns()}"
+        tmp_dir = os.path.join(self.root, f"{name}.tmp-{os.getpid()}")
+        os.makedirs(tmp_dir)
+        try:
+            schemas = {}
+            symbols = list(frames)
+            for position, table in enumerate(SERIES_TABLES):
+                reference = frames[symbols[0]][position]
+                schemas[table] = {column: self.field_kind(reference[column]) for column in reference.columns
+                                  if self.field_kind(reference[column]) is not None}
+            for symbol in symbols[1:]:
+                for position, table in enumerate(SERIES_TABLES):
+                    if not set(schemas[table]) <= set(frames[symbol][position].columns):
+                        logger.warning(f"Skipping {symbol} in the series store: its {table} columns differ")
+                        symbols.remove(symbol)
+                        break
+
+            index = {"symbols": {}, "fields": schemas}
+            offsets = {table: 0 for table in SERIES_TABLES}
+            for symbol in symbols:
+                entry = {"version": versions[symbol]}
+                for position, table in enumerate(SERIES_TABLES):
+                    length = len(frames[symbol][position])
+                    entry[table] = [offsets[table], length]
+                    offsets[table] += length
+                index["symbols"][symbol] = entry
+            for position, table in enumerate(SERIES_TABLES):
+                for column, kind in schemas[table].items():
+                    block = np.concatenate([self.to_block(frames[symbol][position][column], kind) for symbol in symbols])
+                    np.save(os.path.join(tmp_dir, f"{table}.{column}.npy"), block)
+            with open(os.path.join(tmp_dir, "index.json"), "w") as f:
+                json.dump(index, f, default=str)
+            os.replace(tmp_dir, os.path.join(self.root, name))
+        finally:
+            if os.path.exists(tmp_dir):
+                shutil.rmtree(tmp_dir)
+
+        tmp_pointer = f"{self.pointer_path}.tmp-{os.getpid()}"
+        with open(tmp_pointer, "w") as f:
+            f.write(name)
+        os.replace(tmp_pointer, self.pointer_path)
+        published = sorted(entry for entry in os.listdir(self.root) if entry.startswith("v") and "." not in entry)
+        for stale in published[:-self.keep_versions]:
+            shutil.rmtree(os.path.join(self.root, stale), ignore_errors=True)
+        logger.info(f"Published series store {name} with {len(symbols)} symbols")
+        return name
+
+    @staticmethod
+    def field_kind(series):
+        """Storage kind of a column ("datetime", "int" or "float"), or None for non-numeric columns."""
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return "datetime"
+        if pd.api.types.is_integer_dtype(series):
+            return "int"
+        if pd.api.types.is_numeric_dtype(series):
+            return "float"
+        return None
+
+    @staticmethod
+    def to_block(series, kind):
+        if kind == "datetime":
+            return series.to_numpy(dtype="datetime64[ns]").view(np.int64)
+        return series.to_numpy(dtype=np.int64 if kind == "int" else np.float64)
+
+    def refresh(self):
+        """
+        Attach to the current version if the pointer changed since the last call.
+        Returns:
+        - True if a version is attached.
+        """
+        try:
+            stat = os.stat(self.pointer_path)
+        except FileNotFoundError:
+            return False
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if signature == self.pointer_stat:
+            return True
+        with open(self.pointer_path) as f:
+            version_dir = os.path.join(self.root, f.read().strip())
+        try:
+            with open(os.path.join(version_dir, "index.json")) as f:
+                index = json.load(f)
+            arrays = {
+                (table, column): np.load(os.path.join(version_dir, f"{table}.{column}.npy"), mmap_mode="r")
+                for table, fields in index["fields"].items() for column in fields
+            }
+        except FileNotFoundError:
+            # Pruned by a newer publish between reading the pointer and mapping; retry on the next call
+            return self.index is not None
+        with self.lock:
+            self.index, self.arrays, self.pointer_stat = index, arrays, signature
+        logger.info(f"Attached series store {os.path.basename(version_dir)}")
+        return True
+
+    def data_version(self, symbol):
+        """Data version `symbol` was published at, or None if the current version does not hold it."""
+        if not self.refresh():
+            return None
+        entry = self.index["symbols"].get(symbol)
+        return entry["version"] if entry else None
+
+    def frames(self, symbol):
+        """
+        Return the (historical, forecast) DataFrames of `symbol` as views of the mapped blocks.
+        The frames are read-only; callers may add columns but must not modify values.
+        """
+        with self.lock:
+            index, arrays = self.index, self.arrays
+        entry = index["symbols"][symbol]
+        frames = []
+        for table in SERIES_TABLES:
+            start, length = entry[table]
+            columns = {}
+            for column, kind in index["fields"][table].items():
+                block = arrays[(table, column)][start:start + length]
+                columns[column] = block.view("datetime64[ns]") if kind == "datetime" else block
+            # copy=False keeps one block per column instead of consolidating (and copying) them
+            frames.append(pd.DataFrame(columns, copy=False))
+        return tuple(frames)
+
+
+series_store = None
+
+
+def get_series_store(config):
+    """Process-wide SeriesStore rooted at `paths.series_store_dir`."""
+    global series_store
+    if series_store is None:
+        series_store = SeriesStore(config["paths"]["series_store_dir"])
+    return series_store
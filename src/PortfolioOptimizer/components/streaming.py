@@ -0,0 +1,276 @@
+import json
+import math
+import asyncio
+import numpy as np
+import pandas as pd
+from PortfolioOptimizer.logging import logger
+from PortfolioOptimizer.components.artifactstore import get_artifact_store
+from PortfolioOptimizer.components.dataingestion_binance import INTERVAL_MS, KLINE_COLUMNS, klines_to_frame
+
+
+class RollingWindow:
+    def __init__(self, size):
+        """
+        Mean and sample standard deviation of the last `size` values, updated in O(1) per value.
+        Values live in a fixed ring buffer; the statistics follow a sliding-window Welford update,
+        which stays accurate for large prices where running sums of squares would not.
+        Like pandas' `rolling(size)`, the statistics are NaN until the window is full.
+        """
+        self.size = size
+        self.values = np.zeros(size)
+        self.head = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def _updated(self, value):
+        """(count, mean, m2) after pushing `value`, without changing the window."""
+        if self.count < self.size:
+            count = self.count + 1
+            delta = value - self.mean
+            mean = self.mean + delta / count
+            return count, mean, self.m2 + delta * (value - mean)
+        oldest = self.values[self.head]
+        mean = self.mean + (value - oldest) / self.size
+        return self.count, mean, self.m2 + (value - oldest) * (value - mean + oldest - self.mean)
+
+    def _stats(self, count, mean, m2):
+        if count < self.size:
+            return math.nan, math.nan
+        return mean, math.sqrt(max(m2, 0.0) / (count - 1)) if count > 1 else 0.0
+
+    def push(self, value):
+        """Add `value` (evicting the oldest once full) and return the new (mean, std)."""
+        self.count, self.mean, self.m2 = self._updated(value)
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.size
+        return self._stats(self.count, self.mean, self.m2)
+
+    def stats(self):
+        """Current (mean, std)."""
+        return self._stats(self.count, self.mean, self.m2)
+
+    def peek(self, value):
+        """(mean, std) the window would have after pushing `value`; the window is left unchanged."""
+        return self._stats(*self._updated(value))
+
+
+class LiveFeatures:
+    def __init__(self, windows=(7, 30)):
+        """
+        Incremental version of `DataProcessing.add_features` plus rolling close and return statistics.
+        Parameters:
+        - windows: Rolling window lengths, in bars.
+        """
+        self.windows = tuple(windows)
+        self.close_windows = {window: RollingWindow(window) for window in self.windows}
+        self.return_windows = {window: RollingWindow(window) for window in self.windows}
+        self.last_close = None
+
+    def columns(self):
+        columns = ['High_Low_Diff', 'Open_Close_Diff', 'Average_Price', 'Volume_Weighted_Price']
+        for window in self.windows:
+            columns += [f'Close_Mean_{window}', f'Close_Std_{window}', f'Return_Std_{window}']
+        return columns
+
+    def update(self, bar, commit=True):
+        """
+        Features of one candle in O(1).
+        Parameters:
+        - bar: Mapping with the Open, High, Low, Close, Volume and Quote Asset Volume of the candle.
+        - commit: Advance the rolling windows (closed candles); otherwise only preview the still-open candle.
+        Returns:
+        - Dict of feature values keyed by `columns()`.
+        """
+        high, low, close = float(bar['High']), float(bar['Low']), float(bar['Close'])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_weighted_price = float(np.float64(bar['Quote Asset Volume']) / np.float64(bar['Volume']))
+        row = {
+            'High_Low_Diff': high - low,
+            'Open_Close_Diff': float(bar['Open']) - close,
+            'Average_Price': (high + low + close) / 3,
+            'Volume_Weighted_Price': volume_weighted_price,
+        }
+        log_return = math.log(close / self.last_close) if self.last_close else None
+        for window in self.windows:
+            close_window, return_window = self.close_windows[window], self.return_windows[window]
+            mean, std = close_window.push(close) if commit else close_window.peek(close)
+            if log_return is None:
+                _, return_std = return_window.stats()
+            else:
+                _, return_std = return_window.push(log_return) if commit else return_window.peek(log_return)
+            row.update({f'Close_Mean_{window}': mean, f'Close_Std_{window}': std, f'Return_Std_{window}': return_std})
+        if commit:
+            self.last_close = close
+        return row
+
+    def backfill(self, raw):
+        """Vectorised features of a whole candle history, identical to updating bar by bar."""
+        features = pd.DataFrame(index=raw.index)
+        features['High_Low_Diff'] = raw['High'] - raw['Low']
+        features['Open_Close_Diff'] = raw['Open'] - raw['Close']
+        features['Average_Price'] = (raw['High'] + raw['Low'] + raw['Close']) / 3
+        features['Volume_Weighted_Price'] = raw['Quote Asset Volume'] / raw['Volume']
+        log_returns = np.log(raw['Close'] / raw['Close'].shift(1))
+        for window in self.windows:
+            features[f'Close_Mean_{window}'] = raw['Close'].rolling(window).mean()
+            features[f'Close_Std_{window}'] = raw['Close'].rolling(window).std()
+            features[f'Return_Std_{window}'] = log_returns.rolling(window).std()
+        return features
+
+
+def kline_row(kline):
+    """Kline row in KLINE_COLUMNS order from a Binance websocket kline payload (`k` object)."""
+    return [kline['t'], kline['o'], kline['h'], kline['l'], kline['c'], kline['v'], kline['T'],
+            kline['q'], kline['n'], kline['V'], kline['Q'], kline.get('B', "0")]
+
+
+class BinanceKlineStream:
+    def __init__(self, symbols, interval, url="wss://stream.binance.com:9443/stream", reconnect_delay=5):
+        """
+        Live kline updates from Binance's combined websocket stream, reconnecting on errors.
+        Parameters:
+        - symbols: Symbols to subscribe to.
+        - interval: Kline interval (e.g. "1d").
+        - url: Combined-stream endpoint.
+        - reconnect_delay: Seconds to wait before reconnecting.
+        """
+        self.symbols = symbols
+        self.interval = interval
+        self.url = url
+        self.reconnect_delay = reconnect_delay
+
+    async def messages(self):
+        """Yield (symbol, kline row, closed) for every update."""
+        import aiohttp
+
+        streams = "/".join(f"{symbol.lower()}@kline_{self.interval}" for symbol in self.symbols)
+        while True:
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.ws_connect(f"{self.url}?streams={streams}", heartbeat=30) as ws:
+                        logger.info(f"Connected to kline stream for {', '.join(self.symbols)}")
+                        async for message in ws:
+                            if message.type != aiohttp.WSMsgType.TEXT:
+                                break
+                            data = json.loads(message.data).get("data", {})
+                            if data.get("e") != "kline":
+                                continue
+                            kline = data["k"]
+                            yield data["s"], kline_row(kline), bool(kline["x"])
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Kline stream disconnected: {e}")
+            await asyncio.sleep(self.reconnect_delay)
+
+
+class KlineReplayer:
+    def __init__(self, frames, delay=0.0, updates_per_bar=0):
+        """
+        Replays recorded candles as kline updates, standing in for the exchange feed.
+        Parameters:
+        - frames: Dict of symbol -> raw candle DataFrame (as stored under the "raw" kind).
+        - delay: Seconds to wait between candles.
+        - updates_per_bar: Still-open updates emitted before each closed candle, with the close
+          moving linearly from the open.
+        """
+        self.frames = frames
+        self.delay = delay
+        self.updates_per_bar = updates_per_bar
+
+    async def messages(self):
+        """Yield (symbol, kline row, closed) for every candle, all symbols interleaved in time order."""
+        rows = []
+        for symbol, frame in self.frames.items():
+            for open_time, bar in frame.iterrows():
+                rows.append((open_time, symbol, bar))
+        rows.sort(key=lambda item: item[0])
+        for open_time, symbol, bar in rows:
+            row = [int(open_time.value // 1_000_000), *[bar[column] for column in KLINE_COLUMNS[1:]]]
+            for step in range(1, self.updates_per_bar + 1):
+                partial = list(row)
+                partial[4] = bar['Open'] + (bar['Close'] - bar['Open']) * step / (self.updates_per_bar + 1)
+                yield symbol, partial, False
+            yield symbol, row, True
+            if self.delay:
+                await asyncio.sleep(self.delay)
+
+
+class StreamingIngestion:
+    def __init__(self, config, store=None):
+        """
+        Consumes kline updates and keeps the raw candles and the "live" feature artifact current
+        without recomputing history: each closed candle advances per-symbol ring buffers and is
+        appended to the store, and still-open candles only refresh `latest`.
+        Parameters:
+        - config: Pipeline configuration; reads the `streaming` section and `ingestion.interval`.
+        - store: Artifact store (defaults to the configured one).
+        """
+        settings = config["streaming"]
+        self.store = store or get_artifact_store(config)
+        self.windows = tuple(settings["windows"])
+        self.flush_bars = settings["flush_bars"]
+        self.interval = pd.Timedelta(milliseconds=INTERVAL_MS[config["ingestion"]["interval"]])
+        self.features = {}
+        self.last_open_time = {}
+        self.pending = {}
+        self.latest = {}
+
+    def warm_up(self, symbol):
+        """
+        Prime the rolling windows from the stored candles, writing the full live artifact once if it
+        does not exist yet.
+        Raises:
+        - FileNotFoundError: if no raw candles are stored for `symbol`.
+        """
+        raw = self.store.read("raw", symbol)
+        features = LiveFeatures(self.windows)
+        if not self.store.exists("live", symbol):
+            self.store.write("live", symbol, raw.drop(columns=["Ignore"], errors="ignore").join(features.backfill(raw)))
+        for _, bar in raw.tail(max(self.windows) + 1).iterrows():
+            features.update(bar)
+        self.features[symbol] = features
+        self.last_open_time[symbol] = raw.index[-1]
+        self.pending[symbol] = []
+
+    def on_kline(self, symbol, row, closed):
+        """
+        Update features for one kline message.
+        Returns:
+        - The feature dict of the candle, or None for candles already stored.
+        """
+        if symbol not in self.features:
+            self.warm_up(symbol)
+        open_time = pd.Timestamp(row[0], unit="ms")
+        last_open_time = self.last_open_time[symbol]
+        if open_time <= last_open_time:
+            return None
+        bar = dict(zip(KLINE_COLUMNS, row))
+        features = self.features[symbol].update(bar, commit=closed)
+        self.latest[symbol] = (open_time, features)
+        if closed:
+            if open_time - last_open_time > self.interval:
+                logger.warning(f"{symbol}: gap in stream between {last_open_time} and {open_time}")
+            self.last_open_time[symbol] = open_time
+            self.pending[symbol].append((row, features))
+            if len(self.pending[symbol]) >= self.flush_bars:
+                self.flush(symbol)
+        return features
+
+    def flush(self, symbol):
+        """Append the buffered closed candles of `symbol` to its raw and live artifacts."""
+        pending, self.pending[symbol] = self.pending[symbol], []
+        if not pending:
+            return
+        raw = klines_to_frame([row for row, _ in pending])
+        self.store.append("raw", symbol, raw)
+        features = pd.DataFrame([features for _, features in pending], index=raw.index)
+        self.store.append("live", symbol, raw.drop(columns=["Ignore"], errors="ignore").join(features))
+
+    async def run(self, source):
+        """Consume `source.messages()` until it ends, flushing buffered candles on exit."""
+        try:
+            async for symbol, row, closed in source.messages():
+                self.on_kline(symbol, row, closed)
+        finally:
+            for symbol in self.pending:
+                self.flush(symbol)
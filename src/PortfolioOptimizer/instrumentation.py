@@ -0,0 +1,295 @@
+import os
+import json
+import time
+import fcntl
+import bisect
+import inspect
+import resource
+import threading
+import functools
+from contextlib import ContextDecorator
+
+# Span durations, in seconds; wide enough for both file reads and cold Prophet fits
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+# Spans of pipeline and streaming processes are appended here as JSON lines, so they reach the API
+RECORDS_ENV = "METRICS_RECORDS_FILE"
+DEFAULT_RECORDS_FILE = "logs/spans.jsonl"
+# The records file is rotated to `<file>.1` once it grows past this size
+RECORDS_MAX_BYTES = 64 * 2 ** 20
+# Role of this process in the peak RSS gauge; the pipeline sets it for itself and its workers
+PROCESS_ENV = "METRICS_PROCESS"
+# The API counts its own spans in memory, so only other roles write records
+API_PROCESS = "api"
+
+
+def peak_rss_bytes():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in labels.values())
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + "}"
+
+
+class Metrics:
+    def __init__(self, buckets=DURATION_BUCKETS):
+        """
+        In-process counters, gauges and histograms rendered in the Prometheus text format.
+        Series are keyed by metric name and a sorted tuple of label pairs.
+        """
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.help = {}
+        # (inode, offset) of the records file read so far; inode None reads it from the start
+        self.records_position = (None, 0)
+        self.ingest_lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def describe(self, name, text):
+        self.help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self.lock:
+            self.gauges[self._key(name, labels)] = value
+
+    def set_max(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            self.gauges[key] = max(self.gauges.get(key, value), value)
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            histogram["counts"][bisect.bisect_left(self.buckets, value)] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def record_span(self, record):
+        """Fold one span record (see `Span`) into the span metrics."""
+        labels = {"span": record["span"], **record.get("labels", {})}
+        self.observe("portfolio_span_seconds", record["seconds"], **labels)
+        if record.get("error"):
+            self.inc("portfolio_span_errors_total", **labels)
+        for field in ("rows", "bytes"):
+            if record.get(field) is not None:
+                self.inc(f"portfolio_span_{field}_total", record[field], **labels)
+        if record.get("peak_rss_bytes") is not None:
+            self.set_max("portfolio_peak_rss_bytes", record["peak_rss_bytes"], process=record.get("process", API_PROCESS))
+
+    def skip_records(self, path):
+        """Start `ingest_records` at the current end of `path`; older records were reported by an earlier API process."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        with self.ingest_lock:
+            self.records_position = (stat.st_ino, stat.st_size)
+
+    @staticmethod
+    def _read_lines(path, offset):
+        """Complete lines of `path` after `offset`, and the offset after them (a partly written last line is left)."""
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        complete = data[:data.rfind(b"\n") + 1]
+        return complete, offset + len(complete)
+
+    def ingest_records(self, path):
+        """
+        Fold span records appended to `path` by other processes since the last call.
+        When the file was rotated in between, the rest of the rotated file (`<path>.1`) is read first.
+        """
+        with self.ingest_lock:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return
+            inode, offset = self.records_position
+            chunks = []
+            if inode is not None and stat.st_ino != inode:
+                try:
+                    if os.stat(f"{path}.1").st_ino == inode:
+                        chunks.append(self._read_lines(f"{path}.1", offset)[0])
+                except OSError:
+                    pass
+                offset = 0
+            elif stat.st_size < offset:
+                offset = 0
+            try:
+                data, offset = self._read_lines(path, offset)
+            except OSError:
+                return
+            chunks.append(data)
+            self.records_position = (stat.st_ino, offset)
+        pid = os.getpid()
+        for line in b"".join(chunks).splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("pid") != pid:
+                self.record_span(record)
+
+    def render(self):
+        """Return every series in the Prometheus text exposition format (version 0.0.4)."""
+        with self.lock:
+            counters, gauges = dict(self.counters), dict(self.gauges)
+            histograms = {key: {**value, "counts": list(value["counts"])} for key, value in self.histograms.items()}
+        lines = []
+        for kind, series in (("counter", counters), ("gauge", gauges)):
+            for name in sorted({name for name, _ in series}):
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+                for (series_name, labels), value in sorted(series.items()):
+                    if series_name == name:
+                        lines.append(f"{name}{format_labels(dict(labels))} {value}")
+        for name in sorted({name for name, _ in histograms}):
+            if name in self.help:
+                lines.append(f"# HELP {name} {self.help[name]}")
+            lines.append(f"# TYPE {name} histogram")
+            for (series_name, labels), histogram in sorted(histograms.items()):
+                if series_name != name:
+                    continue
+                labels = dict(labels)
+                cumulative = 0
+                for bound, count in zip((*self.buckets, "+Inf"), histogram["counts"]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{format_labels({**labels, 'le': bound})} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {histogram['sum']}")
+                lines.append(f"{name}_count{format_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+metrics.describe("portfolio_span_seconds", "Duration of instrumented operations (stages, symbols, fits, file I/O, requests).")
+metrics.describe("portfolio_span_errors_total", "Instrumented operations that raised.")
+metrics.describe("portfolio_span_rows_total", "Rows processed by instrumented operations.")
+metrics.describe("portfolio_span_bytes_total", "Bytes read or written by instrumented operations.")
+metrics.describe("portfolio_peak_rss_bytes", "Highest peak resident set size seen across the processes of each role.")
+
+
+def get_metrics():
+    """Process-wide Metrics registry."""
+    return metrics
+
+
+def rotate_records(path):
+    """
+    Move `path` to `<path>.1` once it outgrows RECORDS_MAX_BYTES. Processes rotate under an exclusive
+    lock on `<path>.lock` and re-check the size inside it, so a file is only ever rotated once.
+    """
+    with open(f"{path}.lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            if os.path.getsize(path) > RECORDS_MAX_BYTES:
+                os.replace(path, f"{path}.1")
+        except FileNotFoundError:
+            pass
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def write_record(record):
+    """Append one span record to $METRICS_RECORDS_FILE (a single O_APPEND write; empty value disables)."""
+    path = os.environ.get(RECORDS_ENV, DEFAULT_RECORDS_FILE)
+    if not path:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    if os.fstat(fd).st_size > RECORDS_MAX_BYTES:
+        os.close(fd)
+        rotate_records(path)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, (json.dumps(record, default=str) + "\n").encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+class Span(ContextDecorator):
+    def __init__(self, name, process=None, **labels):
+        """
+        Time one operation, as a context manager or a (sync or async) function decorator.
+        On exit the duration is observed into the process-wide metrics. Outside the API, a structured
+        record (span, labels, seconds, rows, bytes, peak RSS, error) is also appended to the records
+        file, so request spans never add disk I/O to the event loop.
+        Parameters:
+        - name: Kind of operation, e.g. "stage", "model_fit", "artifact_read", "http_request".
+        - process: Role reported with the peak RSS gauge (defaults to $METRICS_PROCESS or "api").
+        - labels: Metric labels; keep their values low-cardinality (stage, symbol, model, kind, route).
+        """
+        self.name = name
+        self.process = process or os.environ.get(PROCESS_ENV, API_PROCESS)
+        self.labels = labels
+        self.rows = None
+        self.bytes = None
+
+    def set(self, rows=None, bytes=None, **labels):
+        """Attach sizes, or labels only known once the operation has run (e.g. a response status)."""
+        if rows is not None:
+            self.rows = int(rows)
+        if bytes is not None:
+            self.bytes = int(bytes)
+        self.labels.update(labels)
+        return self
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record = {
+            "ts": time.time(),
+            "pid": os.getpid(),
+            "process": self.process,
+            "span": self.name,
+            "labels": {key: str(value) for key, value in self.labels.items()},
+            "seconds": round(time.perf_counter() - self.start, 6),
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "error": exc_type.__name__ if exc_type is not None else None,
+        }
+        metrics.record_span(record)
+        if self.process != API_PROCESS:
+            try:
+                write_record(record)
+            except OSError:
+                pass
+        return False
+
+    def _recreate_cm(self):
+        # Decorated functions may run concurrently; give each call its own span
+        return Span(self.name, self.process, **self.labels)
+
+    def __call__(self, func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with self._recreate_cm():
+                    return await func(*args, **kwargs)
+            return wrapper
+        return super().__call__(func)
+
+
+def span(name, **labels):
+    """Shorthand for `Span(name, **labels)`."""
+    return Span(name, **labels)
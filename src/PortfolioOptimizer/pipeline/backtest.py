@@ -0,0 +1,29 @@
+import argparse
+from PortfolioOptimizer.components.backtesting import Backtester
+from PortfolioOptimizer.logging import logger
+from PortfolioOptimizer.utils.utils import read_yaml
+
+STAGE_NAME = "Walk-forward Backtest"
+
+
+def main(symbols=None, models=None):
+    config_path = "config/config.yaml"
+    configs = read_yaml(config_path)
+    backtester = Backtester(configs, config_path)
+    folds, summary = backtester.run(symbols=symbols, models=models)
+    backtester.save(folds, summary)
+    logger.info(f"Backtest summary:\n{summary.to_string(index=False)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest the forecasting models on rolling origins.")
+    parser.add_argument("--symbols", nargs="*", help="Symbols to backtest (defaults to every symbol with raw data).")
+    parser.add_argument("--models", nargs="*", help="Models to backtest (defaults to backtest.models).")
+    args = parser.parse_args()
+    try:
+        logger.info(f">>>>>> Stage {STAGE_NAME} Started <<<<<<")
+        main(symbols=args.symbols, models=args.models)
+        logger.info(f">>>>>> Stage {STAGE_NAME} Completed <<<<<<\n\n")
+    except Exception as e:
+        logger.exception(e)
+        raise e
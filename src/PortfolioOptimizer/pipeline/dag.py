@@ -0,0 +1,257 @@
+import os
+import json
+import time
+import hashlib
+from PortfolioOptimizer.logging import logger
+from PortfolioOptimizer.instrumentation import span
+from PortfolioOptimizer.utils.utils import read_yaml
+from PortfolioOptimizer.components.artifactstore import get_artifact_store
+from PortfolioOptimizer.pipeline.progress import report_progress
+
+
+# Fingerprint file of the stages that run once across all symbols
+PANEL_FINGERPRINTS = "_panel"
+
+
+class Stage:
+    def __init__(self, name, run, inputs=(), outputs=(), config_keys=(), always_run=False, scope="symbol"):
+        """
+        One step of the pipeline DAG.
+        Parameters:
+        - name: Stage name, also the key its fingerprint is stored under.
+        - run: Callable taking the symbol (or, for panel stages, the list of symbols).
+        - inputs: Artifact kinds the stage reads.
+        - outputs: Artifact kinds the stage writes; the stage re-runs if any is missing.
+        - config_keys: Dotted config.yaml keys (or "params:"-prefixed params.yaml keys) that affect the result.
+        - always_run: Never skip (stages whose input is external, or that are cheap and self-caching).
+        - scope: "symbol" for stages run once per symbol, "panel" for stages run once across all symbols.
+        """
+        self.name = name
+        self.run = run
+        self.inputs = inputs
+        self.outputs = outputs
+        self.config_keys = config_keys
+        self.always_run = always_run
+        self.scope = scope
+
+
+def build_stages(config, config_path):
+    """Declare the stages in execution order. Heavy modules are imported lazily."""
+    from PortfolioOptimizer.components.modelforecasting import ModelForecasting
+    from PortfolioOptimizer.pipeline.stage01_DataIngestion_Binance import DataIngestionBinancePipeline
+    from PortfolioOptimizer.pipeline.stage02_DataProcessing import DataProcessingPipeline
+    from PortfolioOptimizer.pipeline.stage03_ModelTrainingXGBoost import train_symbol, train_panel
+
+    store = get_artifact_store(config)
+    if config["training"]["mode"] == "panel":
+        training = Stage("training",
+                         lambda symbols: train_panel(symbols, config, store),
+                         inputs=("processed",), outputs=("forecast",),
+                         config_keys=("forecast_period", "training", "forecast_intervals"), scope="panel")
+    else:
+        training = Stage("training",
+                         lambda symbol: train_symbol(symbol, config, store),
+                         inputs=("processed",), outputs=("forecast",),
+                         config_keys=("forecast_period", "training", "forecast_intervals"))
+    stages = [
+        # One call for every symbol, so all fetches run concurrently under a single request-weight budget
+        Stage("ingestion",
+              lambda symbols: DataIngestionBinancePipeline(config).main(symbols=symbols),
+              outputs=("raw",), config_keys=("ingestion",), always_run=True, scope="panel"),
+        Stage("processing",
+              lambda symbol: DataProcessingPipeline().process_symbol(symbol),
+              inputs=("raw",), outputs=("processed",), config_keys=("processing", "params:features")),
+        Stage("rollups",
+              lambda symbol: DataProcessingPipeline().rollup_symbol(symbol),
+              inputs=("raw",), outputs=("rollup",), config_keys=("plots.resolutions",)),
+        training,
+        Stage("forecasting",
+              lambda symbol: ModelForecasting(config_path=config_path).plot_forecast(symbol),
+              inputs=("processed", "forecast")),
+    ]
+    if config["plots"]["prerender"]:
+        from PortfolioOptimizer.components.plotcache import get_plot_cache
+        from PortfolioOptimizer.pipeline.stage05_PlotRendering import prerender_symbol
+        # The plot cache already skips versions it holds, so this stage is cheap to repeat
+        stages.append(Stage(
+            "prerendering",
+            lambda symbol: prerender_symbol(symbol, ModelForecasting(config_path=config_path), get_plot_cache(config)),
+            inputs=("processed", "forecast"), always_run=True,
+        ))
+    # Publish last, once every symbol's forecast is final; cheap, so it always runs
+    stages.append(Stage(
+        "publishing",
+        lambda symbols: ModelForecasting(config_path=config_path).publish_series_store(),
+        always_run=True, scope="panel",
+    ))
+    return stages
+
+
+def lookup(source, dotted_key):
+    value = source
+    for part in dotted_key.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+class SymbolDAG:
+    def __init__(self, config, config_path="config/config.yaml", params_path="params.yaml"):
+        """
+        Runs the stage DAG for one symbol at a time, skipping stages whose fingerprint
+        (input artifact content + relevant config/params values) matches the last successful run.
+        Parameters:
+        - config: Pipeline configuration.
+        - config_path: Path of config.yaml (passed on to stages that re-read it).
+        - params_path: Path of params.yaml.
+        """
+        self.config = config
+        self.store = get_artifact_store(config)
+        self.fingerprints_dir = config["paths"]["fingerprints_dir"]
+        try:
+            self.params = read_yaml(params_path)
+        except (ValueError, FileNotFoundError):
+            self.params = {}
+        self.stages = build_stages(config, config_path)
+
+    def fingerprint(self, stage, symbol):
+        """Hash of everything the stage's output depends on, or None if an input is missing."""
+        digest = hashlib.sha256(stage.name.encode())
+        for kind in stage.inputs:
+            if not self.store.exists(kind, symbol):
+                return None
+            digest.update(f"{kind}:{self.store.digest(kind, symbol)}".encode())
+        for key in stage.config_keys:
+            if key.startswith("params:"):
+                value = lookup(self.params, key[len("params:"):])
+            else:
+                value = lookup(self.config, key)
+            digest.update(f"{key}={json.dumps(value, sort_keys=True, default=str)}".encode())
+        return digest.hexdigest()
+
+    def phases(self):
+        """
+        Group consecutive stages by scope.
+        Returns:
+        - List of (scope, stage names); a panel phase needs every symbol's preceding phase to finish first.
+        """
+        phases = []
+        for stage in self.stages:
+            if phases and phases[-1][0] == stage.scope:
+                phases[-1][1].append(stage.name)
+            else:
+                phases.append((stage.scope, [stage.name]))
+        return phases
+
+    def _fingerprint_path(self, symbol):
+        return os.path.join(self.fingerprints_dir, f"{symbol}.json")
+
+    def load_fingerprints(self, symbol):
+        path = self._fingerprint_path(symbol)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def save_fingerprints(self, symbol, fingerprints):
+        os.makedirs(self.fingerprints_dir, exist_ok=True)
+        path = self._fingerprint_path(symbol)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            json.dump(fingerprints, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def run(self, symbol, force=False, stages=None):
+        """
+        Run the per-symbol stages for `symbol` in order, stopping at the first failure.
+        Parameters:
+        - force: Ignore stored fingerprints and run every stage.
+        - stages: Names of the stages to run (defaults to every per-symbol stage).
+        Returns:
+        - Dict with the symbol, status, failed stage (if any), error text, per-stage timings and skipped stages.
+        """
+        selected = [stage for stage in self.stages
+                    if stage.scope == "symbol" and (stages is None or stage.name in stages)]
+        fingerprints = self.load_fingerprints(symbol)
+        result = {"symbol": symbol, "status": "success", "failed_stage": None, "error": None,
+                  "timings": {}, "skipped": []}
+        with span("symbol", symbol=symbol) as symbol_span:
+            for stage in selected:
+                start = time.perf_counter()
+                fingerprint = None if stage.always_run else self.fingerprint(stage, symbol)
+                outputs_exist = all(self.store.exists(kind, symbol) for kind in stage.outputs)
+                if not force and fingerprint is not None and outputs_exist and fingerprints.get(stage.name) == fingerprint:
+                    logger.info(f"{symbol}: skipping {stage.name}, inputs unchanged")
+                    result["skipped"].append(stage.name)
+                    report_progress("stage_skipped", symbol=symbol, stage=stage.name)
+                    continue
+                logger.info(f"{symbol}: running {stage.name}")
+                report_progress("stage_started", symbol=symbol, stage=stage.name)
+                try:
+                    with span("stage", stage=stage.name, symbol=symbol):
+                        stage.run(symbol)
+                except Exception as e:
+                    result.update(status="failed", failed_stage=stage.name, error=f"{type(e).__name__}: {e}")
+                    fingerprints.pop(stage.name, None)
+                    break
+                finally:
+                    result["timings"][stage.name] = round(time.perf_counter() - start, 3)
+                    report_progress("stage_finished", symbol=symbol, stage=stage.name,
+                                    seconds=result["timings"][stage.name], status=result["status"])
+                if fingerprint is not None:
+                    fingerprints[stage.name] = fingerprint
+            symbol_span.set(status=result["status"])
+        self.save_fingerprints(symbol, fingerprints)
+        # Later phases still follow unless this run reached the final stage
+        if result["status"] != "success" or not selected or selected[-1] is self.stages[-1]:
+            report_progress("symbol_finished", **result)
+        return result
+
+    def run_panel(self, name, symbols, force=False):
+        """
+        Run the panel stage `name` once across `symbols`, skipping it when every symbol's
+        fingerprint for it matches the last successful run over the same symbols.
+        Returns:
+        - List of per-symbol result dicts (see `run`); a failure fails every symbol.
+        """
+        stage = next(stage for stage in self.stages if stage.name == name)
+        fingerprints = self.load_fingerprints(PANEL_FINGERPRINTS)
+        results = [{"symbol": symbol, "status": "success", "failed_stage": None, "error": None,
+                    "timings": {}, "skipped": []} for symbol in symbols]
+        digest = hashlib.sha256(json.dumps(sorted(symbols)).encode())
+        for symbol in sorted(symbols):
+            symbol_fingerprint = None if stage.always_run else self.fingerprint(stage, symbol)
+            if symbol_fingerprint is None:
+                digest = None
+                break
+            digest.update(symbol_fingerprint.encode())
+        fingerprint = digest.hexdigest() if digest is not None else None
+        outputs_exist = all(self.store.exists(kind, symbol) for kind in stage.outputs for symbol in symbols)
+        if not force and fingerprint is not None and outputs_exist and fingerprints.get(stage.name) == fingerprint:
+            logger.info(f"Skipping panel {stage.name} for {len(symbols)} symbols, inputs unchanged")
+            for result in results:
+                result["skipped"].append(stage.name)
+                report_progress("stage_skipped", symbol=result["symbol"], stage=stage.name)
+            return results
+
+        logger.info(f"Running panel {stage.name} for {len(symbols)} symbols")
+        for symbol in symbols:
+            report_progress("stage_started", symbol=symbol, stage=stage.name)
+        start = time.perf_counter()
+        try:
+            with span("stage", stage=stage.name, symbol=PANEL_FINGERPRINTS):
+                stage.run(list(symbols))
+            if fingerprint is not None:
+                fingerprints[stage.name] = fingerprint
+        except Exception as e:
+            for result in results:
+                result.update(status="failed", failed_stage=stage.name, error=f"{type(e).__name__}: {e}")
+            fingerprints.pop(stage.name, None)
+        seconds = round(time.perf_counter() - start, 3)
+        self.save_fingerprints(PANEL_FINGERPRINTS, fingerprints)
+        for result in results:
+            result["timings"][stage.name] = seconds
+            report_progress("stage_finished", symbol=result["symbol"], stage=stage.name,
+                            seconds=seconds, status=result["status"])
+            if result["status"] != "success" or stage is self.stages[-1]:
+                report_progress("symbol_finished", **result)
+        return results
@@ -0,0 +1,23 @@
+from PortfolioOptimizer.components.artifactstore import migrate_csv_artifacts
+from PortfolioOptimizer.logging import logger
+from PortfolioOptimizer.utils.utils import read_yaml
+
+STAGE_NAME = "Artifact Migration"
+
+
+def main():
+    configs = read_yaml("config/config.yaml")
+    migrated = migrate_csv_artifacts(configs)
+    for kind, symbol in migrated:
+        logger.info(f"Migrated {kind} artifact for {symbol}")
+    logger.info(f"Migrated {len(migrated)} CSV artifacts")
+
+
+if __name__ == "__main__":
+    try:
+        logger.info(f">>>>>> Stage {STAGE_NAME} Started <<<<<<")
+        main()
+        logger.info(f">>>>>> Stage {STAGE_NAME} Completed <<<<<<\n\n")
+    except Exception as e:
+        logger.exception(e)
+        raise e
@@ -1,39 +1,71 @@
 import os
+import argparse
 from PortfolioOptimizer.logging import logger
 from PortfolioOptimizer.utils.utils import read_yaml
-from PortfolioOptimizer.pipeline.stage01_DataIngestion_Binance import DataIngestionBinancePipeline
-from PortfolioOptimizer.pipeline.stage02_DataProcessing import DataProcessingPipeline
-from PortfolioOptimizer.pipeline.stage03_ModelTrainingXGBoost import main as model_training_main
-from PortfolioOptimizer.pipeline.stage04_ModelForecasting import main as model_forecasting_main
+from PortfolioOptimizer.pipeline.dag import SymbolDAG
+from PortfolioOptimizer.pipeline.scheduler import SymbolScheduler
+from PortfolioOptimizer.pipeline.progress import PROGRESS_ENV, report_progress
+from PortfolioOptimizer.instrumentation import PROCESS_ENV
 from dotenv import load_dotenv
 load_dotenv()
-def main():
+def main(force=False, only=None):
     logger.info("Reading configuration for the pipeline.")
     config_path = "config/config.yaml"
     config = read_yaml(config_path)
+    symbols = only or config['symbols']['currencies']
+    unknown = [symbol for symbol in symbols if symbol not in config['symbols']['currencies']]
+    if unknown:
+        raise ValueError(f"Unknown symbols: {', '.join(unknown)}")
+    report_progress("run_started", symbols=list(symbols), force=force)
     try:
-        # Stage 01: Data Ingestion
-        logger.info(">>>>>>>>>>>>> Starting Stage 01: Data Ingestion 🫠 <<<<<<<<<<<<< ")
-        data_ingestion_pipeline = DataIngestionBinancePipeline(config)
-        data_ingestion_pipeline.main()
-        logger.info(">>>>>>>>>>>>> Completed Stage 01: Data Ingestion 👍 <<<<<<<<<<<<< \n\n")
-        # Stage 02: Data Processing
-        logger.info(">>>>>>>>>>>>> Starting Stage 02: Data Processing 🫠 <<<<<<<<<<<<< ")
-        data_processing_pipeline = DataProcessingPipeline()
-        data_processing_pipeline.main()
-        logger.info(">>>>>>>>>>>>> Completed Stage 02: Data Processing 👍 <<<<<<<<<<<<< \n\n")
-        # Stage 03: Model Training and Forecasting
-        logger.info(">>>>>>>>>>>>> Starting Stage 03: Model Training 🫠 <<<<<<<<<<<<< ")
-        model_training_main()
-        logger.info(">>>>>>>>>>>>> Completed Stage 03: Model Training 👍 <<<<<<<<<<<<< \n\n")
-        # Stage 04: Model Forecasting and Visualization
-        logger.info(">>>>>>>>>>>>> Starting Stage 04: Model Forecasting 🫠 <<<<<<<<<<<<< ")
-        model_forecasting_main()
-        logger.info(">>>>>>>>>>>>> Completed Stage 04: Model Forecasting 👍 <<<<<<<<<<<<< \n\n")
+        dag = SymbolDAG(config, config_path)
+        results = {symbol: {"symbol": symbol, "status": "success", "failed_stage": None, "error": None,
+                            "timings": {}, "skipped": []} for symbol in symbols}
+        for scope, stages in dag.phases():
+            active = [symbol for symbol in symbols if results[symbol]['status'] == 'success']
+            if not active:
+                break
+            if scope == "panel":
+                logger.info(f">>>>>>>>>>>>> Running {', '.join(stages)} once across {len(active)} symbols 🫠 <<<<<<<<<<<<< ")
+                phase_results = [result for name in stages for result in dag.run_panel(name, active, force=force)]
+            elif config['pipeline']['parallel']:
+                logger.info(f">>>>>>>>>>>>> Running {', '.join(stages)} per symbol in parallel 🫠 <<<<<<<<<<<<< ")
+                phase_results = SymbolScheduler(config, config_path).run(active, force=force, stages=stages)
+            else:
+                logger.info(f">>>>>>>>>>>>> Running {', '.join(stages)} per symbol sequentially 🫠 <<<<<<<<<<<<< ")
+                phase_results = []
+                for symbol in active:
+                    result = dag.run(symbol, force=force, stages=stages)
+                    phase_results.append(result)
+                    if result['status'] == 'success':
+                        logger.info(f"{symbol} completed: {result['timings']} skipped={result['skipped']}")
+                    else:
+                        logger.error(f"{symbol} failed at {result['failed_stage']}: {result['error']}")
+            for result in phase_results:
+                merged = results[result['symbol']]
+                merged['timings'].update(result['timings'])
+                merged['skipped'].extend(result['skipped'])
+                if result['status'] != 'success' and merged['status'] == 'success':
+                    merged.update(status=result['status'], failed_stage=result['failed_stage'], error=result['error'])
+        results = list(results.values())
+        if not any(result['status'] == 'success' for result in results):
+            raise RuntimeError("Pipeline failed for every symbol.")
+        report_progress("run_finished", status="success")
+        logger.info(">>>>>>>>>>>>> Completed pipeline run 👍 <<<<<<<<<<<<< \n\n")
     except Exception as e:
+        report_progress("run_finished", status="failed", error=str(e))
         logger.exception(f"Pipeline execution failed: {e}")
         raise e
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the PortfolioOptimizer pipeline.")
+    parser.add_argument("--force", action="store_true", help="Re-run every stage even if its inputs are unchanged.")
+    parser.add_argument("--only", action="append", metavar="SYMBOL", help="Run only this symbol (repeatable).")
+    parser.add_argument("--progress-file", help="Append JSON progress events to this file.")
+    args = parser.parse_args()
+    if args.progress_file:
+        os.environ[PROGRESS_ENV] = args.progress_file
+    # Inherited by the scheduler's workers, so their spans are reported under the pipeline too
+    os.environ.setdefault(PROCESS_ENV, "pipeline")
     logger.info("Starting the PortfolioOptimizer Pipeline.")
-    main()
-    logger.info("Completed the PortfolioOptimizer Pipeline.")
\ No newline at end of file
+    main(force=args.force, only=args.only)
+    logger.info("Completed the PortfolioOptimizer Pipeline.")
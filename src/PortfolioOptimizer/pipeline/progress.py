@@ -0,0 +1,22 @@
+import os
+import json
+import time
+
+# Set by the job runner (and inherited by scheduler workers) to collect structured progress events
+PROGRESS_ENV = "PIPELINE_PROGRESS_FILE"
+
+
+def report_progress(event, **fields):
+    """
+    Append one JSON progress event to the file named by $PIPELINE_PROGRESS_FILE (no-op when unset).
+    Each event is a single O_APPEND write, so worker processes can report concurrently.
+    """
+    path = os.environ.get(PROGRESS_ENV)
+    if not path:
+        return
+    line = json.dumps({"ts": time.time(), "event": event, **fields}, default=str) + "\n"
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line.encode("utf-8"))
+    finally:
+        os.close(fd)
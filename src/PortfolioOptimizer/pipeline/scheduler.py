@@ -0,0 +1,88 @@
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from PortfolioOptimizer.logging import logger
+from PortfolioOptimizer.utils.utils import read_yaml
+from PortfolioOptimizer.pipeline.progress import report_progress
+
+
+def _init_worker(threads_per_worker):
+    # Must run before xgboost/prophet/statsmodels load so each worker keeps to its share of the cores
+    for variable in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variable] = str(threads_per_worker)
+
+
+def run_symbol_chain(symbol, config_path, force, stages=None):
+    """
+    Worker entry point: run the per-symbol stages (process -> train -> forecast -> pre-render) for one symbol,
+    or only the named `stages` of them.
+    The DAG module is imported here rather than at module level so worker threads are
+    limited before the ML libraries load.
+    Returns:
+    - Result dict from `SymbolDAG.run`.
+    """
+    from PortfolioOptimizer.pipeline.dag import SymbolDAG
+
+    config = read_yaml(config_path)
+    return SymbolDAG(config, config_path).run(symbol, force=force, stages=stages)
+
+
+class SymbolScheduler:
+    def __init__(self, config, config_path="config/config.yaml"):
+        """
+        Runs every symbol's stage chain as an independent task on a process pool.
+        Parameters:
+        - config: Pipeline configuration; reads `pipeline.workers` (0 = one per CPU core).
+        - config_path: Path the workers re-read the configuration from.
+        """
+        self.config = config
+        self.config_path = config_path
+        self.max_workers = config["pipeline"]["workers"] or os.cpu_count()
+
+    def run(self, symbols=None, force=False, stages=None):
+        """
+        Run all symbol chains; a failing symbol never stops the others.
+        Parameters:
+        - symbols: Symbols to run (defaults to every configured currency).
+        - force: Re-run stages even when their inputs are unchanged.
+        - stages: Names of the per-symbol stages to run (defaults to all of them).
+        Returns:
+        - List of per-symbol result dicts (see `run_symbol_chain`).
+        """
+        symbols = symbols or self.config["symbols"]["currencies"]
+        workers = min(self.max_workers, len(symbols))
+        threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+        logger.info(f"Scheduling {len(symbols)} symbols on {workers} worker processes")
+
+        results = []
+        start = time.perf_counter()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(threads_per_worker,),
+        ) as executor:
+            futures = {
+                executor.submit(run_symbol_chain, symbol, self.config_path, force, stages): symbol
+                for symbol in symbols
+            }
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker itself died (e.g. killed or out of memory)
+                    result = {"symbol": symbol, "status": "failed", "failed_stage": None,
+                              "error": f"{type(e).__name__}: {e}", "timings": {}, "skipped": []}
+                    report_progress("symbol_finished", **result)
+                results.append(result)
+                if result["status"] == "success":
+                    logger.info(f"{symbol} completed: {result['timings']} skipped={result['skipped']}")
+                else:
+                    logger.error(f"{symbol} failed at {result['failed_stage']}: {result['error']} {result['timings']}")
+
+        failed = [r["symbol"] for r in results if r["status"] != "success"]
+        logger.info(f"Scheduled run finished in {time.perf_counter() - start:.1f}s; "
+                    f"{len(results) - len(failed)} succeeded, {len(failed)} failed {failed if failed else ''}")
+        return results
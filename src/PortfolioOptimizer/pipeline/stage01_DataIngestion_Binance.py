@@ -1,6 +1,10 @@
-import os
+import asyncio
+import aiohttp
 from datetime import datetime, timedelta
-from PortfolioOptimizer.components.dataingestion_binance import BinanceIngestionData
+from PortfolioOptimizer.components.dataingestion_binance import (
+    BinanceIngestionData, IncrementalIngestionError, RequestWeightBudget, to_millis
+)
+from PortfolioOptimizer.components.artifactstore import get_artifact_store
 from PortfolioOptimizer.logging import logger
 from PortfolioOptimizer.utils.utils import read_yaml
 from dotenv import load_dotenv
@@ -15,26 +19,92 @@ class DataIngestionBinancePipeline:
     def __init__(self, config):
         self.config = config
 
-    def main(self):
-        symbols = self.config["symbols"]["currencies"]
-        interval = "1d"
-        end_date = datetime.now().strftime("%Y-%m-%d")
-        start_date = (datetime.now() - timedelta(days=730)).strftime("%Y-%m-%d")
-        output_dir = self.config["paths"]["artifacts_dir"]
+    async def fetch_all(self, requests):
+        """
+        Fetch every symbol's paginated history concurrently under one shared request-weight budget.
+        Parameters:
+        - requests: List of (BinanceIngestionData, start_ms) pairs; start_ms None means a full backfill.
+        """
+        ingestion_config = self.config["ingestion"]
+        budget = RequestWeightBudget(
+            weight_per_minute=ingestion_config["weight_per_minute"],
+            max_concurrency=ingestion_config["max_concurrency"],
+        )
+        timeout = aiohttp.ClientTimeout(total=ingestion_config["request_timeout"])
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            return await asyncio.gather(
+                *(ingestion.fetch_data_async(session, budget, start_ms) for ingestion, start_ms in requests),
+                return_exceptions=True,
+            )
 
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+    def load_existing(self, binance_data):
+        try:
+            existing = binance_data.load_existing()
+        except Exception as e:
+            logger.warning(f"Stored data for {binance_data.symbol} is unreadable ({e}); doing a full backfill")
+            return None
+        if existing is None or existing.empty:
+            return None
+        return existing
 
+    def main(self, symbols=None):
+        symbols = symbols or self.config["symbols"]["currencies"]
+        ingestion_config = self.config["ingestion"]
+        interval = ingestion_config["interval"]
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=ingestion_config["lookback_days"])
+        store = get_artifact_store(self.config)
+        incremental = ingestion_config["mode"] == "incremental"
+
+        existing = {}
+        requests = []
         for symbol in symbols:
+            binance_data = BinanceIngestionData(
+                symbol, interval, start_date, end_date, store,
+                base_url=ingestion_config["base_url"],
+                page_limit=ingestion_config["page_limit"],
+            )
+            existing[symbol] = self.load_existing(binance_data) if incremental else None
+            start_ms = None if existing[symbol] is None else to_millis(existing[symbol].index[-1])
+            requests.append((binance_data, start_ms))
+
+        results = asyncio.run(self.fetch_all(requests))
+
+        backfill = []
+        for (binance_data, start_ms), raw_data in zip(requests, results):
+            symbol = binance_data.symbol
             try:
-                binance_data = BinanceIngestionData(symbol, interval, start_date, end_date, output_dir)
-                raw_data = binance_data.fetch_data()
+                if isinstance(raw_data, Exception):
+                    raise raw_data
                 processed_data = binance_data.process_data(raw_data)
-                binance_data.save_to_csv(processed_data)
-                logger.info(f"Successfully processed data for {symbol}")
+                if start_ms is None:
+                    binance_data.save_data(processed_data)
+                    logger.info(f"Successfully processed data for {symbol}")
+                    continue
+                try:
+                    new_data = binance_data.new_candles(existing[symbol], processed_data)
+                except IncrementalIngestionError as e:
+                    logger.warning(f"{e}; falling back to a full backfill")
+                    backfill.append((binance_data, None))
+                    continue
+                if new_data.empty:
+                    logger.info(f"{symbol} is already up to date")
+                else:
+                    binance_data.append_data(new_data)
+                    logger.info(f"Appended {len(new_data)} new candles for {symbol}")
             except Exception as e:
                 logger.error(f"Error processing data for {symbol}: {e}")
 
+        if backfill:
+            for (binance_data, _), raw_data in zip(backfill, asyncio.run(self.fetch_all(backfill))):
+                try:
+                    if isinstance(raw_data, Exception):
+                        raise raw_data
+                    binance_data.save_data(binance_data.process_data(raw_data))
+                    logger.info(f"Successfully backfilled data for {binance_data.symbol}")
+                except Exception as e:
+                    logger.error(f"Error backfilling data for {binance_data.symbol}: {e}")
+
 if __name__ == "__main__":
     try:
         logger.info(f">>>>>> Stage {STAGE_NAME} Started <<<<<<")
@@ -1,40 +1,61 @@
-import os
+from PortfolioOptimizer.components.artifactstore import get_artifact_store
 from PortfolioOptimizer.components.dataprocessing import DataProcessing
+from PortfolioOptimizer.components.downsampling import ohlc_rollups
+from PortfolioOptimizer.components.fitstate import FitStateStore
 from PortfolioOptimizer.logging import logger
 from PortfolioOptimizer.utils.utils import read_yaml
 from dotenv import load_dotenv
+import time
 import warnings
 
 warnings.filterwarnings("ignore")
 load_dotenv()
 
 configs = read_yaml("config/config.yaml")
+try:
+    params = read_yaml("params.yaml")
+except (ValueError, FileNotFoundError):
+    params = {}
 STAGE_NAME = "Data Processing Stage"
 
 
 class DataProcessingPipeline:
     def __init__(self):
-        self.artifacts_dir = configs["paths"]["artifacts_dir"]
-        self.processed_dir = configs["paths"]["processed_dir"]
+        self.store = get_artifact_store(configs)
         self.symbols = configs["symbols"]["currencies"]
+        self.fit_states = FitStateStore(configs["paths"]["fit_state_dir"])
 
-        os.makedirs(self.processed_dir, exist_ok=True)
-
-    def process_csv(self, csv_path, output_path):
-        data_processor = DataProcessing(csv_path)
+    def process_symbol(self, symbol):
+        if not self.store.exists("raw", symbol):
+            raise FileNotFoundError(f"File not found: {self.store.path('raw', symbol)}")
+        start = time.perf_counter()
+        data_processor = DataProcessing(
+            self.store.read("raw", symbol),
+            fit_state=self.fit_states.load(symbol),
+            features=params.get("features"),
+            **configs["processing"]
+        )
         final_df = data_processor.process_data()
-        final_df.to_csv(output_path, index=False)
-        logger.info(f"Processed and saved: {output_path}")
+        self.store.write("processed", symbol, final_df)
+        self.fit_states.save(symbol, data_processor.fit_state)
+        fit_mode = "full refit" if data_processor.full_refit else "warm start"
+        logger.info(f"Processed and saved: {self.store.path('processed', symbol)} "
+                    f"({fit_mode}, {time.perf_counter() - start:.2f}s)")
+
+    def rollup_symbol(self, symbol):
+        """Build the OHLC rollups the plot routes serve at coarser resolutions (`plots.resolutions`)."""
+        if not self.store.exists("raw", symbol):
+            raise FileNotFoundError(f"File not found: {self.store.path('raw', symbol)}")
+        rollups = ohlc_rollups(self.store.read("raw", symbol), configs["plots"]["resolutions"])
+        self.store.write("rollup", symbol, rollups)
 
     def main(self):
         for symbol in self.symbols:
-            symbol_file = os.path.join(self.artifacts_dir, f"{symbol}_2Y.csv")
-            output_file = os.path.join(self.processed_dir, f"{symbol}_Featured.csv")
-
-            if os.path.exists(symbol_file):
-                self.process_csv(symbol_file, output_file)
+            if self.store.exists("raw", symbol):
+                self.process_symbol(symbol)
+                self.rollup_symbol(symbol)
             else:
-                logger.warning(f"File not found: {symbol_file}")
+                logger.warning(f"File not found: {self.store.path('raw', symbol)}")
 
 
 if __name__ == "__main__":
@@ -1,47 +1,132 @@
-import os
-import pandas as pd
+from PortfolioOptimizer.components.artifactstore import get_artifact_store
 from PortfolioOptimizer.logging import logger
 from PortfolioOptimizer.utils.utils import read_yaml
-from PortfolioOptimizer.components.modeltrainingXGBoost import XGBoostForecasting
+from PortfolioOptimizer.components.modeltrainingXGBoost import XGBoostForecasting, PanelXGBoostForecasting, ORIGIN_FEATURES
+from PortfolioOptimizer.components.modelregistry import PANEL_MODEL, get_model_registry, training_fingerprint
 
-def main():
-    configs = read_yaml("config/config.yaml")
-    processed_dir = configs['paths']['processed_dir']
-    forecast_period = configs['forecast_period']
-    symbols = configs['symbols']['currencies']
 
-    for symbol in symbols:
-        file_name = f"{symbol}_Featured.csv"
-        file_path = os.path.join(processed_dir, file_name)
+def training_params(configs):
+    """Training settings a registered model must match to be reused."""
+    training = configs['training']
+    if training['mode'] == "panel":
+        return {"mode": "panel", "training_period": training['training_period'],
+                "horizon_stride": training['horizon_stride'], "forecast_period": configs['forecast_period'],
+                "features": ORIGIN_FEATURES}
+    return {"mode": "per_symbol", "training_period": training['training_period']}
+
+
+def train_symbol(symbol, configs, store, registry=None):
+    """
+    Forecast and save the XGBoost forecast for one symbol, training a new model only when the
+    registered one is older than `training.retrain_hours` or was trained with other settings.
+    """
+    registry = registry or get_model_registry(configs)
+    params = training_params(configs)
+    file_path = store.path("processed", symbol)
 
-        if not os.path.exists(file_path):
-            logger.warning(f"Processed data file not found for {symbol}: {file_path}")
-            continue
+    if not store.exists("processed", symbol):
+        raise FileNotFoundError(f"Processed data file not found for {symbol}: {file_path}")
 
-        logger.info(f"Loading processed data for {symbol} from {file_path}")
-        data = pd.read_csv(file_path)
+    logger.info(f"Loading processed data for {symbol} from {file_path}")
+    data = store.read("processed", symbol)
 
-        xgboost_forecasting = XGBoostForecasting(
-            data=data,
-            date_column='ds',
-            target_column='y',
-            config=configs,
-        )
+    xgboost_forecasting = XGBoostForecasting(
+        data=data,
+        date_column='ds',
+        target_column='y',
+        config=configs,
+    )
 
-        logger.info(f"Preprocessing data for {symbol}.")
-        xgboost_forecasting.preprocess_data()
+    logger.info(f"Preprocessing data for {symbol}.")
+    xgboost_forecasting.preprocess_data()
 
+    registered = registry.reusable(symbol, params, configs['training']['retrain_hours'])
+    if registered is not None:
+        model, metadata = registered
+        logger.info(f"Reusing registered model {symbol} v{metadata['version']} trained at {metadata['created_at']}.")
+        xgboost_forecasting.use_model(model)
+    else:
         logger.info(f"Training XGBoost model for {symbol}.")
-        xgboost_forecasting.train_model(training_period=730)
+        xgboost_forecasting.train_model(training_period=configs['training']['training_period'])
+        registry.register(symbol, xgboost_forecasting.model, {
+            **xgboost_forecasting.model_metadata(),
+            "params": params,
+            "fingerprint": training_fingerprint(store, [symbol], params),
+        })
+
+    logger.info(f"Forecasting future values for {symbol}.")
+    forecast = xgboost_forecasting.forecast(future_periods=configs['forecast_period'])
+
+    logger.info(f"Saving forecast results for {symbol}.")
+    xgboost_forecasting.save_forecast(forecast, coin_name=symbol)
+
+    logger.info(f"Plotting forecast results for {symbol}.")
+    xgboost_forecasting.plot_forecast(forecast, coin_name=symbol)
+
+
+def train_panel(symbols, configs, store, registry=None):
+    """
+    Forecast and save every symbol in `symbols` in one batch from the shared panel model, training
+    it across all of them only when the registered one is stale, was trained with other settings,
+    or does not know every symbol.
+    """
+    registry = registry or get_model_registry(configs)
+    params = training_params(configs)
+    registered = registry.reusable(PANEL_MODEL, params, configs['training']['retrain_hours'])
+    if registered is not None and not set(symbols) <= set(registered[1]['categories']):
+        registered = None
 
-        logger.info(f"Forecasting future values for {symbol}.")
-        forecast = xgboost_forecasting.forecast(future_periods=forecast_period)
+    missing = [symbol for symbol in symbols if not store.exists("processed", symbol)]
+    if missing:
+        raise FileNotFoundError(f"Processed data files not found for: {', '.join(missing)}")
 
-        logger.info(f"Saving forecast results for {symbol}.")
-        xgboost_forecasting.save_forecast(forecast, coin_name=symbol)
+    logger.info(f"Loading processed data for {len(symbols)} symbols.")
+    panel = PanelXGBoostForecasting(
+        {symbol: store.read("processed", symbol) for symbol in symbols},
+        config=configs,
+        training_period=configs['training']['training_period'],
+        horizon_stride=configs['training']['horizon_stride'],
+        categories=registered[1]['categories'] if registered is not None else None,
+    )
 
-        logger.info(f"Plotting forecast results for {symbol}.")
-        xgboost_forecasting.plot_forecast(forecast, coin_name=symbol)
+    if registered is not None:
+        model, metadata = registered
+        logger.info(f"Reusing registered panel model v{metadata['version']} trained at {metadata['created_at']}.")
+        panel.use_model(model)
+    else:
+        logger.info("Training the panel XGBoost model.")
+        panel.train_model(future_periods=configs['forecast_period'])
+        registry.register(PANEL_MODEL, panel.model, {
+            **panel.model_metadata(),
+            "params": params,
+            "fingerprint": training_fingerprint(store, symbols, params),
+        })
+
+    logger.info("Forecasting future values for every symbol.")
+    forecasts = panel.forecast(future_periods=configs['forecast_period'])
+
+    logger.info("Saving forecast results.")
+    panel.save_forecasts(forecasts)
+
+
+def main():
+    configs = read_yaml("config/config.yaml")
+    store = get_artifact_store(configs)
+    symbols = configs['symbols']['currencies']
+
+    if configs['training']['mode'] == "panel":
+        available = [symbol for symbol in symbols if store.exists("processed", symbol)]
+        for symbol in set(symbols) - set(available):
+            logger.warning(f"Processed data file not found for {symbol}: {store.path('processed', symbol)}")
+        if available:
+            train_panel(available, configs, store)
+        return
+
+    for symbol in symbols:
+        try:
+            train_symbol(symbol, configs, store)
+        except FileNotFoundError as e:
+            logger.warning(str(e))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,42 @@
+from PortfolioOptimizer.logging import logger
+from PortfolioOptimizer.utils.utils import read_yaml
+from PortfolioOptimizer.components.modelforecasting import ModelForecasting
+from PortfolioOptimizer.components.plotcache import get_plot_cache, plot_version
+from PortfolioOptimizer.components.plotrendering import PLOT_RENDERERS
+
+STAGE_NAME = "Plot Pre-rendering Stage"
+
+
+def prerender_symbol(symbol, model_forecasting, plot_cache):
+    """Render every plot kind for one symbol, as served by default, into the plot cache (no-op for versions already cached)."""
+    version = model_forecasting.data_version(symbol)
+    historical_data, forecast_data = model_forecasting.plot_data(symbol)
+    for kind, render in PLOT_RENDERERS.items():
+        plot_cache.get_or_render(
+            kind, (symbol,), plot_version(kind, version),
+            lambda: render(symbol, historical_data, forecast_data)
+        )
+
+
+def main():
+    logger.info("Reading configuration for Plot Pre-rendering.")
+    config_path = "config/config.yaml"
+    config = read_yaml(config_path)
+    model_forecasting = ModelForecasting(config_path=config_path)
+    plot_cache = get_plot_cache(config)
+    symbols = config['symbols']['currencies']
+    for symbol in symbols:
+        try:
+            prerender_symbol(symbol, model_forecasting, plot_cache)
+        except FileNotFoundError as e:
+            logger.error(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    try:
+        logger.info(f">>>>>> Stage {STAGE_NAME} Started <<<<<<")
+        main()
+        logger.info(f">>>>>> Stage {STAGE_NAME} Completed <<<<<<\n\n")
+    except Exception as e:
+        logger.exception(e)
+        raise e
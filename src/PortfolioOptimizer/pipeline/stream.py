@@ -0,0 +1,49 @@
+import os
+import asyncio
+import argparse
+import pandas as pd
+from PortfolioOptimizer.components.streaming import BinanceKlineStream, KlineReplayer, StreamingIngestion
+from PortfolioOptimizer.logging import logger
+from PortfolioOptimizer.utils.utils import read_yaml
+from PortfolioOptimizer.instrumentation import PROCESS_ENV
+
+STAGE_NAME = "Streaming Ingestion"
+
+
+def load_recording(path):
+    """Recorded candles (CSV or Parquet, as written under the "raw" kind) indexed by Open Time."""
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, index_col="Open Time", parse_dates=["Open Time"])
+
+
+def main(symbols=None, replay=None, delay=0.0):
+    configs = read_yaml("config/config.yaml")
+    symbols = symbols or configs['symbols']['currencies']
+    ingestion = StreamingIngestion(configs)
+    for symbol in symbols:
+        ingestion.warm_up(symbol)
+    if replay:
+        source = KlineReplayer({symbol: load_recording(path) for symbol, path in zip(symbols, replay)}, delay=delay)
+    else:
+        source = BinanceKlineStream(symbols, configs['ingestion']['interval'], url=configs['streaming']['url'])
+    asyncio.run(ingestion.run(source))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream kline updates into the raw and live artifacts.")
+    parser.add_argument("--symbols", nargs="*", help="Symbols to stream (defaults to every configured currency).")
+    parser.add_argument("--replay", nargs="*", metavar="FILE",
+                        help="Replay recorded candles instead of the exchange feed, one file per symbol.")
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds between replayed candles.")
+    args = parser.parse_args()
+    if args.replay and len(args.replay) != len(args.symbols or []):
+        parser.error("--replay needs one file per symbol given with --symbols")
+    os.environ.setdefault(PROCESS_ENV, "stream")
+    try:
+        logger.info(f">>>>>> Stage {STAGE_NAME} Started <<<<<<")
+        main(symbols=args.symbols, replay=args.replay, delay=args.delay)
+        logger.info(f">>>>>> Stage {STAGE_NAME} Completed <<<<<<\n\n")
+    except Exception as e:
+        logger.exception(e)
+        raise e
@@ -1,4 +1,5 @@
 #!/bin/sh
 
+python src/PortfolioOptimizer/pipeline/migrate_artifacts.py   ### One-shot CSV -> artifact store migration
 python src/PortfolioOptimizer/pipeline/pipeline.py      ### Pipeline for Portfolio Optimization
 python main.py          ### FastAPI 
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from PortfolioOptimizer.components.dataingestion_binance import INTERVAL_MS, klines_to_frame
+
+START_MS = 1_700_000_000_000 - 1_700_000_000_000 % INTERVAL_MS["1d"]
+
+
+def kline_rows(count, start_ms=START_MS, interval="1d", seed=0):
+    """Raw kline rows (as the exchange returns them) of a random walk around 30k."""
+    rng = np.random.default_rng(seed)
+    step = INTERVAL_MS[interval]
+    closes = 30_000 * np.exp(np.cumsum(rng.normal(0, 0.02, count)))
+    rows = []
+    for i, close in enumerate(closes):
+        open_ = closes[i - 1] if i else close
+        high, low = max(open_, close) * 1.01, min(open_, close) * 0.99
+        volume = rng.uniform(100, 1000)
+        open_time = start_ms + i * step
+        rows.append([open_time, f"{open_:.2f}", f"{high:.2f}", f"{low:.2f}", f"{close:.2f}", f"{volume:.4f}",
+                     open_time + step - 1, f"{volume * close:.4f}", int(rng.integers(100, 1000)),
+                     f"{volume / 2:.4f}", f"{volume * close / 2:.4f}", "0"])
+    return rows
+
+
+def candles(count, **kwargs):
+    return klines_to_frame(kline_rows(count, **kwargs))
+
+
+@pytest.fixture
+def config(tmp_path):
+    paths = {key: str(tmp_path / key) for key in (
+        "artifacts_dir", "processed_dir", "foresast_dir", "fingerprints_dir", "fit_state_dir", "models_dir",
+        "backtest_dir", "live_dir", "series_store_dir", "rollup_dir",
+    )}
+    return {
+        "paths": paths,
+        "artifact_store": {"format": "parquet", "compact_segments": 4},
+        "ingestion": {"interval": "1d"},
+        "streaming": {"windows": [3, 7], "flush_bars": 1},
+    }
@@ -0,0 +1,58 @@
+import os
+import pandas as pd
+from PortfolioOptimizer.components.artifactstore import get_artifact_store
+from conftest import candles
+
+
+def test_append_writes_segments_without_rewriting_main_file(config):
+    store = get_artifact_store(config)
+    frame = candles(10)
+    store.write("raw", "BTCUSDT", frame.iloc[:5])
+    main_stat = os.stat(store.path("raw", "BTCUSDT"))
+    signature = store.signature("raw", "BTCUSDT")
+
+    store.append("raw", "BTCUSDT", frame.iloc[5:7])
+    store.append("raw", "BTCUSDT", frame.iloc[7:8])
+
+    assert os.stat(store.path("raw", "BTCUSDT")).st_mtime_ns == main_stat.st_mtime_ns
+    assert len(store.segments("raw", "BTCUSDT")) == 2
+    assert store.signature("raw", "BTCUSDT") != signature
+    pd.testing.assert_frame_equal(store.read("raw", "BTCUSDT"), frame.iloc[:8], check_freq=False)
+    pd.testing.assert_frame_equal(store.read("raw", "BTCUSDT", columns=["Close"]), frame.iloc[:8][["Close"]],
+                                  check_freq=False)
+
+
+def test_segments_are_compacted_and_dropped_on_write(config):
+    store = get_artifact_store(config)
+    frame = candles(10)
+    store.write("raw", "BTCUSDT", frame.iloc[:5])
+    for i in range(5, 9):
+        store.append("raw", "BTCUSDT", frame.iloc[i:i + 1])
+
+    # The fourth append reaches `compact_segments` and folds everything into the main file
+    assert store.segments("raw", "BTCUSDT") == []
+    pd.testing.assert_frame_equal(store.read("raw", "BTCUSDT"), frame.iloc[:9], check_freq=False)
+
+    store.append("raw", "BTCUSDT", frame.iloc[9:])
+    store.write("raw", "BTCUSDT", frame.iloc[:3])
+    assert store.segments("raw", "BTCUSDT") == []
+    pd.testing.assert_frame_equal(store.read("raw", "BTCUSDT"), frame.iloc[:3], check_freq=False)
+
+
+def test_compaction_drops_rows_repeated_by_overlapping_appends(config):
+    store = get_artifact_store(config)
+    frame = candles(10)
+    store.write("raw", "BTCUSDT", frame.iloc[:5])
+    revised = frame.iloc[4:7].copy()
+    revised.loc[revised.index[0], "Close"] += 1.0
+    store.append("raw", "BTCUSDT", revised)
+    store.append("raw", "BTCUSDT", frame.iloc[6:8])
+
+    store.compact("raw", "BTCUSDT")
+
+    assert store.segments("raw", "BTCUSDT") == []
+    compacted = store.read("raw", "BTCUSDT")
+    assert compacted.index.is_unique
+    expected = frame.iloc[:8].copy()
+    expected.loc[expected.index[4], "Close"] += 1.0
+    pd.testing.assert_frame_equal(compacted, expected, check_freq=False)
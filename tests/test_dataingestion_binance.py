@@ -0,0 +1,162 @@
+import asyncio
+import time
+import aiohttp
+import pandas as pd
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from PortfolioOptimizer.components.dataingestion_binance import (
+    INTERVAL_MS, USED_WEIGHT_HEADER, BinanceIngestionData, IncrementalIngestionError, RequestWeightBudget,
+)
+from conftest import START_MS, kline_rows
+
+DAY_MS = INTERVAL_MS["1d"]
+
+
+class FakeKlines:
+    """Klines endpoint serving `rows` like Binance: startTime/endTime inclusive, at most `limit` rows."""
+
+    def __init__(self, rows, rate_limited=0, retry_after="1", used_weight=None):
+        self.rows = rows
+        self.rate_limited = rate_limited
+        self.retry_after = retry_after
+        self.used_weight = used_weight
+        self.requests = []
+
+    async def handle(self, request):
+        start, end, limit = (int(request.query[key]) for key in ("startTime", "endTime", "limit"))
+        self.requests.append((start, end, limit))
+        headers = {} if self.used_weight is None else {USED_WEIGHT_HEADER: str(self.used_weight)}
+        if self.rate_limited:
+            self.rate_limited -= 1
+            return web.json_response({"code": -1003, "msg": "Too many requests"}, status=429,
+                                     headers={**headers, "Retry-After": self.retry_after})
+        page = [row for row in self.rows if start <= row[0] <= end][:limit]
+        return web.json_response(page, headers=headers)
+
+
+class RecordingBudget(RequestWeightBudget):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.drains = 0
+
+    def drain(self):
+        self.drains += 1
+        super().drain()
+
+
+def fetch(klines, start_ms=None, end_ms=START_MS + 35 * DAY_MS, page_limit=10, budget=None, **settings):
+    """Run `fetch_data_async` against a local server; returns (rows, ingestion, budget)."""
+    async def run():
+        app = web.Application()
+        app.router.add_get("/api/v3/klines", klines.handle)
+        async with TestServer(app) as server:
+            ingestion = BinanceIngestionData(
+                "BTCUSDT", "1d", pd.Timestamp(START_MS, unit="ms"), pd.Timestamp(end_ms, unit="ms"), store=None,
+                base_url=str(server.make_url("/api/v3/klines")), page_limit=page_limit,
+            )
+            for key, value in settings.items():
+                setattr(ingestion, key, value)
+            async with aiohttp.ClientSession() as session:
+                return await ingestion.fetch_data_async(session, budget, start_ms), ingestion
+
+    budget = budget or RecordingBudget()
+    rows, ingestion = asyncio.run(run())
+    return rows, ingestion, budget
+
+
+@pytest.fixture(autouse=True)
+def api_keys(monkeypatch):
+    monkeypatch.setenv("BINANCE_API_KEY", "test-key")
+    monkeypatch.setenv("BINANCE_SECRET_KEY", "test-secret")
+
+
+def test_pages_are_stitched_across_page_limit():
+    exchange = kline_rows(40)
+    klines = FakeKlines(exchange)
+
+    rows, _, _ = fetch(klines)
+
+    assert [row[0] for row in rows] == [row[0] for row in exchange[:35]]
+    assert len(klines.requests) == 4
+    assert all(limit == 10 for _, _, limit in klines.requests)
+    # Consecutive windows neither overlap nor leave a gap
+    for (_, previous_end, _), (start, _, _) in zip(klines.requests, klines.requests[1:]):
+        assert start == previous_end + 1
+
+
+def test_candle_still_open_at_end_date_is_dropped():
+    klines = FakeKlines(kline_rows(40))
+
+    rows, _, _ = fetch(klines, end_ms=START_MS + 34 * DAY_MS + DAY_MS // 2)
+
+    assert len(rows) == 34
+    assert rows[-1][0] == START_MS + 33 * DAY_MS
+
+
+def test_boundary_bar_is_deduplicated_on_incremental_fetch():
+    exchange = kline_rows(40)
+    klines = FakeKlines(exchange)
+    rows, ingestion, _ = fetch(klines, end_ms=START_MS + 20 * DAY_MS)
+    existing = ingestion.process_data(rows)
+
+    # Resume from the last stored bar, which the exchange returns again
+    boundary_ms = exchange[19][0]
+    rows, ingestion, _ = fetch(klines, start_ms=boundary_ms)
+    fetched = ingestion.process_data(rows)
+    new = ingestion.new_candles(existing, fetched)
+
+    assert fetched.index[0] == pd.Timestamp(boundary_ms, unit="ms")
+    assert fetched.index.is_unique
+    assert new.index[0] == pd.Timestamp(exchange[20][0], unit="ms")
+    assert len(new) == 15
+    assert pd.concat([existing, new]).index.is_unique
+
+
+def test_boundary_bar_that_disagrees_with_the_exchange_is_rejected():
+    exchange = kline_rows(40)
+    klines = FakeKlines(exchange)
+    rows, ingestion, _ = fetch(klines, end_ms=START_MS + 20 * DAY_MS)
+    existing = ingestion.process_data(rows)
+    existing.iloc[-1, existing.columns.get_loc("Close")] += 1.0
+
+    rows, ingestion, _ = fetch(klines, start_ms=exchange[19][0])
+    with pytest.raises(IncrementalIngestionError):
+        ingestion.new_candles(existing, ingestion.process_data(rows))
+
+
+def test_rate_limited_request_drains_budget_and_honours_retry_after():
+    klines = FakeKlines(kline_rows(40), rate_limited=1, retry_after="1")
+
+    started = time.monotonic()
+    rows, _, budget = fetch(klines, end_ms=START_MS + 10 * DAY_MS, retry_delay=30)
+    elapsed = time.monotonic() - started
+
+    assert len(rows) == 10
+    assert len(klines.requests) == 2
+    assert budget.drains == 1
+    # Retried after the server's Retry-After, not the 30s default delay
+    assert 1 <= elapsed < 10
+
+
+def test_used_weight_header_throttles_budget():
+    klines = FakeKlines(kline_rows(40), used_weight=1195)
+    budget = RecordingBudget(weight_per_minute=1200)
+
+    fetch(klines, end_ms=START_MS + 10 * DAY_MS, budget=budget)
+
+    # Requests made elsewhere on the same IP are charged to this process's budget
+    assert budget.tokens <= 1200 - 1195 + 1
+    assert budget.drains == 0
+
+
+def test_budget_waits_for_refill_after_observed_weight():
+    async def run():
+        budget = RequestWeightBudget(weight_per_minute=600)
+        budget.observe(600 - 5)
+        started = time.monotonic()
+        await budget.acquire(10)
+        return time.monotonic() - started
+
+    # 5 missing tokens at 10 tokens/s
+    assert asyncio.run(run()) == pytest.approx(0.5, abs=0.3)
@@ -0,0 +1,39 @@
+import os
+import sys
+import json
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Allowed median time of `import main`, as gated by benchmarks/startup.py
+IMPORT_BUDGET_SECONDS = 1.0
+# Libraries that must only load once a route needs them (or during the background warm-up)
+HEAVY_MODULES = ("matplotlib", "plotly", "seaborn", "xgboost", "prophet", "statsmodels")
+
+CHILD = """
+import sys, time, json
+start = time.perf_counter()
+import main
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "heavy": sorted(name for name in %r if name in sys.modules)}))
+""" % (HEAVY_MODULES,)
+
+
+def import_main():
+    """Import `main` in a fresh interpreter from the repository root; returns (seconds, heavy modules loaded)."""
+    env = {**os.environ, "METRICS_RECORDS_FILE": ""}
+    completed = subprocess.run([sys.executable, "-c", CHILD], cwd=REPO_ROOT, capture_output=True, text=True, env=env)
+    assert completed.returncode == 0, f"Importing main failed:\n{completed.stderr[-2000:]}"
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return result["seconds"], result["heavy"]
+
+
+def test_import_main_stays_within_budget_and_lazy():
+    # The first import also compiles bytecode; keep it out of the timing
+    import_main()
+    runs = [import_main() for _ in range(3)]
+
+    heavy = sorted({name for _, loaded in runs for name in loaded})
+    assert heavy == [], f"Heavy libraries imported at startup: {', '.join(heavy)}"
+    median = statistics.median(seconds for seconds, _ in runs)
+    assert median <= IMPORT_BUDGET_SECONDS, f"import main took {1000 * median:.0f} ms (budget {1000 * IMPORT_BUDGET_SECONDS:.0f} ms)"
@@ -0,0 +1,68 @@
+import asyncio
+import numpy as np
+import pandas as pd
+import pytest
+from PortfolioOptimizer.components.artifactstore import get_artifact_store
+from PortfolioOptimizer.components.streaming import KlineReplayer, RollingWindow, StreamingIngestion
+from conftest import candles
+
+HISTORY = 40
+
+
+def expected_features(raw, windows):
+    """Rolling statistics as pandas computes them over the whole history."""
+    log_returns = np.log(raw["Close"] / raw["Close"].shift(1))
+    expected = {}
+    for window in windows:
+        expected[f"Close_Mean_{window}"] = raw["Close"].rolling(window).mean()
+        expected[f"Close_Std_{window}"] = raw["Close"].rolling(window).std()
+        expected[f"Return_Std_{window}"] = log_returns.rolling(window).std()
+    return pd.DataFrame(expected)
+
+
+@pytest.mark.parametrize("size", [1, 3, 30])
+def test_rolling_window_matches_pandas(size):
+    values = 60_000 + np.random.default_rng(1).normal(0, 500, 200).cumsum()
+    window = RollingWindow(size)
+    stats = np.array([window.push(value) for value in values])
+    rolling = pd.Series(values).rolling(size)
+    np.testing.assert_allclose(stats[:, 0], rolling.mean(), rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(stats[:, 1], rolling.std().fillna(0.0) if size == 1 else rolling.std(),
+                               rtol=1e-7, atol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize("updates_per_bar", [0, 3])
+def test_replayed_candles_match_pandas_rolling(config, updates_per_bar):
+    frame = candles(120)
+    store = get_artifact_store(config)
+    store.write("raw", "BTCUSDT", frame.iloc[:HISTORY])
+    ingestion = StreamingIngestion(config, store)
+
+    replayer = KlineReplayer({"BTCUSDT": frame.iloc[HISTORY:]}, updates_per_bar=updates_per_bar)
+    asyncio.run(ingestion.run(replayer))
+
+    raw = store.read("raw", "BTCUSDT")
+    pd.testing.assert_frame_equal(raw, frame, check_freq=False)
+    live = store.read("live", "BTCUSDT")
+    assert live.index.equals(frame.index)
+    expected = expected_features(frame, config["streaming"]["windows"])
+    replayed = live.iloc[HISTORY:]
+    for column in expected:
+        np.testing.assert_allclose(replayed[column], expected[column].iloc[HISTORY:], rtol=1e-8, equal_nan=True,
+                                   err_msg=column)
+    # One segment per flushed candle, folded into the main file every `compact_segments` appends
+    assert len(store.segments("raw", "BTCUSDT")) < config["artifact_store"]["compact_segments"]
+
+
+def test_open_candle_updates_do_not_advance_windows(config):
+    frame = candles(HISTORY + 1)
+    store = get_artifact_store(config)
+    store.write("raw", "BTCUSDT", frame.iloc[:HISTORY])
+    ingestion = StreamingIngestion(config, store)
+
+    asyncio.run(ingestion.run(KlineReplayer({"BTCUSDT": frame.iloc[HISTORY:]}, updates_per_bar=5)))
+
+    _, latest = ingestion.latest["BTCUSDT"]
+    expected = expected_features(frame, config["streaming"]["windows"]).iloc[-1]
+    for column, value in expected.items():
+        assert latest[column] == pytest.approx(value, rel=1e-8)